@@ -3,13 +3,27 @@ Agent Reasoning Callbacks
 Custom LangChain callback handler that captures every Thought → Action → Observation
 step for display on the Streamlit dashboard.
 """
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 from langchain_core.callbacks import BaseCallbackHandler
 
+# "Thought: ..." / "Final Answer: ..." lines in ReAct-style LLM output
+_REACT_LINE_RE = re.compile(
+    r"^[ \t]*(thought|final answer):[ \t]*(.*?)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_REACT_STEP_TYPES = {"thought": "thought", "final answer": "final_answer"}
 
-@dataclass
+
+def clip_text(value: Any, limit: int) -> str:
+    """Convert to str and truncate to limit characters, skipping the copy when it already fits."""
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit]
+
+
+@dataclass(slots=True)
 class ReasoningStep:
     """A single step in the agent's reasoning trace."""
     step_number: int
@@ -18,7 +32,7 @@ class ReasoningStep:
     content: str            # The actual text
     tool_name: str | None = None
     tool_input: dict | None = None
-    tool_output: str | None = None
+    tool_output: str | None = None     # Stored already clipped to 500 chars
     confidence: float | None = None
     timestamp: datetime = field(default_factory=datetime.now)
     
@@ -31,7 +45,7 @@ class ReasoningStep:
             "content": self.content,
             "tool_name": self.tool_name,
             "tool_input": str(self.tool_input) if self.tool_input else None,
-            "tool_output": self.tool_output[:500] if self.tool_output else None,
+            "tool_output": self.tool_output or None,
             "confidence": self.confidence,
             "timestamp": self.timestamp.isoformat(),
         }
@@ -41,16 +55,42 @@ class ReasoningCallbackHandler(BaseCallbackHandler):
     """
     Captures agent reasoning steps for dashboard display.
     
-    Collects Thought/Action/Observation steps from the ReAct agent loop
-    and stores them as ReasoningStep objects.
+    Collects Thought/Action/Observation steps from the ReAct agent loop.
+    Steps are stored directly in their serialized (ReasoningStep.to_dict) form,
+    since the trace is only ever consumed as dicts.
     """
     
     def __init__(self, agent_name: str = "Agent"):
         self.agent_name = agent_name
-        self.steps: list[ReasoningStep] = []
+        self.steps: list[dict] = []
         self.step_counter = 0
         self._current_tool_name = None
         self._current_tool_input = None
+        self._has_final_answer = False
+    
+    def _add_step(
+        self,
+        step_type: str,
+        content: str,
+        tool_name: str | None = None,
+        tool_input: dict | None = None,
+        tool_output: str | None = None,
+    ) -> None:
+        """Append a step in the same shape as ReasoningStep.to_dict()."""
+        self.step_counter += 1
+        self.steps.append({
+            "step_number": self.step_counter,
+            "step_type": step_type,
+            "agent_name": self.agent_name,
+            "content": content,
+            "tool_name": tool_name,
+            "tool_input": str(tool_input) if tool_input else None,
+            "tool_output": tool_output or None,
+            "confidence": None,
+            "timestamp": datetime.now().isoformat(),
+        })
+        if step_type == "final_answer":
+            self._has_final_answer = True
     
     def on_llm_start(self, serialized: dict, prompts: list[str], **kwargs: Any) -> None:
         pass
@@ -59,27 +99,9 @@ class ReasoningCallbackHandler(BaseCallbackHandler):
         """Capture the agent's thought/reasoning."""
         try:
             text = response.generations[0][0].text
-            if text.strip():
-                # Parse thought from ReAct output
-                lines = text.strip().split("\n")
-                for line in lines:
-                    line = line.strip()
-                    if line.lower().startswith("thought:"):
-                        self.step_counter += 1
-                        self.steps.append(ReasoningStep(
-                            step_number=self.step_counter,
-                            step_type="thought",
-                            agent_name=self.agent_name,
-                            content=line.replace("Thought:", "").strip(),
-                        ))
-                    elif line.lower().startswith("final answer:"):
-                        self.step_counter += 1
-                        self.steps.append(ReasoningStep(
-                            step_number=self.step_counter,
-                            step_type="final_answer",
-                            agent_name=self.agent_name,
-                            content=line.replace("Final Answer:", "").strip(),
-                        ))
+            # Parse thought / final answer lines from ReAct output in one scan
+            for match in _REACT_LINE_RE.finditer(text):
+                self._add_step(_REACT_STEP_TYPES[match.group(1).lower()], match.group(2))
         except (IndexError, AttributeError):
             pass
     
@@ -88,48 +110,38 @@ class ReasoningCallbackHandler(BaseCallbackHandler):
         self._current_tool_name = serialized.get("name", "unknown_tool")
         self._current_tool_input = input_str
         
-        self.step_counter += 1
-        self.steps.append(ReasoningStep(
-            step_number=self.step_counter,
-            step_type="action",
-            agent_name=self.agent_name,
-            content=f"Calling tool: {self._current_tool_name}",
+        self._add_step(
+            "action",
+            f"Calling tool: {self._current_tool_name}",
             tool_name=self._current_tool_name,
             tool_input={"input": input_str},
-        ))
+        )
     
     def on_tool_end(self, output: str, **kwargs: Any) -> None:
         """Capture the observation (tool output)."""
-        self.step_counter += 1
-        self.steps.append(ReasoningStep(
-            step_number=self.step_counter,
-            step_type="observation",
-            agent_name=self.agent_name,
-            content=str(output)[:1000],
+        output_str = clip_text(output, 1000)
+        self._add_step(
+            "observation",
+            output_str,
             tool_name=self._current_tool_name,
-            tool_output=str(output)[:1000],
-        ))
+            tool_output=clip_text(output_str, 500),
+        )
     
     def on_agent_finish(self, finish: Any, **kwargs: Any) -> None:
         """Capture the final answer if not already captured."""
         try:
             output = finish.return_values.get("output", "")
-            if output and not any(s.step_type == "final_answer" for s in self.steps):
-                self.step_counter += 1
-                self.steps.append(ReasoningStep(
-                    step_number=self.step_counter,
-                    step_type="final_answer",
-                    agent_name=self.agent_name,
-                    content=str(output),
-                ))
+            if output and not self._has_final_answer:
+                self._add_step("final_answer", str(output))
         except AttributeError:
             pass
     
     def get_trace(self) -> list[dict]:
         """Get the full reasoning trace as a list of dicts."""
-        return [step.to_dict() for step in self.steps]
+        return list(self.steps)
     
     def clear(self):
         """Clear the trace for a new run."""
         self.steps = []
         self.step_counter = 0
+        self._has_final_answer = False
@@ -2,11 +2,77 @@
 Improvement Agent
 Uses LangGraph ReAct reasoning to identify alignment gaps and suggest actionable improvements.
 """
-from langchain_openai import ChatOpenAI
+from contextvars import ContextVar
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
-from src.config import OPENAI_API_KEY, LLM_MODEL, STRATEGIC_OBJECTIVES
+from src.config import STRATEGIC_OBJECTIVES
 from src.agents.callbacks import ReasoningCallbackHandler
+from src.agents.llm import get_agent_llm
+from src.util.http_clients import per_event_loop
+from src.agents.trace import build_trace_from_messages
+from src.agents.tool_context import bound_tools
+from src.agents.trajectory import elide_stale_tool_outputs
+
+
+# Per-run tool implementations. The tools and the compiled agent graph below are
+# shared by every run; each run binds its own functions here. ContextVars are
+# task-local, so concurrent runs under asyncio.gather don't see each other's.
+_gap_identifier_fn: ContextVar = ContextVar("improvement_gap_identifier_fn")
+_retrieve_fn: ContextVar = ContextVar("improvement_retrieve_fn")
+_suggest_fn: ContextVar = ContextVar("improvement_suggest_fn")
+
+
+@tool
+def identify_gaps(objective_id: str) -> str:
+    """Identify alignment gaps (KPIs without actions, low progress areas). Input: objective ID (e.g., 'SO1'). Returns list of gaps."""
+    return _gap_identifier_fn.get()(objective_id)
+
+
+@tool
+def retrieve_context(objective_id: str) -> str:
+    """Retrieve existing action plan context for reference. Input: objective ID. Returns relevant action plan chunks."""
+    return _retrieve_fn.get()(objective_id)
+
+
+@tool
+def generate_suggestion(gap_description: str) -> str:
+    """Generate a specific improvement suggestion for a gap. Input: description of the gap. Returns detailed suggestion."""
+    return _suggest_fn.get()(gap_description)
+
+
+# Returned by the gap identification tool when an objective has no gaps
+NO_GAPS_MESSAGE = "No gaps identified."
+
+IMPROVEMENT_TOOLS = [identify_gaps, retrieve_context, generate_suggestion]
+
+# Static system prompt: byte-identical across runs so the provider-side prompt
+# prefix cache can be reused between objectives
+IMPROVEMENT_SYSTEM_PROMPT = """You are the Improvement Suggestion Agent for the ISPS system.
+Your job is to identify alignment gaps and suggest specific, actionable improvements
+for the GreenField University strategic plan synchronization.
+
+Tool outputs list records in a columnar layout: a header line "name: field|field|..."
+followed by one pipe-delimited row per record, in the same field order.
+
+For each gap found, provide:
+- GAP: [description]
+- SUGGESTED_ACTION: [specific new action]
+- OWNER: [suggested responsible person/department]
+- TIMELINE: [realistic timeline]
+- IMPACT: [High|Medium|Low]
+- REASONING: [why this improvement would help]"""
+
+
+@per_event_loop
+def _get_improvement_agent():
+    """Build the ReAct improvement agent once per event loop and reuse the compiled graph."""
+    llm = get_agent_llm(temperature=0.5)
+    
+    return create_react_agent(
+        llm, IMPROVEMENT_TOOLS,
+        prompt=IMPROVEMENT_SYSTEM_PROMPT,
+        pre_model_hook=elide_stale_tool_outputs,
+    )
 
 
 def run_improvement_analysis(
@@ -22,103 +88,107 @@ def run_improvement_analysis(
         Dict with improvement suggestions and reasoning trace
     """
     callback = ReasoningCallbackHandler(agent_name="ImprovementAgent")
-    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
-    
-    @tool
-    def identify_gaps(objective_id: str) -> str:
-        """Identify alignment gaps (KPIs without actions, low progress areas). Input: objective ID (e.g., 'SO1'). Returns list of gaps."""
-        return gap_identifier_fn(objective_id)
-    
-    @tool
-    def retrieve_context(objective_id: str) -> str:
-        """Retrieve existing action plan context for reference. Input: objective ID. Returns relevant action plan chunks."""
-        return retrieve_fn(objective_id)
+    agent = _get_improvement_agent()
+    # Nothing to improve: skip the ReAct loop entirely
+    if gap_identifier_fn(objective_id) == NO_GAPS_MESSAGE:
+        return _no_gaps_result(objective_id)
     
-    @tool
-    def generate_suggestion(gap_description: str) -> str:
-        """Generate a specific improvement suggestion for a gap. Input: description of the gap. Returns detailed suggestion."""
-        return suggest_fn(gap_description)
-    
-    tools = [identify_gaps, retrieve_context, generate_suggestion]
+    with _tool_bindings(gap_identifier_fn, retrieve_fn, suggest_fn):
+        try:
+            result = agent.invoke(
+                _agent_input(objective_id),
+                config={"callbacks": [callback]},
+            )
+            return _build_result(objective_id, result, callback)
+        
+        except Exception as e:
+            return _error_result(objective_id, e, callback)
+
+
+async def arun_improvement_analysis(
+    objective_id: str,
+    gap_identifier_fn,
+    retrieve_fn,
+    suggest_fn,
+) -> dict:
+    """
+    Async variant of run_improvement_analysis, driven through the agent's ainvoke path.
     
-    llm = ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=0.5,
-        api_key=OPENAI_API_KEY,
-    )
+    Returns:
+        Dict with improvement suggestions and reasoning trace
+    """
+    callback = ReasoningCallbackHandler(agent_name="ImprovementAgent")
+    agent = _get_improvement_agent()
+    # Nothing to improve: skip the ReAct loop entirely
+    if gap_identifier_fn(objective_id) == NO_GAPS_MESSAGE:
+        return _no_gaps_result(objective_id)
     
-    system_message = f"""You are the Improvement Suggestion Agent for the ISPS system.
-Your job is to identify alignment gaps and suggest specific, actionable improvements
-for the GreenField University strategic plan synchronization.
+    with _tool_bindings(gap_identifier_fn, retrieve_fn, suggest_fn):
+        try:
+            result = await agent.ainvoke(
+                _agent_input(objective_id),
+                config={"callbacks": [callback]},
+            )
+            return _build_result(objective_id, result, callback)
+        
+        except Exception as e:
+            return _error_result(objective_id, e, callback)
 
-For each gap found, provide:
-- GAP: [description]
-- SUGGESTED_ACTION: [specific new action]
-- OWNER: [suggested responsible person/department]
-- TIMELINE: [realistic timeline]
-- IMPACT: [High|Medium|Low]
-- REASONING: [why this improvement would help]"""
+
+def _tool_bindings(gap_identifier_fn, retrieve_fn, suggest_fn):
+    """Bind this run's tool implementations for the duration of the agent call."""
+    return bound_tools({
+        _gap_identifier_fn: gap_identifier_fn,
+        _retrieve_fn: retrieve_fn,
+        _suggest_fn: suggest_fn,
+    })
+
+
+def _agent_input(objective_id: str) -> dict:
+    """Build the initial message state for the agent."""
+    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
+    input_text = f"Identify gaps and suggest improvements for {objective_id}: {objective_name}"
+    return {"messages": [{"role": "user", "content": input_text}]}
+
+
+def _build_result(objective_id: str, result: dict, callback: ReasoningCallbackHandler) -> dict:
+    """Extract suggestions and reasoning trace from the agent's final state."""
+    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
     
-    agent = create_react_agent(llm, tools, prompt=system_message)
+    # Extract the final message
+    messages = result.get("messages", [])
+    output = ""
+    for msg in reversed(messages):
+        if hasattr(msg, "content") and msg.content and getattr(msg, "type", "") == "ai":
+            output = msg.content
+            break
     
-    input_text = f"Identify gaps and suggest improvements for {objective_id}: {objective_name}"
+    trace = build_trace_from_messages(messages, "ImprovementAgent", callback)
     
-    try:
-        result = agent.invoke(
-            {"messages": [{"role": "user", "content": input_text}]},
-            config={"callbacks": [callback]},
-        )
-        
-        # Extract the final message
-        messages = result.get("messages", [])
-        output = ""
-        for msg in reversed(messages):
-            if hasattr(msg, "content") and msg.content and getattr(msg, "type", "") == "ai":
-                output = msg.content
-                break
-        
-        # Build trace
-        trace = []
-        step_num = 0
-        for msg in messages:
-            step_num += 1
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                for tc in msg.tool_calls:
-                    trace.append({
-                        "step_number": step_num,
-                        "step_type": "action",
-                        "agent_name": "ImprovementAgent",
-                        "content": f"Calling tool: {tc.get('name', 'unknown')}",
-                        "tool_name": tc.get("name", ""),
-                    })
-            elif hasattr(msg, "type") and msg.type == "tool":
-                trace.append({
-                    "step_number": step_num,
-                    "step_type": "observation",
-                    "agent_name": "ImprovementAgent",
-                    "content": str(msg.content)[:500],
-                    "tool_output": str(msg.content)[:500],
-                })
-            elif hasattr(msg, "content") and msg.content and getattr(msg, "type", "") == "ai":
-                trace.append({
-                    "step_number": step_num,
-                    "step_type": "final_answer" if msg == messages[-1] else "thought",
-                    "agent_name": "ImprovementAgent",
-                    "content": str(msg.content)[:500],
-                })
-        
-        return {
-            "objective_id": objective_id,
-            "objective_name": objective_name,
-            "suggestions": output,
-            "reasoning_trace": trace if trace else callback.get_trace(),
-        }
-        
-    except Exception as e:
-        return {
-            "objective_id": objective_id,
-            "objective_name": objective_name,
-            "suggestions": f"Agent encountered an error: {str(e)}",
-            "reasoning_trace": callback.get_trace(),
-            "error": str(e),
-        }
+    return {
+        "objective_id": objective_id,
+        "objective_name": objective_name,
+        "suggestions": output,
+        "reasoning_trace": trace,
+    }
+
+
+def _no_gaps_result(objective_id: str) -> dict:
+    """Canned result for an objective with no alignment gaps."""
+    return {
+        "objective_id": objective_id,
+        "objective_name": STRATEGIC_OBJECTIVES.get(objective_id, "Unknown"),
+        "suggestions": NO_GAPS_MESSAGE,
+        "reasoning_trace": [],
+    }
+
+
+def _error_result(objective_id: str, e: Exception, callback: ReasoningCallbackHandler) -> dict:
+    """Fallback result when the agent run fails."""
+    return {
+        "objective_id": objective_id,
+        "objective_name": STRATEGIC_OBJECTIVES.get(objective_id, "Unknown"),
+        "suggestions": f"Agent encountered an error: {str(e)}",
+        "reasoning_trace": callback.get_trace(),
+        "error": str(e),
+    }
@@ -0,0 +1,21 @@
+"""
+Shared Agent LLM Clients
+One ChatOpenAI instance per temperature and event loop, reused by every agent
+run so requests share the pooled HTTP clients (keep-alive and TLS session reuse).
+"""
+from langchain_openai import ChatOpenAI
+from src.config import OPENAI_API_KEY, LLM_MODEL, LLM_CLIENT_MAX_RETRIES
+from src.util.http_clients import get_http_client, get_async_http_client, per_event_loop
+
+
+@per_event_loop
+def get_agent_llm(temperature: float) -> ChatOpenAI:
+    """Get the shared agent LLM for a given temperature."""
+    return ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=temperature,
+        api_key=OPENAI_API_KEY,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=LLM_CLIENT_MAX_RETRIES,
+    )
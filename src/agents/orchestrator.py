@@ -3,22 +3,32 @@ Agentic Orchestrator
 Coordinates the sync and improvement agents, runs full analysis pipeline,
 and manages the overall reasoning flow.
 """
+import asyncio
+import hashlib
+import io
 import json
 import random
-from src.config import STRATEGIC_OBJECTIVES
-from src.agents.sync_agent import run_sync_assessment
-from src.agents.improvement_agent import run_improvement_analysis
+from functools import lru_cache
+from typing import AsyncIterator
+from src.config import STRATEGIC_OBJECTIVES, LLM_MAX_CONCURRENCY, SPECULATIVE_IMPROVEMENT
+from src.agents.sync_agent import arun_sync_assessment
+from src.agents.improvement_agent import arun_improvement_analysis, NO_GAPS_MESSAGE
 from src.agents.callbacks import ReasoningCallbackHandler
 from src.rag.retriever import retrieve_for_objective
 from src.rag.chains import (
-    generate_executive_summary,
-    generate_guidance_messages,
+    astream_executive_summary,
+    agenerate_guidance_messages_many,
     suggest_improvements,
 )
+from src.util.kpis import describe_kpis
 from src.ontology.alignment import get_ontology_mapping, identify_gaps, compute_ontology_alignment
+from src.util.http_clients import run_async
 
+# Max characters of each retrieved chunk included in a retrieval tool observation
+TOOL_CHUNK_MAX_CHARS = 500
 
-def run_full_analysis(knowledge_graph, progress_callback=None) -> dict:
+
+def run_full_analysis(knowledge_graph, progress_callback=None, event_callback=None) -> dict:
     """
     Run the complete synchronization analysis across all objectives.
     
@@ -29,13 +39,49 @@ def run_full_analysis(knowledge_graph, progress_callback=None) -> dict:
     4. Executive summary generation
     5. Guidance message generation
     
+    Objectives are analyzed concurrently (see astream_full_analysis); this wrapper
+    drives the event loop for synchronous callers such as the dashboard.
+    
     Args:
         knowledge_graph: RDF graph with the knowledge base
         progress_callback: Optional callback(objective_id, status) for progress updates
+        event_callback: Optional callback(event) receiving each streamed partial result
         
     Returns:
         Complete analysis results dict
     """
+    return run_async(arun_full_analysis(knowledge_graph, progress_callback, event_callback))
+
+
+async def arun_full_analysis(knowledge_graph, progress_callback=None, event_callback=None) -> dict:
+    """
+    Async implementation of run_full_analysis.
+    
+    Drains astream_full_analysis, forwarding every event to event_callback,
+    and returns the final results.
+    """
+    results = None
+    async for event in astream_full_analysis(knowledge_graph, progress_callback):
+        if event_callback:
+            event_callback(event)
+        if event["type"] == "complete":
+            results = event["results"]
+    return results
+
+
+async def astream_full_analysis(knowledge_graph, progress_callback=None) -> AsyncIterator[dict]:
+    """
+    Run the full analysis, yielding partial results as soon as they exist.
+    
+    The per-objective pipelines are independent and LLM-bound, so they are fanned out
+    concurrently behind a semaphore of LLM_MAX_CONCURRENCY. progress_callback
+    is only ever invoked from the event loop thread, so calls never overlap.
+    
+    Yields event dicts, in order:
+        {"type": "objective", "objective_id", "objective", "traces"} per objective, as each finishes
+        {"type": "summary_delta", "delta"} for each streamed executive summary token
+        {"type": "complete", "results"} once with the complete results dict
+    """
     results = {
         "objectives": {},
         "overall_score": 0.0,
@@ -48,165 +94,356 @@ def run_full_analysis(knowledge_graph, progress_callback=None) -> dict:
     # Step 1: Compute ontology-based alignment
     ontology_alignment = compute_ontology_alignment(knowledge_graph)
     
-    # Step 2: Run agent-based analysis per objective
+    # Pre-materialize every objective's ontology mapping and gaps in one pass so
+    # agent tool calls become dict lookups instead of graph walks
+    kg_views = _precompute_kg_views(knowledge_graph)
+    
+    # Step 2: Run agent-based analysis per objective (concurrently)
+    semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    
+    async def analyze(obj_id, obj_name):
+        return obj_id, await _analyze_objective(
+            knowledge_graph, obj_id, obj_name,
+            ontology_alignment, kg_views, semaphore, progress_callback,
+        )
+    
+    completed = {}
+    for next_done in asyncio.as_completed([
+        analyze(obj_id, obj_name) for obj_id, obj_name in STRATEGIC_OBJECTIVES.items()
+    ]):
+        obj_id, (objective_data, traces) = await next_done
+        completed[obj_id] = (objective_data, traces)
+        yield {"type": "objective", "objective_id": obj_id, "objective": objective_data, "traces": traces}
+    
+    # Keep results in STRATEGIC_OBJECTIVES order regardless of completion order
     total_score = 0.0
+    weak_count = 0
+    for obj_id in STRATEGIC_OBJECTIVES:
+        objective_data, traces = completed[obj_id]
+        results["objectives"][obj_id] = objective_data
+        results["reasoning_traces"][obj_id] = traces
+        total_score += objective_data["combined_score"]
+        weak_count += objective_data["combined_score"] < 0.6
+    # Objectives needing attention, shown on the dashboard overview
+    results["_weak_count"] = weak_count
+    
+    # Step 3: Compute overall score
+    n_objectives = len(STRATEGIC_OBJECTIVES)
+    results["overall_score"] = round(total_score / n_objectives, 3) if n_objectives > 0 else 0
+    
+    if results["overall_score"] >= 0.75:
+        results["overall_level"] = "Full"
+    elif results["overall_score"] >= 0.50:
+        results["overall_level"] = "Partial"
+    elif results["overall_score"] >= 0.25:
+        results["overall_level"] = "Weak"
+    else:
+        results["overall_level"] = "Missing"
+    
+    # Step 4: Generate executive summary and guidance messages.
+    # These are independent LLM calls that only need the scores, so every
+    # objective's guidance runs in the background while the summary streams.
+    # Both take slots from the shared semaphore, keeping the run within
+    # LLM_MAX_CONCURRENCY requests in flight.
+    sync_summary = "\n".join([
+        f"- {oid}: {data['combined_score']:.1%} ({data['sync_assessment'].get('alignment_level', 'Unknown')})"
+        for oid, data in results["objectives"].items()
+    ])
+    
+    guidance_task = asyncio.ensure_future(agenerate_guidance_messages_many([
+        {
+            "objective_id": oid,
+            "objective_name": STRATEGIC_OBJECTIVES[oid],
+            "alignment_score": data["combined_score"],
+            "alignment_level": data["sync_assessment"].get("alignment_level", "Partial"),
+            "gaps": kg_views[oid]["gaps_compact"],
+        }
+        for oid, data in results["objectives"].items()
+    ], semaphore=semaphore))
+    
+    summary_parts = []
+    async with semaphore:
+        async for delta in astream_executive_summary(sync_summary):
+            summary_parts.append(delta)
+            yield {"type": "summary_delta", "delta": delta}
+    results["executive_summary"] = "".join(summary_parts)
+    
+    guidance_lists = await guidance_task
+    for oid, guidance in zip(results["objectives"], guidance_lists):
+        results["objectives"][oid]["guidance_messages"] = guidance
+    
+    # Collect all guidance messages
+    results["guidance_messages"] = {
+        oid: data.get("guidance_messages", [])
+        for oid, data in results["objectives"].items()
+    }
+    
+    yield {"type": "complete", "results": results}
+
+
+async def _analyze_objective(
+    knowledge_graph,
+    obj_id: str,
+    obj_name: str,
+    ontology_alignment: dict,
+    kg_views: dict,
+    semaphore: asyncio.Semaphore,
+    progress_callback=None,
+) -> tuple[dict, dict]:
+    """
+    Run sync assessment and improvement suggestions for one objective.
     
-    for obj_id, obj_name in STRATEGIC_OBJECTIVES.items():
+    Returns:
+        Tuple of (objective results dict, reasoning traces dict)
+    """
+    async with semaphore:
         if progress_callback:
             progress_callback(obj_id, "Analyzing...")
         
-        # Create tool functions for this objective
+        # Create tool functions for this objective.
+        # KG-backed tools read from the pre-pass; retrieval and suggestions are
+        # memoized because both agents call them repeatedly with the same input.
+        def kg_view(oid):
+            view = kg_views.get(oid)
+            if view is None:
+                # The agent asked about an objective outside the pre-pass
+                view = kg_views[oid] = _build_kg_view(knowledge_graph, oid)
+            return view
+        
+        @lru_cache(maxsize=None)
         def retrieve_fn(oid=obj_id):
-            chunks = retrieve_for_objective(oid, STRATEGIC_OBJECTIVES[oid])
-            return "\n\n---\n\n".join([
-                f"[Chunk {i+1}] (score: {c.get('score', 'N/A'):.3f})\n{c['text']}"
-                for i, c in enumerate(chunks)
-            ])
+            return _format_chunks(_dedupe_chunks(retrieve_for_objective(oid, STRATEGIC_OBJECTIVES[oid])))
         
         def ontology_fn(oid=obj_id):
-            mapping = get_ontology_mapping(knowledge_graph, oid)
-            return json.dumps(mapping, indent=2, default=str)
+            return kg_view(oid)["ontology_text"]
         
         def kpi_coverage_fn(oid=obj_id):
-            mapping = get_ontology_mapping(knowledge_graph, oid)
-            lines = [f"Objective: {oid} - {STRATEGIC_OBJECTIVES[oid]}"]
-            lines.append(f"Total KPIs: {len(mapping.get('kpis', []))}")
-            lines.append(f"Total Actions: {len(mapping.get('actions', []))}")
-            lines.append("\nKPIs to evaluate (decide if each is adequately covered by the actions):")
-            for kpi in mapping.get('kpis', []):
-                lines.append(f"  - {kpi.get('id','?')}: {kpi.get('title','?')} (Baseline: {kpi.get('baseline','?')}, Target: {kpi.get('target','?')})")
-            lines.append("\nActions available:")
-            for act in mapping.get('actions', []):
-                lines.append(f"  - {act.get('id','?')}: {act.get('title','?')} (Progress: {act.get('progress','?')}%, Owner: {act.get('owner','?')})")
-            return "\n".join(lines)
+            return kg_view(oid)["kpi_coverage_text"]
         
         def gap_fn(oid=obj_id):
-            gaps = identify_gaps(knowledge_graph, oid)
-            return json.dumps(gaps, indent=2, default=str) if gaps else "No gaps identified."
+            return kg_view(oid)["gaps_text"]
         
+        @lru_cache(maxsize=None)
         def suggest_fn(gap_desc):
             return suggest_improvements(
                 obj_id, obj_name,
-                gaps=gap_desc,
-                current_actions=retrieve_fn(),
+                gaps=gap_desc.strip(),
+                current_actions=retrieve_fn(obj_id),
             )
         
-        # Run sync assessment agent
-        sync_result = run_sync_assessment(
-            obj_id, retrieve_fn, ontology_fn, kpi_coverage_fn
-        )
+        # Objectives without gaps never need the improvement agent
+        has_gaps = bool(kg_view(obj_id)["gaps"])
         
-        # Recalculate agent score using the agent's KPI coverage findings
-        # LLMs are poor at well-calibrated float scores, so we derive it
-        covered_kpis = sync_result.get("covered_kpis", [])
-        uncovered_kpis = sync_result.get("uncovered_kpis", [])
-        total_kpis = len(covered_kpis) + len(uncovered_kpis)
+        # The improvement agent's inputs don't depend on the sync result, so start it
+        # speculatively alongside the sync agent and cancel it if the objective
+        # turns out to be well aligned. It only starts when a semaphore slot is
+        # free (acquired without waiting, so no objective blocks on another's
+        # slot), keeping agent runs within LLM_MAX_CONCURRENCY.
+        improvement_task = None
+        if SPECULATIVE_IMPROVEMENT and has_gaps and not semaphore.locked():
+            await semaphore.acquire()
+            
+            async def speculative_improvement():
+                try:
+                    return await arun_improvement_analysis(obj_id, gap_fn, retrieve_fn, suggest_fn)
+                finally:
+                    semaphore.release()
+            improvement_task = asyncio.create_task(speculative_improvement())
         
-        if total_kpis > 0:
-            kpi_ratio = len(covered_kpis) / total_kpis
-            # Blend: 80% from KPI coverage ratio (objective), 20% from LLM raw score (subjective)
-            raw_llm_score = sync_result.get("alignment_score", 0.5)
-            agent_score = (0.8 * kpi_ratio) + (0.2 * raw_llm_score)
+        try:
+            # Run sync assessment agent
+            sync_result = await arun_sync_assessment(
+                obj_id, retrieve_fn, ontology_fn, kpi_coverage_fn
+            )
+            
+            # Recalculate agent score using the agent's KPI coverage findings
+            # LLMs are poor at well-calibrated float scores, so we derive it
+            covered_count = sync_result.get("covered_count", 0)
+            total_kpis = covered_count + sync_result.get("uncovered_count", 0)
             
-            # Priority Boost removed as requested by user.
-            # Scores now reflect raw KPI coverage and content alignment.
+            if total_kpis > 0:
+                kpi_ratio = covered_count / total_kpis
+                # Blend: 80% from KPI coverage ratio (objective), 20% from LLM raw score (subjective)
+                raw_llm_score = sync_result.get("alignment_score", 0.5)
+                agent_score = (0.8 * kpi_ratio) + (0.2 * raw_llm_score)
+                
+                # Priority Boost removed as requested by user.
+                # Scores now reflect raw KPI coverage and content alignment.
 
+                    
+                agent_score = round(min(1.0, max(0.0, agent_score)), 3)
+                sync_result["alignment_score"] = agent_score
                 
-            agent_score = round(min(1.0, max(0.0, agent_score)), 3)
-            sync_result["alignment_score"] = agent_score
+            else:
+                agent_score = sync_result.get("alignment_score", 0.5)
             
-        else:
-            agent_score = sync_result.get("alignment_score", 0.5)
-        
-        # Combine agent score with ontology score
-        ontology_score = ontology_alignment.get(obj_id, {}).get("alignment_score", 0.5)
-        # Increased agent weight to 0.8 as LLM semantic understanding is key
-        combined_score = (0.8 * agent_score) + (0.2 * ontology_score)
-        
-        sync_result["combined_score"] = round(combined_score, 3)
-        sync_result["ontology_score"] = ontology_score
-        sync_result["ontology_data"] = ontology_alignment.get(obj_id, {})
-
-        # Determine alignment level based on combined score
-        if combined_score >= 0.8:
-            sync_result["alignment_level"] = "Full"
-        elif combined_score >= 0.6:
-            sync_result["alignment_level"] = "Partial"
-        elif combined_score >= 0.4:
-            sync_result["alignment_level"] = "Weak"
-        else:
-            sync_result["alignment_level"] = "Missing"
-        
-        # Run improvement agent for weak alignments
-        improvement_result = None
-        if combined_score < 0.7:
-            if progress_callback:
-                progress_callback(obj_id, "Generating improvements...")
+            # Combine agent score with ontology score
+            ontology_score = ontology_alignment.get(obj_id, {}).get("alignment_score", 0.5)
+            # Increased agent weight to 0.8 as LLM semantic understanding is key
+            combined_score = (0.8 * agent_score) + (0.2 * ontology_score)
             
-            improvement_result = run_improvement_analysis(
-                obj_id, gap_fn, retrieve_fn, suggest_fn
-            )
-        
-        # Generate guidance messages
-        gaps_str = json.dumps(
-            identify_gaps(knowledge_graph, obj_id),
-            default=str
-        )
-        
-        guidance = generate_guidance_messages(
-            obj_id, obj_name, combined_score,
-            sync_result.get("alignment_level", "Partial"),
-            gaps_str,
-        )
-        
-        # Store results
-        results["objectives"][obj_id] = {
-            "sync_assessment": sync_result,
-            "improvements": improvement_result,
-            "guidance_messages": guidance,
-            "combined_score": combined_score,
-            "ontology_score": ontology_score,
-            "ontology_data": ontology_alignment.get(obj_id, {}),
-        }
-        
-        results["reasoning_traces"][obj_id] = {
-            "sync_trace": sync_result.get("reasoning_trace", []),
-            "improvement_trace": (
-                improvement_result.get("reasoning_trace", [])
-                if improvement_result else []
-            ),
-        }
-        
-        total_score += combined_score
+            sync_result["combined_score"] = round(combined_score, 3)
+            sync_result["ontology_score"] = ontology_score
+            sync_result["ontology_data"] = ontology_alignment.get(obj_id, {})
+
+            # Determine alignment level based on combined score
+            if combined_score >= 0.8:
+                sync_result["alignment_level"] = "Full"
+            elif combined_score >= 0.6:
+                sync_result["alignment_level"] = "Partial"
+            elif combined_score >= 0.4:
+                sync_result["alignment_level"] = "Weak"
+            else:
+                sync_result["alignment_level"] = "Missing"
+            
+            # Run improvement agent for weak alignments
+            improvement_result = None
+            if combined_score < 0.7 and not has_gaps:
+                improvement_result = {
+                    "objective_id": obj_id,
+                    "objective_name": obj_name,
+                    "suggestions": NO_GAPS_MESSAGE,
+                    "reasoning_trace": [],
+                }
+            elif combined_score < 0.7:
+                if progress_callback:
+                    progress_callback(obj_id, "Generating improvements...")
+                
+                if improvement_task is not None:
+                    improvement_result = await improvement_task
+                    improvement_task = None
+                else:
+                    improvement_result = await arun_improvement_analysis(
+                        obj_id, gap_fn, retrieve_fn, suggest_fn
+                    )
+        finally:
+            # Not needed, or the sync step failed: don't leave it running
+            if improvement_task is not None:
+                improvement_task.cancel()
+                await asyncio.gather(improvement_task, return_exceptions=True)
         
         if progress_callback:
             progress_callback(obj_id, f"Done (score: {combined_score:.1%})")
     
-    # Step 3: Compute overall score
-    n_objectives = len(STRATEGIC_OBJECTIVES)
-    results["overall_score"] = round(total_score / n_objectives, 3) if n_objectives > 0 else 0
+    # Descriptions are resolved here once so the dashboard only formats them
+    sync_result["covered_kpis_rendered"] = describe_kpis(sync_result.get("covered_kpis", []))
+    sync_result["uncovered_kpis_rendered"] = describe_kpis(sync_result.get("uncovered_kpis", []))
     
-    if results["overall_score"] >= 0.75:
-        results["overall_level"] = "Full"
-    elif results["overall_score"] >= 0.50:
-        results["overall_level"] = "Partial"
-    elif results["overall_score"] >= 0.25:
-        results["overall_level"] = "Weak"
-    else:
-        results["overall_level"] = "Missing"
-    
-    # Step 4: Generate executive summary
-    sync_summary = "\n".join([
-        f"- {oid}: {data['combined_score']:.1%} ({data['sync_assessment'].get('alignment_level', 'Unknown')})"
-        for oid, data in results["objectives"].items()
-    ])
-    
-    results["executive_summary"] = generate_executive_summary(sync_summary)
+    objective_data = {
+        "sync_assessment": sync_result,
+        "improvements": improvement_result,
+        "guidance_messages": [],  # Filled in by the batched guidance step
+        "combined_score": combined_score,
+        "ontology_score": ontology_score,
+        "ontology_data": ontology_alignment.get(obj_id, {}),
+    }
     
-    # Collect all guidance messages
-    results["guidance_messages"] = {
-        oid: data.get("guidance_messages", [])
-        for oid, data in results["objectives"].items()
+    traces = {
+        "sync_trace": sync_result.get("reasoning_trace", []),
+        "improvement_trace": (
+            improvement_result.get("reasoning_trace", [])
+            if improvement_result else []
+        ),
     }
     
-    return results
+    return objective_data, traces
+
+
+def _dedupe_chunks(chunks: list[dict]) -> list[dict]:
+    """Drop chunks whose text was already returned (e.g. by another chunking strategy)."""
+    seen = set()
+    unique = []
+    for c in chunks:
+        key = hashlib.md5(c["text"].encode("utf-8")).digest()
+        if key not in seen:
+            seen.add(key)
+            unique.append(c)
+    return unique
+
+
+def _format_chunks(chunks: list[dict]) -> str:
+    """Render retrieved chunks as the retrieval tool observation."""
+    out = io.StringIO()
+    for i, c in enumerate(chunks):
+        if i:
+            out.write("\n\n---\n\n")
+        score = c.get("score")
+        score_text = f"{score:.3f}" if isinstance(score, (int, float)) else "N/A"
+        out.write(f"[Chunk {i+1}] (score: {score_text})\n")
+        out.write(c["text"][:TOOL_CHUNK_MAX_CHARS])
+    return out.getvalue()
+
+
+def _precompute_kg_views(knowledge_graph) -> dict:
+    """Build the KG-derived tool outputs for every strategic objective."""
+    return {oid: _build_kg_view(knowledge_graph, oid) for oid in STRATEGIC_OBJECTIVES}
+
+
+def _build_kg_view(knowledge_graph, oid: str) -> dict:
+    """
+    Query the ontology mapping and gaps for one objective and pre-serialize
+    the strings the agent tools return.
+    """
+    mapping = get_ontology_mapping(knowledge_graph, oid)
+    gaps = identify_gaps(knowledge_graph, oid)
+    return {
+        "mapping": mapping,
+        "gaps": gaps,
+        "ontology_text": _format_ontology_mapping(oid, mapping),
+        "kpi_coverage_text": _format_kpi_coverage(oid, mapping),
+        "gaps_text": _format_gaps(gaps) if gaps else NO_GAPS_MESSAGE,
+        "gaps_compact": json.dumps(gaps, default=str),
+    }
+
+
+# Tool outputs use a columnar layout: a "name: field|field|..." header once,
+# then one pipe-delimited row per record. Field names are not repeated per row,
+# which keeps the observations the agents re-read on every ReAct step short.
+
+def _columnar(name: str, fields: list[str], records: list[dict]) -> list[str]:
+    """Render records as a header line followed by pipe-delimited rows."""
+    lines = [f"{name}: {'|'.join(fields)}"]
+    for record in records:
+        lines.append("|".join(
+            str(record.get(f, "?")).replace("|", "/").replace("\n", " ")
+            for f in fields
+        ))
+    return lines
+
+
+def _format_ontology_mapping(oid: str, mapping: dict) -> str:
+    """Format the ontology mapping tool output."""
+    lines = [f"Objective: {oid} - {mapping.get('objective_name', 'Unknown')}"]
+    lines.extend(_columnar("kpis", ["id", "title", "baseline", "target"], mapping.get("kpis", [])))
+    lines.extend(_columnar(
+        "actions", ["id", "title", "progress", "status", "owner"], mapping.get("actions", [])
+    ))
+    return "\n".join(lines)
+
+
+def _format_kpi_coverage(oid: str, mapping: dict) -> str:
+    """Format the KPI coverage tool output from an ontology mapping."""
+    lines = [f"Objective: {oid} - {STRATEGIC_OBJECTIVES.get(oid, 'Unknown')}"]
+    lines.append(f"Total KPIs: {len(mapping.get('kpis', []))}")
+    lines.append(f"Total Actions: {len(mapping.get('actions', []))}")
+    lines.append("\nKPIs to evaluate (decide if each is adequately covered by the actions):")
+    lines.extend(_columnar("kpis", ["id", "title", "baseline", "target"], mapping.get("kpis", [])))
+    lines.append("\nActions available:")
+    lines.extend(_columnar("actions", ["id", "title", "progress", "owner"], mapping.get("actions", [])))
+    return "\n".join(lines)
+
+
+def _format_gaps(gaps: list[dict]) -> str:
+    """Format the gap identification tool output, one block per gap type."""
+    kpi_gaps = [g for g in gaps if "kpi_id" in g]
+    action_gaps = [g for g in gaps if "action_id" in g]
+    lines = []
+    if kpi_gaps:
+        lines.extend(_columnar(
+            "kpis_without_actions", ["kpi_id", "kpi_title", "severity"], kpi_gaps
+        ))
+    if action_gaps:
+        lines.extend(_columnar(
+            "low_progress_actions", ["action_id", "action_title", "progress", "severity"], action_gaps
+        ))
+    return "\n".join(lines)
@@ -4,58 +4,57 @@ Uses LangGraph ReAct reasoning with tools to assess alignment between
 strategic objectives and action plan items.
 """
 import json
-from langchain_openai import ChatOpenAI
+from contextvars import ContextVar
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
-from src.config import OPENAI_API_KEY, LLM_MODEL, STRATEGIC_OBJECTIVES
+from src.config import STRATEGIC_OBJECTIVES
 from src.agents.callbacks import ReasoningCallbackHandler, ReasoningStep
+from src.agents.llm import get_agent_llm
+from src.util.http_clients import per_event_loop
+from src.agents.trace import build_trace_from_messages
+from src.agents.tool_context import bound_tools
+from src.agents.trajectory import elide_stale_tool_outputs
 from datetime import datetime
 
 
-def run_sync_assessment(
-    objective_id: str,
-    retrieve_fn,
-    ontology_mapping_fn,
-    kpi_coverage_fn,
-) -> dict:
-    """
-    Run the sync assessment agent for a specific objective.
-    
-    Returns:
-        Dict with alignment results and reasoning trace
-    """
-    callback = ReasoningCallbackHandler(agent_name="SyncAgent")
-    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
-    
-    # Define tools using the @tool decorator with closures
-    @tool
-    def retrieve_action_chunks(objective_id: str) -> str:
-        """Retrieve relevant action plan chunks for a strategic objective. Input: objective ID (e.g., 'SO1'). Returns text chunks from the action plan."""
-        return retrieve_fn(objective_id)
-    
-    @tool
-    def query_ontology(objective_id: str) -> str:
-        """Get ontology-based mapping showing which actions are linked to which objectives and KPIs. Input: objective ID (e.g., 'SO1'). Returns structured mapping data."""
-        return ontology_mapping_fn(objective_id)
-    
-    @tool
-    def check_kpi_coverage(objective_id: str) -> str:
-        """Check how many KPIs for an objective have supporting actions. Input: objective ID (e.g., 'SO1'). Returns coverage statistics."""
-        return kpi_coverage_fn(objective_id)
-    
-    tools = [retrieve_action_chunks, query_ontology, check_kpi_coverage]
-    
-    llm = ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=0.1,
-        api_key=OPENAI_API_KEY,
-    )
-    
-    system_message = f"""You are the Synchronization Assessment Agent for the ISPS system.
+# Per-run tool implementations. The tools and the compiled agent graph below are
+# shared by every run; each run binds its own functions here. ContextVars are
+# task-local, so concurrent runs under asyncio.gather don't see each other's.
+_retrieve_fn: ContextVar = ContextVar("sync_retrieve_fn")
+_ontology_mapping_fn: ContextVar = ContextVar("sync_ontology_mapping_fn")
+_kpi_coverage_fn: ContextVar = ContextVar("sync_kpi_coverage_fn")
+
+
+@tool
+def retrieve_action_chunks(objective_id: str) -> str:
+    """Retrieve relevant action plan chunks for a strategic objective. Input: objective ID (e.g., 'SO1'). Returns text chunks from the action plan."""
+    return _retrieve_fn.get()(objective_id)
+
+
+@tool
+def query_ontology(objective_id: str) -> str:
+    """Get ontology-based mapping showing which actions are linked to which objectives and KPIs. Input: objective ID (e.g., 'SO1'). Returns structured mapping data."""
+    return _ontology_mapping_fn.get()(objective_id)
+
+
+@tool
+def check_kpi_coverage(objective_id: str) -> str:
+    """Check how many KPIs for an objective have supporting actions. Input: objective ID (e.g., 'SO1'). Returns coverage statistics."""
+    return _kpi_coverage_fn.get()(objective_id)
+
+
+SYNC_TOOLS = [retrieve_action_chunks, query_ontology, check_kpi_coverage]
+
+# Static system prompt: byte-identical across runs so the provider-side prompt
+# prefix cache can be reused between objectives
+SYNC_SYSTEM_PROMPT = """You are the Synchronization Assessment Agent for the ISPS system.
 Your job is to assess how well the Action Plan aligns with a Strategic Objective.
 
 Use the available tools to gather data, then provide your assessment.
 
+Tool outputs list records in a columnar layout: a header line "name: field|field|..."
+followed by one pipe-delimited row per record, in the same field order.
+
 IMPORTANT: For each KPI, independently evaluate whether specific actions directly
 address it. A KPI is "covered" if at least one action SPECIFICALLY targets what 
 that KPI measures. Do not assume coverage just because actions exist under the 
@@ -76,77 +75,124 @@ COVERED_KPIS: [comma-separated list of KPI IDs that have supporting actions]
 UNCOVERED_KPIS: [comma-separated list of KPI IDs without adequate action support]
 JUSTIFICATION: [2-3 sentences explaining the score]
 CONFIDENCE: [0.0-1.0]"""
+
+
+@per_event_loop
+def _get_sync_agent():
+    """Build the ReAct sync assessment agent once per event loop and reuse the compiled graph."""
+    llm = get_agent_llm(temperature=0.1)
     
-    agent = create_react_agent(llm, tools, prompt=system_message)
-    
-    input_text = f"Assess the alignment for objective {objective_id}: {objective_name}"
+    return create_react_agent(
+        llm, SYNC_TOOLS,
+        prompt=SYNC_SYSTEM_PROMPT,
+        pre_model_hook=elide_stale_tool_outputs,
+    )
+
+
+def run_sync_assessment(
+    objective_id: str,
+    retrieve_fn,
+    ontology_mapping_fn,
+    kpi_coverage_fn,
+) -> dict:
+    """
+    Run the sync assessment agent for a specific objective.
     
-    try:
-        # Run the agent
-        result = agent.invoke(
-            {"messages": [{"role": "user", "content": input_text}]},
-            config={"callbacks": [callback]},
-        )
-        
-        # Extract the final message
-        messages = result.get("messages", [])
-        output = ""
-        for msg in reversed(messages):
-            if hasattr(msg, "content") and msg.content:
-                output = msg.content
-                break
-        
-        # Build reasoning trace from messages
-        trace = []
-        step_num = 0
-        for msg in messages:
-            step_num += 1
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                for tc in msg.tool_calls:
-                    trace.append({
-                        "step_number": step_num,
-                        "step_type": "action",
-                        "agent_name": "SyncAgent",
-                        "content": f"Calling tool: {tc.get('name', 'unknown')}",
-                        "tool_name": tc.get("name", ""),
-                        "tool_input": str(tc.get("args", {})),
-                    })
-            elif hasattr(msg, "type") and msg.type == "tool":
-                trace.append({
-                    "step_number": step_num,
-                    "step_type": "observation",
-                    "agent_name": "SyncAgent",
-                    "content": str(msg.content)[:500],
-                    "tool_name": getattr(msg, "name", ""),
-                    "tool_output": str(msg.content)[:500],
-                })
-            elif hasattr(msg, "content") and msg.content and not (hasattr(msg, "tool_calls") and msg.tool_calls):
-                if msg.type == "ai":
-                    trace.append({
-                        "step_number": step_num,
-                        "step_type": "thought" if step_num < len(messages) else "final_answer",
-                        "agent_name": "SyncAgent",
-                        "content": str(msg.content)[:500],
-                    })
-        
-        parsed = _parse_agent_output(output)
-        parsed["reasoning_trace"] = trace if trace else callback.get_trace()
-        parsed["objective_id"] = objective_id
-        parsed["objective_name"] = objective_name
+    Returns:
+        Dict with alignment results and reasoning trace
+    """
+    callback = ReasoningCallbackHandler(agent_name="SyncAgent")
+    agent = _get_sync_agent()
+    with _tool_bindings(retrieve_fn, ontology_mapping_fn, kpi_coverage_fn):
+        try:
+            # Run the agent
+            result = agent.invoke(
+                _agent_input(objective_id),
+                config={"callbacks": [callback]},
+            )
+            return _build_result(objective_id, result, callback)
         
-        return parsed
+        except Exception as e:
+            return _error_result(objective_id, e, callback)
+
+
+async def arun_sync_assessment(
+    objective_id: str,
+    retrieve_fn,
+    ontology_mapping_fn,
+    kpi_coverage_fn,
+) -> dict:
+    """
+    Async variant of run_sync_assessment, driven through the agent's ainvoke path
+    so several objectives can be assessed concurrently.
+    
+    Returns:
+        Dict with alignment results and reasoning trace
+    """
+    callback = ReasoningCallbackHandler(agent_name="SyncAgent")
+    agent = _get_sync_agent()
+    with _tool_bindings(retrieve_fn, ontology_mapping_fn, kpi_coverage_fn):
+        try:
+            result = await agent.ainvoke(
+                _agent_input(objective_id),
+                config={"callbacks": [callback]},
+            )
+            return _build_result(objective_id, result, callback)
         
-    except Exception as e:
-        return {
-            "objective_id": objective_id,
-            "objective_name": objective_name,
-            "alignment_score": 0.5,
-            "alignment_level": "Partial",
-            "justification": f"Agent encountered an error: {str(e)}",
-            "confidence": 0.3,
-            "reasoning_trace": callback.get_trace(),
-            "error": str(e),
-        }
+        except Exception as e:
+            return _error_result(objective_id, e, callback)
+
+
+def _tool_bindings(retrieve_fn, ontology_mapping_fn, kpi_coverage_fn):
+    """Bind this run's tool implementations for the duration of the agent call."""
+    return bound_tools({
+        _retrieve_fn: retrieve_fn,
+        _ontology_mapping_fn: ontology_mapping_fn,
+        _kpi_coverage_fn: kpi_coverage_fn,
+    })
+
+
+def _agent_input(objective_id: str) -> dict:
+    """Build the initial message state for the agent."""
+    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
+    input_text = f"Assess the alignment for objective {objective_id}: {objective_name}"
+    return {"messages": [{"role": "user", "content": input_text}]}
+
+
+def _build_result(objective_id: str, result: dict, callback: ReasoningCallbackHandler) -> dict:
+    """Parse the agent's final state into the sync assessment result dict."""
+    objective_name = STRATEGIC_OBJECTIVES.get(objective_id, "Unknown")
+    
+    # Extract the final message
+    messages = result.get("messages", [])
+    output = ""
+    for msg in reversed(messages):
+        if hasattr(msg, "content") and msg.content:
+            output = msg.content
+            break
+    
+    trace = build_trace_from_messages(messages, "SyncAgent", callback)
+    
+    parsed = _parse_agent_output(output)
+    parsed["reasoning_trace"] = trace
+    parsed["objective_id"] = objective_id
+    parsed["objective_name"] = objective_name
+    
+    return parsed
+
+
+def _error_result(objective_id: str, e: Exception, callback: ReasoningCallbackHandler) -> dict:
+    """Fallback result when the agent run fails."""
+    return {
+        "objective_id": objective_id,
+        "objective_name": STRATEGIC_OBJECTIVES.get(objective_id, "Unknown"),
+        "alignment_score": 0.5,
+        "alignment_level": "Partial",
+        "justification": f"Agent encountered an error: {str(e)}",
+        "confidence": 0.3,
+        "reasoning_trace": callback.get_trace(),
+        "error": str(e),
+    }
 
 
 def _parse_agent_output(output: str) -> dict:
@@ -156,29 +202,48 @@ def _parse_agent_output(output: str) -> dict:
         "alignment_level": "Partial",
         "covered_kpis": [],
         "uncovered_kpis": [],
+        "covered_count": 0,
+        "uncovered_count": 0,
         "justification": "",
         "confidence": 0.5,
     }
     
     for line in output.strip().split("\n"):
-        line = line.strip()
-        if line.startswith("ALIGNMENT_SCORE:"):
+        # Split each line once into its field name and payload
+        key, sep, payload = line.strip().partition(":")
+        if not sep:
+            continue
+        payload = payload.strip()
+        
+        if key == "ALIGNMENT_SCORE":
             try:
-                result["alignment_score"] = float(line.split(":")[1].strip())
-            except (ValueError, IndexError):
+                result["alignment_score"] = float(payload)
+            except ValueError:
                 pass
-        elif line.startswith("ALIGNMENT_LEVEL:"):
-            result["alignment_level"] = line.split(":")[1].strip()
-        elif line.startswith("COVERED_KPIS:"):
-            result["covered_kpis"] = [k.strip() for k in line.split(":")[1].split(",") if k.strip()]
-        elif line.startswith("UNCOVERED_KPIS:"):
-            result["uncovered_kpis"] = [k.strip() for k in line.split(":")[1].split(",") if k.strip()]
-        elif line.startswith("JUSTIFICATION:"):
-            result["justification"] = line.split(":", 1)[1].strip()
-        elif line.startswith("CONFIDENCE:"):
+        elif key == "ALIGNMENT_LEVEL":
+            result["alignment_level"] = payload
+        elif key == "COVERED_KPIS":
+            result["covered_kpis"] = _parse_kpi_list(payload)
+            result["covered_count"] = len(result["covered_kpis"])
+        elif key == "UNCOVERED_KPIS":
+            result["uncovered_kpis"] = _parse_kpi_list(payload)
+            result["uncovered_count"] = len(result["uncovered_kpis"])
+        elif key == "JUSTIFICATION":
+            result["justification"] = payload
+        elif key == "CONFIDENCE":
             try:
-                result["confidence"] = float(line.split(":")[1].strip())
-            except (ValueError, IndexError):
+                result["confidence"] = float(payload)
+            except ValueError:
                 pass
     
     return result
+
+
+def _parse_kpi_list(payload: str) -> list[str]:
+    """Parse a comma-separated KPI ID list, dropping empty entries."""
+    kpis = []
+    for item in payload.split(","):
+        item = item.strip()
+        if item:
+            kpis.append(item)
+    return kpis
@@ -0,0 +1,23 @@
+"""
+Agent Tool Context
+Binds per-run tool implementations to the ContextVars read by module-level agent tools.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+
+@contextmanager
+def bound_tools(bindings: dict[ContextVar, Callable]) -> Iterator[None]:
+    """
+    Set each ContextVar to its tool implementation for the duration of the block.
+    
+    The previous values are restored on exit, in reverse order, even if the
+    agent run raises.
+    """
+    tokens = [(var, var.set(fn)) for var, fn in bindings.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
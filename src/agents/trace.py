@@ -0,0 +1,60 @@
+"""
+Agent Trace Builder
+Builds the dashboard reasoning trace from a LangGraph agent's message history.
+"""
+from src.agents.callbacks import ReasoningCallbackHandler, clip_text
+
+
+def build_trace_from_messages(
+    messages: list,
+    agent_name: str,
+    callback: ReasoningCallbackHandler | None = None,
+) -> list[dict]:
+    """
+    Convert agent messages into reasoning trace steps in a single pass.
+    
+    AI tool calls become "action" steps, tool results "observation" steps and
+    AI text "thought" steps (the last message is the "final_answer"). Falls back
+    to the callback's trace when the messages yield nothing.
+    """
+    trace = []
+    step_num = 0
+    last_step = len(messages)
+    for msg in messages:
+        step_num += 1
+        # Read each attribute once; message types differ in which ones they define
+        mtype = getattr(msg, "type", None)
+        mcontent = getattr(msg, "content", None)
+        mtool_calls = getattr(msg, "tool_calls", None)
+        match mtype:
+            case "ai" if mtool_calls:
+                for tc in mtool_calls:
+                    trace.append({
+                        "step_number": step_num,
+                        "step_type": "action",
+                        "agent_name": agent_name,
+                        "content": f"Calling tool: {tc.get('name', 'unknown')}",
+                        "tool_name": tc.get("name", ""),
+                        "tool_input": str(tc.get("args", {})),
+                    })
+            case "tool":
+                clipped = clip_text(mcontent, 500)
+                trace.append({
+                    "step_number": step_num,
+                    "step_type": "observation",
+                    "agent_name": agent_name,
+                    "content": clipped,
+                    "tool_name": getattr(msg, "name", ""),
+                    "tool_output": clipped,
+                })
+            case "ai" if mcontent:
+                trace.append({
+                    "step_number": step_num,
+                    "step_type": "thought" if step_num < last_step else "final_answer",
+                    "agent_name": agent_name,
+                    "content": clip_text(mcontent, 500),
+                })
+    
+    if not trace and callback is not None:
+        return callback.get_trace()
+    return trace
@@ -0,0 +1,48 @@
+"""
+ReAct Trajectory Reduction
+Pre-model hook that elides stale tool observations from the message history
+the agent sends to the LLM, while leaving the stored graph state untouched.
+"""
+import hashlib
+import json
+from langchain_core.messages import AIMessage, ToolMessage
+
+
+def elide_stale_tool_outputs(state: dict) -> dict:
+    """
+    Keep only the most recent observation per tool in the LLM input.
+    
+    Older ToolMessages keep their position (OpenAI requires every tool call to be
+    answered) but their content is replaced with a short "[elided: tool:args_hash]"
+    stub. System prompt, user query and AI messages are passed through unchanged.
+    
+    Used as ``pre_model_hook`` for create_react_agent; returning
+    ``llm_input_messages`` means the full history is still available for tracing.
+    """
+    messages = state["messages"]
+    
+    # Last ToolMessage index for each tool name
+    latest = {}
+    for idx, msg in enumerate(messages):
+        if isinstance(msg, ToolMessage):
+            latest[msg.name] = idx
+    
+    if len(latest) == sum(isinstance(m, ToolMessage) for m in messages):
+        return {"llm_input_messages": messages}
+    
+    # Tool call args by call ID, for the elision stub
+    call_args = {}
+    for msg in messages:
+        if isinstance(msg, AIMessage):
+            for tc in msg.tool_calls:
+                call_args[tc.get("id")] = tc.get("args", {})
+    
+    reduced = []
+    for idx, msg in enumerate(messages):
+        if isinstance(msg, ToolMessage) and latest.get(msg.name) != idx:
+            args = json.dumps(call_args.get(msg.tool_call_id, {}), sort_keys=True, default=str)
+            args_hash = hashlib.md5(args.encode("utf-8")).hexdigest()[:8]
+            msg = msg.model_copy(update={"content": f"[elided: {msg.name}:{args_hash}]"})
+        reduced.append(msg)
+    
+    return {"llm_input_messages": reduced}
@@ -0,0 +1,101 @@
+"""
+Chunk Metadata Extraction
+Shared objective-ID and section-type detection for the chunkers. Patterns are
+compiled once at import, with google-re2 (linear-time DFA matching) when it is
+installed and the standard library re engine otherwise.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import re2 as regex_engine
+except ImportError:
+    import re as regex_engine
+
+# Objective references, fused into one alternation so a chunk is scanned once
+OBJECTIVE_ID_RE = regex_engine.compile(
+    r"(?:STRATEGIC OBJECTIVE |Strategic Objective |SO|Action Plan:.*?Objective )(\d)"
+)
+
+# LLM propositions also refer to objectives through their KPI/action prefixes
+# (D1, R2, S3, I4, O5, E6), so only digits of real objectives are accepted
+PROPOSITION_OBJECTIVE_ID_RE = regex_engine.compile(
+    r"(?:SO|STRATEGIC OBJECTIVE |Strategic Objective |Objective |[DRISOE])([1-6])"
+)
+
+# Section keywords in priority order (earlier labels win)
+SECTION_TYPE_KEYWORDS = [
+    ("kpi_table", r"key performance indicator|\| kpi"),
+    ("timeline", r"timeline|milestone"),
+    ("action_table", r"action id|\| action"),
+    ("risk_table", r"risk"),
+    ("budget", r"budget"),
+    ("alignment", r"alignment"),
+    ("executive_summary", r"executive summary|vision"),
+    ("governance", r"governance"),
+    ("description", r"description"),
+]
+SECTION_TYPE_PRIORITY = {label: i for i, (label, _) in enumerate(SECTION_TYPE_KEYWORDS)}
+
+# All keywords in one case-insensitive alternation; the named group that
+# matched identifies the label, so the chunk is scanned in a single pass
+SECTION_TYPE_RE = regex_engine.compile(
+    "(?i)" + "|".join(f"(?P<{label}>{pattern})" for label, pattern in SECTION_TYPE_KEYWORDS)
+)
+
+
+def extract_objective_id(text: str) -> str:
+    """Extract strategic objective ID from chunk text."""
+    match = OBJECTIVE_ID_RE.search(text)
+    return f"SO{match.group(1)}" if match else "GENERAL"
+
+
+def extract_proposition_objective_id(text: str) -> str:
+    """Extract strategic objective ID from LLM-generated proposition text."""
+    match = PROPOSITION_OBJECTIVE_ID_RE.search(text)
+    return f"SO{match.group(1)}" if match else "GENERAL"
+
+
+def extract_section_type(text: str) -> str:
+    """Identify the type of content in a chunk."""
+    # Risk mentions only count inside a table
+    skip_risk = "|" not in text
+    best = None
+    for match in SECTION_TYPE_RE.finditer(text):
+        label = match.lastgroup
+        if skip_risk and label == "risk_table":
+            continue
+        if best is None or SECTION_TYPE_PRIORITY[label] < SECTION_TYPE_PRIORITY[best]:
+            best = label
+            if SECTION_TYPE_PRIORITY[best] == 0:
+                break
+    return best or "general"
+
+
+def extract_metadata_batch(texts: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Vectorized extract_objective_id / extract_section_type over many chunks.
+    
+    Returns:
+        Tuple of (objective IDs, section types), aligned with texts
+    """
+    if not texts:
+        return [], []
+    series = pd.Series(texts, dtype=object)
+    
+    digits = series.str.extract(OBJECTIVE_ID_RE.pattern, expand=False)
+    objective_ids = ("SO" + digits).fillna("GENERAL")
+    
+    conditions = []
+    for label, pattern in SECTION_TYPE_KEYWORDS:
+        matched = series.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+        if label == "risk_table":
+            # Risk mentions only count inside a table
+            matched = matched & series.str.contains("|", regex=False).to_numpy(dtype=bool)
+        conditions.append(matched)
+    # np.select takes the first true condition, matching the keyword priority
+    section_types = np.select(
+        conditions, [label for label, _ in SECTION_TYPE_KEYWORDS], default="general"
+    )
+    
+    return objective_ids.tolist(), section_types.tolist()
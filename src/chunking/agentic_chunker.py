@@ -5,11 +5,26 @@ into thematically coherent chunks. Best for complex structured content.
 """
 import re
 import json
+import orjson
 import time
+import random
+import asyncio
+import hashlib
 import logging
+import tiktoken
+from functools import lru_cache
+from pathlib import Path
+from openai import RateLimitError
 from langchain_openai import ChatOpenAI
+from langchain_community.cache import SQLiteCache
 from langchain_core.prompts import ChatPromptTemplate
-from src.config import OPENAI_API_KEY, LLM_MODEL
+from src.config import (
+    OPENAI_API_KEY, LLM_MODEL, LLM_MAX_TOKENS, BASE_DIR,
+    AGENTIC_MAX_CONCURRENCY, AGENTIC_MAX_INPUT_TOKENS, LLM_RPM, LLM_TPM,
+)
+from src.util.http_clients import get_http_client, get_async_http_client, per_event_loop, run_async
+from src.util.rate_limiter import AsyncRateLimiter
+from src.chunking._metadata import extract_proposition_objective_id
 
 # ─── Logging setup ────────────────────────────────────────────────────────────
 logger = logging.getLogger("isps.agentic_chunker")
@@ -25,6 +40,32 @@ if not logger.handlers:
 # ─── Timeout (seconds) for each LLM call ─────────────────────────────────────
 LLM_TIMEOUT = 60
 
+# ─── Token budget per proposition-extraction call ────────────────────────────
+# Bounded by the model context (minus output and prompt) and by the configured
+# per-call budget, since the propositions returned grow with the input
+MODEL_CONTEXT_TOKENS = 128_000
+PROMPT_OVERHEAD_TOKENS = 200
+MAX_INPUT_TOKENS = min(
+    AGENTIC_MAX_INPUT_TOKENS,
+    MODEL_CONTEXT_TOKENS - LLM_MAX_TOKENS - PROMPT_OVERHEAD_TOKENS,
+)
+
+# ─── Rate-limit retries ──────────────────────────────────────────────────────
+LLM_MAX_RETRIES = 5
+LLM_RETRY_BASE_DELAY = 2.0    # seconds, doubled on each retry
+
+# ─── Section splitting / response cleanup patterns ───────────────────────────
+SECTION_BREAK_RE = re.compile(r'={50,}')
+SUBSECTION_BREAK_RE = re.compile(r'-{3,}')
+CODE_FENCE_RE = re.compile(r'```(?:json)?\s*')
+_JSON_DECODER = json.JSONDecoder()
+
+# ─── Per-sub-section checkpoints ─────────────────────────────────────────────
+CHECKPOINT_DIR = BASE_DIR / "cache" / "agentic_chunks"
+
+# ─── LLM response cache (reruns on the same text skip the API) ───────────────
+LLM_CACHE_PATH = BASE_DIR / "cache" / "agentic_llm_cache.sqlite"
+
 
 PROPOSITION_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """You are an expert at extracting factual propositions from organizational documents.
@@ -57,31 +98,111 @@ Keep groups focused - each should cover one coherent sub-topic."""),
 ])
 
 
-def _extract_objective_id(text: str) -> str:
-    """Extract strategic objective ID from chunk text."""
-    patterns = [
-        r"SO(\d)", r"STRATEGIC OBJECTIVE (\d)", r"Strategic Objective (\d)",
-        r"Objective (\d)", r"[DRISOE](\d)",
+def _get_llm_cache() -> SQLiteCache:
+    """Exact-match prompt -> response cache, scoped to the chunker's client only."""
+    LLM_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return SQLiteCache(database_path=str(LLM_CACHE_PATH))
+
+
+def _split_stripped(separator: re.Pattern, text: str, min_length: int) -> list[str]:
+    """
+    Split on a separator pattern, keeping stripped parts longer than min_length.
+    
+    Separator runs are first collapsed to a NUL sentinel so the split itself is
+    a plain str.split, and each part is stripped only once.
+    """
+    return [
+        part for raw in separator.sub("\x00", text).split("\x00")
+        if len(part := raw.strip()) > min_length
     ]
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            digit = match.group(1)
-            if digit in "123456":
-                return f"SO{digit}"
-    return "GENERAL"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Tokenizer for LLM_MODEL, falling back to the GPT-4o encoding for unknown models."""
+    try:
+        return tiktoken.encoding_for_model(LLM_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _count_tokens(text: str) -> int:
+    return len(_get_encoding().encode(text))
+
+
+def _fit_to_budget(text: str, limit: int) -> tuple[str, int]:
+    """Truncate text to at most limit tokens; returns (text, token count)."""
+    tokens = _get_encoding().encode(text)
+    if len(tokens) <= limit:
+        return text, len(tokens)
+    return _get_encoding().decode(tokens[:limit]), limit
+
+
+def _pack_sub_sections(parts: list[str], limit: int) -> list[str]:
+    """Greedily merge adjacent sub-sections while they fit within limit tokens."""
+    packed = []
+    current, current_tokens = [], 0
+    for part in parts:
+        part_tokens = _count_tokens(part)
+        if current and current_tokens + part_tokens > limit:
+            packed.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += part_tokens
+    if current:
+        packed.append("\n\n".join(current))
+    return packed
+
+
+@per_event_loop
+def _get_chains():
+    """
+    Build the proposition and grouping chains once per event loop, since each
+    asyncio.run in agentic_chunk gets a fresh loop and its own async client.
+    """
+    llm = ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=0.0,
+        openai_api_key=OPENAI_API_KEY,
+        request_timeout=LLM_TIMEOUT,
+        cache=_get_llm_cache(),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+    return PROPOSITION_PROMPT | llm, GROUPING_PROMPT | llm
 
 
 def agentic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
     """
     Use LLM to extract propositions and group them into thematic chunks.
     
+    Synchronous wrapper around aagentic_chunk for callers without an event loop.
+    
+    Args:
+        text: Full document text
+        doc_type: 'strategic_plan' or 'action_plan'
+        source_file: Source filename
+        
+    Returns:
+        List of dicts with 'text' and 'metadata' keys
+    """
+    return run_async(aagentic_chunk(text, doc_type, source_file))
+
+
+async def aagentic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
+    """
+    Use LLM to extract propositions and group them into thematic chunks.
+    
     Process:
     1. Split text into manageable sections (by major headings)
-    2. For each section, LLM extracts atomic propositions
-    3. LLM groups propositions into thematic clusters
+    2. For every sub-section concurrently, LLM extracts atomic propositions
+    3. For every sub-section concurrently, LLM groups propositions into thematic clusters
     4. Each cluster becomes a chunk with rich metadata
     
+    LLM calls are bounded by AGENTIC_MAX_CONCURRENCY and retried with backoff on
+    rate limits. Each sub-section's groups are checkpointed to disk, so a rerun
+    after a crash only pays for the sub-sections that had not finished.
+    
     Args:
         text: Full document text
         doc_type: 'strategic_plan' or 'action_plan'
@@ -95,107 +216,237 @@ def agentic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
     logger.info(f"Document length: {len(text):,} characters")
     overall_start = time.time()
 
-    llm = ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=0.0,
-        openai_api_key=OPENAI_API_KEY,
-        request_timeout=LLM_TIMEOUT,
-    )
+    prop_chain, group_chain = _get_chains()
+    semaphore = asyncio.Semaphore(AGENTIC_MAX_CONCURRENCY)
+    limiter = AsyncRateLimiter(rpm=LLM_RPM, tpm=LLM_TPM)
     
     # Split by major sections first
-    sections = re.split(r'={50,}', text)
-    sections = [s.strip() for s in sections if s.strip() and len(s.strip()) > 100]
+    sections = _split_stripped(SECTION_BREAK_RE, text, min_length=100)
     logger.info(f"Split into {len(sections)} major section(s)")
     
-    all_chunks = []
-    chunk_index = 0
-    total_sub_sections = 0
-    
+    sub_sections = []
     for sec_idx, section in enumerate(sections, 1):
-        # Limit section size for LLM context
-        if len(section) > 4000:
-            sub_sections = re.split(r'-{3,}', section)
-            sub_sections = [s.strip() for s in sub_sections if s.strip() and len(s.strip()) > 50]
+        # Limit section size to the per-call token budget, packing small
+        # sub-sections back together so each call does a full budget of work
+        if _count_tokens(section) > MAX_INPUT_TOKENS:
+            parts = _split_stripped(SUBSECTION_BREAK_RE, section, min_length=50)
+            parts = _pack_sub_sections(parts, MAX_INPUT_TOKENS)
         else:
-            sub_sections = [section]
+            parts = [section]
         
-        logger.info(f"  Section {sec_idx}/{len(sections)}: {len(sub_sections)} sub-section(s), "
+        logger.info(f"  Section {sec_idx}/{len(sections)}: {len(parts)} sub-section(s), "
                      f"{len(section):,} chars")
-
-        for sub_idx, sub_section in enumerate(sub_sections, 1):
-            total_sub_sections += 1
-            preview = sub_section[:80].replace("\n", " ").strip()
-            logger.info(f"    Sub-section {sub_idx}/{len(sub_sections)} "
-                         f"({len(sub_section):,} chars) — \"{preview}…\"")
+        sub_sections.extend(parts)
+    
+    # Resume from checkpoints; only the remaining sub-sections go to the LLM
+    results = [_load_checkpoint(doc_type, sub) for sub in sub_sections]
+    pending = [i for i, groups in enumerate(results) if groups is None]
+    logger.info(f"{len(sub_sections) - len(pending)} sub-section(s) restored from checkpoint, "
+                f"{len(pending)} to process")
+    
+    # Wave 1: extract propositions for every pending sub-section
+    t0 = time.time()
+    prop_inputs = [_fit_to_budget(sub_sections[i], MAX_INPUT_TOKENS) for i in pending]
+    prop_responses = await asyncio.gather(*[
+        _with_retry(
+            lambda text=text: prop_chain.ainvoke({"text": text}),
+            semaphore, limiter, n_tokens + PROMPT_OVERHEAD_TOKENS,
+        )
+        for text, n_tokens in prop_inputs
+    ], return_exceptions=True)
+    t1 = time.time()
+    
+    for i, response in zip(pending, prop_responses):
+        results[i] = response
+    extracted = [i for i in pending if not isinstance(results[i], BaseException)]
+    
+    # Counting rescans every response, so only do it when the line will be logged
+    if logger.isEnabledFor(logging.INFO):
+        prop_count = sum(
+            results[i].content.count("\n- ") + results[i].content.startswith("- ")
+            for i in extracted
+        )
+        logger.info(f"  ✓ Extracted {prop_count} propositions from {len(extracted)} "
+                    f"sub-section(s) in {t1 - t0:.1f}s")
+    
+    # Wave 2: group the propositions of every sub-section that extracted cleanly.
+    # Responses are streamed and parsed group by group as they arrive.
+    group_responses = await asyncio.gather(*[
+        _with_retry(
+            lambda i=i: _astream_groups(group_chain, results[i].content),
+            semaphore, limiter, _count_tokens(results[i].content) + PROMPT_OVERHEAD_TOKENS,
+        )
+        for i in extracted
+    ], return_exceptions=True)
+    logger.info(f"  ✓ Grouping finished in {time.time() - t1:.1f}s")
+    
+    for i, response in zip(extracted, group_responses):
+        if isinstance(response, BaseException):
+            results[i] = response
+            continue
+        results[i] = response
+        try:
+            _save_checkpoint(doc_type, sub_sections[i], response)
+        except (OSError, TypeError) as e:
+            # The groups are still good; only the rerun shortcut is lost
+            logger.warning(f"  ⚠ Could not checkpoint sub-section {i + 1}: {e}")
+    
+    all_chunks = []
+    chunk_index = 0
+    for sub_idx, (sub_section, groups) in enumerate(zip(sub_sections, results), 1):
+        if isinstance(groups, BaseException):
+            logger.warning(f"  ✗ Error on sub-section {sub_idx}: {groups}")
+            logger.warning(f"    Falling back to raw section as chunk")
+            objective_id = extract_proposition_objective_id(sub_section)
+            all_chunks.append({
+                "text": sub_section,
+                "metadata": {
+                    "source": source_file,
+                    "doc_type": doc_type,
+                    "objective_id": objective_id,
+                    "section_type": "agentic_fallback",
+                    "chunk_strategy": "agentic",
+                    "chunk_index": chunk_index,
+                    "error": str(groups),
+                }
+            })
+            chunk_index += 1
+            continue
+        
+        for group in groups:
+            theme = group.get("theme", "General")
+            props = group.get("propositions", [])
+            # One join with the bullet folded into the separator
+            chunk_text = (
+                "[" + str(theme) + "]\n- " + "\n- ".join(map(str, props))
+                if props else "[" + str(theme) + "]\n"
+            )
             
-            try:
-                # Step 1: Extract propositions
-                t0 = time.time()
-                logger.info(f"      → Extracting propositions (LLM call 1/2)…")
-                prop_chain = PROPOSITION_PROMPT | llm
-                prop_response = prop_chain.invoke({"text": sub_section[:3000]})
-                propositions = prop_response.content
-                t1 = time.time()
-                prop_count = propositions.count("\n- ") + (1 if propositions.startswith("- ") else 0)
-                logger.info(f"      ✓ Extracted {prop_count} propositions in {t1 - t0:.1f}s")
-                
-                # Step 2: Group propositions
-                logger.info(f"      → Grouping propositions (LLM call 2/2)…")
-                group_chain = GROUPING_PROMPT | llm
-                group_response = group_chain.invoke({"propositions": propositions})
-                t2 = time.time()
-                logger.info(f"      ✓ Grouping complete in {t2 - t1:.1f}s")
-                
-                # Parse JSON response
-                groups_text = group_response.content
-                groups_text = re.sub(r'```json\s*', '', groups_text)
-                groups_text = re.sub(r'```\s*', '', groups_text)
-                
-                groups = json.loads(groups_text)
-                logger.info(f"      ✓ Parsed {len(groups)} thematic group(s)")
-                
-                for group in groups:
-                    theme = group.get("theme", "General")
-                    props = group.get("propositions", [])
-                    chunk_text = f"[{theme}]\n" + "\n".join(f"- {p}" for p in props)
-                    
-                    objective_id = _extract_objective_id(chunk_text)
-                    
-                    all_chunks.append({
-                        "text": chunk_text,
-                        "metadata": {
-                            "source": source_file,
-                            "doc_type": doc_type,
-                            "objective_id": objective_id,
-                            "section_type": "agentic_propositions",
-                            "chunk_strategy": "agentic",
-                            "chunk_index": chunk_index,
-                            "theme": theme,
-                        }
-                    })
-                    chunk_index += 1
-                    
-            except Exception as e:
-                logger.warning(f"      ✗ Error on sub-section {sub_idx}: {e}")
-                logger.warning(f"        Falling back to raw section as chunk")
-                objective_id = _extract_objective_id(sub_section)
-                all_chunks.append({
-                    "text": sub_section,
-                    "metadata": {
-                        "source": source_file,
-                        "doc_type": doc_type,
-                        "objective_id": objective_id,
-                        "section_type": "agentic_fallback",
-                        "chunk_strategy": "agentic",
-                        "chunk_index": chunk_index,
-                        "error": str(e),
-                    }
-                })
-                chunk_index += 1
+            objective_id = extract_proposition_objective_id(chunk_text)
+            
+            all_chunks.append({
+                "text": chunk_text,
+                "metadata": {
+                    "source": source_file,
+                    "doc_type": doc_type,
+                    "objective_id": objective_id,
+                    "section_type": "agentic_propositions",
+                    "chunk_strategy": "agentic",
+                    "chunk_index": chunk_index,
+                    "theme": theme,
+                }
+            })
+            chunk_index += 1
 
     elapsed = time.time() - overall_start
     logger.info(f"Agentic chunking complete for '{doc_type}': "
-                f"{len(all_chunks)} chunks from {total_sub_sections} sub-sections "
+                f"{len(all_chunks)} chunks from {len(sub_sections)} sub-sections "
                 f"in {elapsed:.1f}s")
     logger.info("═" * 60)
     return all_chunks
+
+
+async def _with_retry(
+    call,
+    semaphore: asyncio.Semaphore,
+    limiter: AsyncRateLimiter,
+    estimated_tokens: int,
+):
+    """
+    Await call() under the concurrency limit once the rate limiter grants capacity,
+    backing off exponentially if a rate limit is hit anyway.
+    """
+    for attempt in range(LLM_MAX_RETRIES):
+        try:
+            async with semaphore:
+                await limiter.acquire(estimated_tokens)
+                return await call()
+        except RateLimitError:
+            if attempt == LLM_MAX_RETRIES - 1:
+                raise
+            delay = LLM_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"      Rate limited, retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+
+async def _astream_groups(group_chain, propositions: str) -> list[dict]:
+    """Stream the grouping response, parsing each group as soon as it is complete."""
+    parser = _GroupStreamParser()
+    async for chunk in group_chain.astream({"propositions": propositions}):
+        parser.feed(chunk.content)
+    return parser.close()
+
+
+class _GroupStreamParser:
+    """
+    Incrementally extracts the objects of a streamed JSON array of groups.
+    
+    Each feed() only decodes from the end of the last complete object, so the
+    response is parsed once overall rather than re-parsed on every chunk.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self.groups = []
+
+    def feed(self, text: str) -> list[dict]:
+        """Add streamed text and return any groups that became complete."""
+        self._buffer += text
+        # A group can only have closed if this piece contains a closing brace
+        if "}" not in text:
+            return []
+        new_groups = []
+        while True:
+            start = self._buffer.find("{", self._pos)
+            if start == -1:
+                break
+            try:
+                group, end = _JSON_DECODER.raw_decode(self._buffer, start)
+            except json.JSONDecodeError:
+                break
+            self._pos = end
+            new_groups.append(group)
+        self.groups.extend(new_groups)
+        return new_groups
+
+    def close(self) -> list[dict]:
+        """
+        Return all groups once the array is known to be complete (only the
+        closing bracket, whitespace or a fence follow the last group);
+        otherwise strictly re-parse the full text, so a truncated or malformed
+        response raises instead of silently dropping its remaining groups.
+        """
+        if self.groups and CODE_FENCE_RE.sub("", self._buffer[self._pos:]).strip() == "]":
+            return self.groups
+        return _parse_groups(self._buffer)
+
+
+def _parse_groups(groups_text: str) -> list[dict]:
+    """Parse the grouping LLM's JSON response, tolerating markdown code fences."""
+    return orjson.loads(CODE_FENCE_RE.sub('', groups_text).encode("utf-8"))
+
+
+def _checkpoint_path(doc_type: str, sub_section: str) -> Path:
+    """Checkpoint file for one sub-section, keyed by its content."""
+    key = hashlib.sha256(f"{LLM_MODEL}\n{doc_type}\n{sub_section}".encode("utf-8")).hexdigest()
+    return CHECKPOINT_DIR / f"{key}.json"
+
+
+def _load_checkpoint(doc_type: str, sub_section: str) -> list[dict] | None:
+    """Load the saved groups for a sub-section, or None if it has not been processed."""
+    path = _checkpoint_path(doc_type, sub_section)
+    if not path.exists():
+        return None
+    try:
+        return orjson.loads(path.read_bytes())
+    except (orjson.JSONDecodeError, IOError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path.name}: {e}")
+        return None
+
+
+def _save_checkpoint(doc_type: str, sub_section: str, groups: list[dict]) -> None:
+    """Persist a sub-section's groups so reruns can skip its LLM calls."""
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    _checkpoint_path(doc_type, sub_section).write_bytes(orjson.dumps(groups))
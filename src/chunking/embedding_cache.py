@@ -0,0 +1,94 @@
+"""
+Embedding Cache
+Persists sentence embeddings on disk, keyed by content hash, so re-chunking an
+unchanged document does not re-embed it.
+"""
+import hashlib
+import logging
+import sqlite3
+from array import array
+from functools import lru_cache
+from langchain_openai import OpenAIEmbeddings
+from src.config import BASE_DIR, OPENAI_API_KEY, EMBEDDING_MODEL, LLM_CLIENT_MAX_RETRIES
+from src.util.http_clients import get_http_client
+
+logger = logging.getLogger("isps.embedding_cache")
+
+EMBEDDING_CACHE_PATH = BASE_DIR / "cache" / "embeddings.sqlite"
+
+# In-process layer over the SQLite store: (model, sha256) -> vector
+_memory_cache: dict[tuple[str, str], list[float]] = {}
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    EMBEDDING_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(EMBEDDING_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings ("
+        "model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL, "
+        "PRIMARY KEY (model, key))"
+    )
+    return conn
+
+
+class CachedOpenAIEmbeddings(OpenAIEmbeddings):
+    """
+    OpenAIEmbeddings that only sends texts it has never embedded before.
+    
+    Lookups go memory -> SQLite -> API; all misses are embedded in one
+    batched call and written back to both layers.
+    """
+
+    def embed_documents(self, texts: list[str], chunk_size: int | None = None, **kwargs) -> list[list[float]]:
+        # Vectors of different widths must not be mixed
+        model = self.model if self.dimensions is None else f"{self.model}:{self.dimensions}"
+        keys = [_text_key(t) for t in texts]
+        vectors = {}
+        for key in keys:
+            cached = _memory_cache.get((model, key))
+            if cached is not None:
+                vectors[key] = cached
+        
+        with _connect() as conn:
+            missing = [k for k in dict.fromkeys(keys) if k not in vectors]
+            for key in missing:
+                row = conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND key = ?",
+                    (model, key),
+                ).fetchone()
+                if row is not None:
+                    vectors[key] = array("d", row[0]).tolist()
+                    _memory_cache[(model, key)] = vectors[key]
+            
+            # Embed each distinct uncached text once, in a single batched request
+            uncached = {k: t for k, t in zip(keys, texts) if k not in vectors}
+            if uncached:
+                logger.info(f"Embedding {len(uncached)} uncached text(s), "
+                            f"{len(set(keys)) - len(uncached)} served from cache")
+                new_vectors = super().embed_documents(list(uncached.values()), chunk_size, **kwargs)
+                for key, vector in zip(uncached, new_vectors):
+                    vectors[key] = vector
+                    _memory_cache[(model, key)] = vector
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                    [(model, k, array("d", vectors[k]).tobytes()) for k in uncached],
+                )
+        conn.close()
+        
+        return [vectors[k] for k in keys]
+
+
+@lru_cache(maxsize=None)
+def get_cached_embeddings(dimensions: int | None = None) -> CachedOpenAIEmbeddings:
+    """Shared cached EMBEDDING_MODEL client for a given output width."""
+    return CachedOpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        dimensions=dimensions,
+        openai_api_key=OPENAI_API_KEY,
+        http_client=get_http_client(),
+        max_retries=LLM_CLIENT_MAX_RETRIES,
+    )
@@ -2,48 +2,9 @@
 Fixed/Recursive Text Chunker
 Uses RecursiveCharacterTextSplitter with document-aware separators.
 """
-import re
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from src.config import CHUNK_SIZE, CHUNK_OVERLAP, SEPARATORS
-
-
-def _extract_objective_id(text: str) -> str:
-    """Extract strategic objective ID from chunk text."""
-    patterns = [
-        r"STRATEGIC OBJECTIVE (\d)",
-        r"Strategic Objective (\d)",
-        r"SO(\d)",
-        r"Action Plan:.*?Objective (\d)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return f"SO{match.group(1)}"
-    return "GENERAL"
-
-
-def _extract_section_type(text: str) -> str:
-    """Identify the type of content in a chunk."""
-    text_lower = text.lower()
-    if "key performance indicator" in text_lower or "| kpi" in text_lower:
-        return "kpi_table"
-    elif "timeline" in text_lower or "milestone" in text_lower:
-        return "timeline"
-    elif "action id" in text_lower or "| action" in text_lower:
-        return "action_table"
-    elif "risk" in text_lower and "|" in text:
-        return "risk_table"
-    elif "budget" in text_lower:
-        return "budget"
-    elif "alignment" in text_lower:
-        return "alignment"
-    elif "executive summary" in text_lower or "vision" in text_lower:
-        return "executive_summary"
-    elif "governance" in text_lower:
-        return "governance"
-    elif "description" in text_lower:
-        return "description"
-    return "general"
+from src.chunking._metadata import extract_metadata_batch
 
 
 def fixed_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
@@ -68,11 +29,12 @@ def fixed_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
     
     chunks = splitter.split_text(text)
     
+    objective_ids, section_types = extract_metadata_batch(chunks)
+    
     result = []
-    for i, chunk_text in enumerate(chunks):
-        objective_id = _extract_objective_id(chunk_text)
-        section_type = _extract_section_type(chunk_text)
-        
+    for i, (chunk_text, objective_id, section_type) in enumerate(
+        zip(chunks, objective_ids, section_types)
+    ):
         result.append({
             "text": chunk_text,
             "metadata": {
@@ -4,48 +4,16 @@ Splits text based on embedding similarity between consecutive sentences.
 Groups semantically related content together.
 """
 import re
-from langchain_openai import OpenAIEmbeddings
-from langchain_experimental.text_splitter import SemanticChunker
+import numpy as np
 from src.config import OPENAI_API_KEY, EMBEDDING_MODEL, SEMANTIC_BREAKPOINT_PERCENTILE
+from src.chunking._metadata import extract_objective_id, extract_section_type
+from src.chunking.embedding_cache import CachedOpenAIEmbeddings
 
+# Sentence boundary: whitespace following terminal punctuation
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
 
-def _extract_objective_id(text: str) -> str:
-    """Extract strategic objective ID from chunk text."""
-    patterns = [
-        r"STRATEGIC OBJECTIVE (\d)",
-        r"Strategic Objective (\d)",
-        r"SO(\d)",
-        r"Action Plan:.*?Objective (\d)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return f"SO{match.group(1)}"
-    return "GENERAL"
-
-
-def _extract_section_type(text: str) -> str:
-    """Identify the type of content in a chunk."""
-    text_lower = text.lower()
-    if "key performance indicator" in text_lower or "| kpi" in text_lower:
-        return "kpi_table"
-    elif "timeline" in text_lower or "milestone" in text_lower:
-        return "timeline"
-    elif "action id" in text_lower or "| action" in text_lower:
-        return "action_table"
-    elif "risk" in text_lower and "|" in text:
-        return "risk_table"
-    elif "budget" in text_lower:
-        return "budget"
-    elif "alignment" in text_lower:
-        return "alignment"
-    elif "executive summary" in text_lower or "vision" in text_lower:
-        return "executive_summary"
-    elif "governance" in text_lower:
-        return "governance"
-    elif "description" in text_lower:
-        return "description"
-    return "general"
+# Texts per embedding request
+EMBEDDING_BATCH_SIZE = 512
 
 
 def semantic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
@@ -53,6 +21,8 @@ def semantic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
     Split text based on semantic similarity between consecutive segments.
     
     Uses OpenAI embeddings to find natural breakpoints where the topic shifts.
+    Sentence embeddings are cached on disk, so rerunning on an unchanged
+    document makes no embedding requests.
     
     Args:
         text: Full document text
@@ -62,24 +32,18 @@ def semantic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
     Returns:
         List of dicts with 'text' and 'metadata' keys
     """
-    embeddings = OpenAIEmbeddings(
+    embeddings = CachedOpenAIEmbeddings(
         model=EMBEDDING_MODEL,
         openai_api_key=OPENAI_API_KEY,
     )
     
-    chunker = SemanticChunker(
-        embeddings=embeddings,
-        breakpoint_threshold_type="percentile",
-        breakpoint_threshold_amount=SEMANTIC_BREAKPOINT_PERCENTILE,
-    )
-    
-    docs = chunker.create_documents([text])
+    sentences = [s for s in SENTENCE_SPLIT_RE.split(text) if s.strip()]
+    chunk_texts = _split_on_breakpoints(sentences, _embed_sentences(embeddings, sentences))
     
     result = []
-    for i, doc in enumerate(docs):
-        chunk_text = doc.page_content
-        objective_id = _extract_objective_id(chunk_text)
-        section_type = _extract_section_type(chunk_text)
+    for i, chunk_text in enumerate(chunk_texts):
+        objective_id = extract_objective_id(chunk_text)
+        section_type = extract_section_type(chunk_text)
         
         result.append({
             "text": chunk_text,
@@ -94,3 +58,33 @@ def semantic_chunk(text: str, doc_type: str, source_file: str) -> list[dict]:
         })
     
     return result
+
+
+def _embed_sentences(embeddings, sentences: list[str]) -> np.ndarray:
+    """Embed all sentences in a few large batched requests."""
+    vectors = []
+    for start in range(0, len(sentences), EMBEDDING_BATCH_SIZE):
+        vectors.extend(embeddings.embed_documents(sentences[start:start + EMBEDDING_BATCH_SIZE]))
+    return np.asarray(vectors, dtype=float)
+
+
+def _split_on_breakpoints(sentences: list[str], vectors: np.ndarray) -> list[str]:
+    """
+    Group consecutive sentences, starting a new chunk wherever the cosine distance
+    to the next sentence exceeds the SEMANTIC_BREAKPOINT_PERCENTILE-th percentile.
+    """
+    if len(sentences) < 2:
+        return [" ".join(sentences)] if sentences else []
+    
+    a, b = vectors[:-1], vectors[1:]
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    distances = 1.0 - (a * b).sum(axis=1) / np.where(norms == 0, 1.0, norms)
+    threshold = np.percentile(distances, SEMANTIC_BREAKPOINT_PERCENTILE)
+    
+    chunks = []
+    start = 0
+    for idx in np.flatnonzero(distances > threshold):
+        chunks.append(" ".join(sentences[start:idx + 1]))
+        start = idx + 1
+    chunks.append(" ".join(sentences[start:]))
+    return chunks
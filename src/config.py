@@ -23,11 +23,21 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
 # Models
 LLM_MODEL = "gpt-4o-mini"
+GUARDRAIL_MODEL = "gpt-4.1-nano"  # YES/NO relevance classification only
 EMBEDDING_MODEL = "text-embedding-3-small"
+# Stored vector width; text-embedding-3 models are Matryoshka-trained, so truncating
+# 1536 -> 512 keeps retrieval quality while cutting index size and search cost 3x.
+# Changing it requires re-ingesting (a forced re-run of the pipeline)
+EMBEDDING_DIMENSIONS = 512
 
 # LLM Parameters
 LLM_TEMPERATURE = 0.1        # Low temperature for consistent analysis
 LLM_MAX_TOKENS = 2000
+LLM_MAX_CONCURRENCY = 4       # Objectives analyzed concurrently (bounds parallel OpenAI requests)
+LLM_CLIENT_MAX_RETRIES = 5    # OpenAI client retries (exponential backoff) on 429s, timeouts and 5xx
+SPECULATIVE_IMPROVEMENT = True  # Start the improvement agent alongside the sync agent
+LLM_RPM = 5000                # OpenAI account request limit (requests/minute)
+LLM_TPM = 800000              # OpenAI account token limit (tokens/minute)
 
 # ─── Chunking ────────────────────────────────────────────────────────────────
 # Fixed/Recursive chunking
@@ -44,14 +54,31 @@ SEPARATORS = [
 # Semantic chunking
 SEMANTIC_BREAKPOINT_PERCENTILE = 85
 
+# Agentic chunking
+AGENTIC_MAX_CONCURRENCY = 8   # Concurrent LLM calls while chunking sub-sections
+AGENTIC_MAX_INPUT_TOKENS = 1500  # Sub-section token budget per proposition-extraction call
+
 # ─── Vector Store ────────────────────────────────────────────────────────────
 CHROMA_COLLECTION_STRATEGIC = "strategic_plan"
 CHROMA_COLLECTION_ACTION = "action_plan"
 CHROMA_COLLECTION_COMBINED = "combined"
+# HyDE / multi-query semantic cache; never cleared by re-ingestion, so named per vector width
+CHROMA_COLLECTION_EXPANSION_CACHE = f"query_expansion_cache_{EMBEDDING_DIMENSIONS}d"
+
+# HNSW index parameters (a few thousand small chunks; favour ingest speed)
+HNSW_CONSTRUCTION_EF = 64
+HNSW_M = 16
+# Raise for recall-sensitive evaluation runs; fixed when a collection is
+# created, so a new value only takes effect after re-ingesting
+HNSW_SEARCH_EF = int(os.getenv("ISPS_HNSW_SEARCH_EF", "64"))
 
 # Retrieval
 RETRIEVAL_TOP_K = 10          # Initial retrieval count
 RERANK_TOP_K = 5              # After reranking
+RERANK_CANDIDATES = 40        # Ensemble results scored by the cross-encoder
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+EXPANSION_CACHE_THRESHOLD = 0.92  # Min cosine similarity for a paraphrased query to reuse an expansion
+EXPANSION_SKIP_RELEVANCE = 0.85   # Skip HyDE/multi-query when the raw query's best match is this close
 
 # ─── Strategic Objectives ────────────────────────────────────────────────────
 STRATEGIC_OBJECTIVES = {
@@ -3,13 +3,34 @@ ISPS Dashboard — Main Application
 Intelligent Strategic Plan Synchronization System
 """
 import streamlit as st
+import importlib
+import re
 import sys
+import time
 import os
+from pathlib import Path
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# Add project root to path. Streamlit re-executes this script on every
+# interaction, but sys.path is per process, so only do it before the first import
+if "src" not in sys.modules:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.config import DASHBOARD_TITLE, DASHBOARD_ICON
+from src.dashboard.session import build_analysis_context
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Session state keys initialized on first run
+SESSION_DEFAULTS = {
+    "analysis_results": None,
+    "knowledge_graph": None,
+    "chunks": None,
+    "pipeline_run": False,
+    "pipeline_running": False,
+}
+
+# Minimum seconds between pipeline progress widget updates
+PROGRESS_UPDATE_INTERVAL = 0.2
 
 st.set_page_config(
     page_title=DASHBOARD_TITLE,
@@ -19,208 +40,23 @@ st.set_page_config(
 )
 
 # ─── Custom CSS ──────────────────────────────────────────────────────────────
-st.markdown("""
-<style>
-    /* Light premium theme */
-    .stApp {
-        background: linear-gradient(135deg, #f8fafc 0%, #ffffff 50%, #f1f5f9 100%);
-        color: #000000;
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #f8fafc 0%, #f1f5f9 100%);
-        border-right: 1px solid rgba(99, 102, 241, 0.1);
-    }
-    
-    /* Metric cards */
-    [data-testid="stMetricValue"] {
-        font-size: 2rem !important;
-        font-weight: 700 !important;
-        color: #000000 !important;
-    }
+@st.cache_resource
+def _load_css() -> str:
+    """Read and minify the dashboard stylesheet once per server process."""
+    css = (STATIC_DIR / "app.css").read_text(encoding="utf-8")
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([:;{},>])\s*", r"\1", css).strip()
+    return f"<style>{css}</style>"
 
-    [data-testid="stMetricLabel"] {
-        color: #0f172a !important;
-    }
-    
-    /* Headers */
-    h1, h2, h3 {
-        background: linear-gradient(90deg, #1e1b4b, #312e81, #4338ca);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-weight: 800 !important;
-    }
-    
-    /* Cards */
-    .score-card {
-        background: #ffffff;
-        border: 1px solid rgba(226, 232, 240, 0.8);
-        border-radius: 16px;
-        padding: 1.5rem;
-        margin: 0.5rem 0;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03);
-        transition: all 0.3s ease;
-    }
-    .score-card:hover {
-        border-color: rgba(99, 102, 241, 0.4);
-        transform: translateY(-2px);
-        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.05), 0 4px 6px -2px rgba(0, 0, 0, 0.025);
-    }
-    
-    /* Status badges */
-    .badge-full { 
-        background: #dcfce7; 
-        color: #052e16; 
-        padding: 4px 12px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;
-        border: 1px solid #86efac;
-    }
-    .badge-partial { 
-        background: #fef9c3; 
-        color: #422006; 
-        padding: 4px 12px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;
-        border: 1px solid #fde047;
-    }
-    .badge-weak { 
-        background: #ffedd5; 
-        color: #7c2d12; 
-        padding: 4px 12px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;
-        border: 1px solid #fdba74;
-    }
-    .badge-missing { 
-        background: #fee2e2; 
-        color: #7f1d1d; 
-        padding: 4px 12px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;
-        border: 1px solid #fca5a5;
-    }
-    
-    /* Reasoning trace */
-    .thought-step { 
-        border-left: 3px solid #60a5fa; padding-left: 1rem; margin: 0.5rem 0;
-        background: #eff6ff; border-radius: 0 8px 8px 0; padding: 0.8rem;
-        color: #000000;
-    }
-    .action-step { 
-        border-left: 3px solid #f59e0b; padding-left: 1rem; margin: 0.5rem 0;
-        background: #fffbeb; border-radius: 0 8px 8px 0; padding: 0.8rem;
-        color: #000000;
-    }
-    .observation-step { 
-        border-left: 3px solid #22c55e; padding-left: 1rem; margin: 0.5rem 0;
-        background: #f0fdf4; border-radius: 0 8px 8px 0; padding: 0.8rem;
-        color: #000000;
-    }
-    .final-step { 
-        border-left: 3px solid #8b5cf6; padding-left: 1rem; margin: 0.5rem 0;
-        background: #f5f3ff; border-radius: 0 8px 8px 0; padding: 0.8rem;
-        color: #000000;
-    }
-    
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        font-weight: 600 !important;
-        color: #000000 !important;
-        background-color: #ffffff !important;
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background-color: transparent;
-    }
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px;
-        padding: 8px 20px;
-        background-color: #ffffff;
-        color: #0f172a;
-        border: 1px solid #e2e8f0;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #eff6ff !important;
-        color: #1e3a8a !important;
-        border-color: #bfdbfe !important;
-    }
-    
-    /* General Text */
-    p, li, span {
-        color: #000000;
-    }
-    
-    /* Force text color in code blocks and expanders */
-    code, pre, .stMarkdown, .stText {
-        color: #000000 !important;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Selectbox styling - AGGRESSIVE FIX */
-    div[data-baseweb="select"] > div {
-        background-color: #ffffff !important;
-        color: #000000 !important;
-        border: 1px solid #cbd5e1 !important;
-    }
-    
-    /* The selected value text specifically */
-    div[data-baseweb="select"] div {
-        color: #000000 !important;
-    }
-    
-    /* Verified Dropdown Overlay */
-    div[data-baseweb="popover"], div[data-baseweb="popover"] div {
-        background-color: #ffffff !important;
-        color: #000000 !important;
-    }
-    
-    div[data-baseweb="unknown"] {
-        background-color: #ffffff !important;
-    }
-    
-    /* Options in the dropdown */
-    li[data-baseweb="option"] {
-        background-color: #ffffff !important;
-        color: #000000 !important;
-    }
-    
-    /* Expander / Agent Reasoning styling */
-    .streamlit-expanderHeader {
-        color: #000000 !important;
-        background-color: #f1f5f9 !important;
-        border: 1px solid #cbd5e1 !important;
-        border-radius: 8px !important;
-    }
-    
-    .streamlit-expanderHeader p {
-        color: #000000 !important;
-        font-weight: 600 !important;
-    }
-    
-    .streamlit-expanderContent {
-        background-color: #ffffff !important;
-        color: #000000 !important;
-        border: 1px solid #e2e8f0;
-        border-top: none;
-        border-radius: 0 0 8px 8px;
-    }
-    
-    /* Force all paragraph text to black to catch any stragglers */
-    .stMarkdown p {
-        color: #000000 !important;
-    }
-""", unsafe_allow_html=True)
+
+# Re-emitted on every rerun (Streamlit drops elements a rerun doesn't render),
+# but the file is only read once
+st.markdown(_load_css(), unsafe_allow_html=True)
 
 # ─── Initialize Session State ────────────────────────────────────────────────
-if "analysis_results" not in st.session_state:
-    st.session_state.analysis_results = None
-if "knowledge_graph" not in st.session_state:
-    st.session_state.knowledge_graph = None
-if "chunks" not in st.session_state:
-    st.session_state.chunks = None
-if "pipeline_run" not in st.session_state:
-    st.session_state.pipeline_run = False
-if "pipeline_running" not in st.session_state:
-    st.session_state.pipeline_running = False
+for key, default in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, default)
 
 # ─── Auto-load cached results on startup ─────────────────────────────────────
 if not st.session_state.pipeline_run and not st.session_state.pipeline_running:
@@ -228,19 +64,15 @@ if not st.session_state.pipeline_run and not st.session_state.pipeline_running:
     cached = load_pipeline_cache()
     if cached:
         st.session_state.analysis_results = cached.get("analysis_results")
+        st.session_state.analysis_context_str = (
+            build_analysis_context(st.session_state.analysis_results)
+            if st.session_state.analysis_results else None
+        )
         st.session_state.chunks = cached.get("chunks")
         st.session_state.eval_results = cached.get("eval_results")
         st.session_state.pipeline_run = True
-        # Rebuild KG from docs if needed (lightweight)
-        if st.session_state.knowledge_graph is None:
-            try:
-                from src.ingestion.document_loader import load_all_documents
-                from src.ontology.builder import build_knowledge_graph
-                docs = load_all_documents()
-                kg = build_knowledge_graph(docs["strategic_plan"], docs["action_plan"])
-                st.session_state.knowledge_graph = kg
-            except Exception:
-                pass  # KG is optional for basic functionality
+        # The KG is rebuilt on demand by the pages that draw it
+        # (src.dashboard.session.get_knowledge_graph)
 
 # ─── Sidebar ─────────────────────────────────────────────────────────────────
 with st.sidebar:
@@ -270,8 +102,10 @@ with st.sidebar:
             clear_pipeline_cache()
             st.session_state.pipeline_run = False
             st.session_state.analysis_results = None
+            st.session_state.analysis_context_str = None
             st.session_state.chunks = None
             st.session_state.knowledge_graph = None
+            st.session_state.pop("_kg_mini_html", None)
         st.session_state.run_pipeline = True
     
     if st.session_state.pipeline_run:
@@ -299,7 +133,7 @@ if st.session_state.get("run_pipeline") and not st.session_state.get("pipeline_r
             docs = load_all_documents()
             
             # Step 2: Run chunking
-            progress_bar.progress(10, text="✂️ Fixed chunking — strategic plan...")
+            progress_bar.progress(10, text="✂️ Fixed chunking...")
             from src.chunking.fixed_chunker import fixed_chunk
             from src.chunking.semantic_chunker import semantic_chunk
             # from src.chunking.agentic_chunker import agentic_chunk # Commented out
@@ -308,12 +142,10 @@ if st.session_state.get("run_pipeline") and not st.session_state.get("pipeline_r
             ap_text = docs["action_plan"]
             
             sp_fixed = fixed_chunk(sp_text, "strategic_plan", "strategic_plan.docx")
-            progress_bar.progress(13, text="✂️ Fixed chunking — action plan...")
             ap_fixed = fixed_chunk(ap_text, "action_plan", "action_plan.docx")
             
-            progress_bar.progress(16, text="🔗 Semantic chunking — strategic plan...")
+            progress_bar.progress(16, text="🔗 Semantic chunking...")
             sp_semantic = semantic_chunk(sp_text, "strategic_plan", "strategic_plan.docx")
-            progress_bar.progress(20, text="🔗 Semantic chunking — action plan...")
             ap_semantic = semantic_chunk(ap_text, "action_plan", "action_plan.docx")
             
             progress_bar.progress(25, text="🤖 Agentic chunking — strategic plan (LLM-driven, may take a minute)...")
@@ -347,15 +179,44 @@ if st.session_state.get("run_pipeline") and not st.session_state.get("pipeline_r
             progress_bar.progress(65, text="🤖 Running agent analysis (this takes a few minutes)...")
             from src.agents.orchestrator import run_full_analysis
             
+            # Objectives are analyzed concurrently, so track progress by completions.
+            # Every widget update is a websocket message and a frontend render, so
+            # intermediate updates are throttled; completions always go through.
+            from src.config import STRATEGIC_OBJECTIVES
+            completed_objectives = set()
+            last_update = [0.0]
+            
             def update_progress(obj_id, status):
-                from src.config import STRATEGIC_OBJECTIVES
-                obj_ids = list(STRATEGIC_OBJECTIVES.keys())
-                idx = obj_ids.index(obj_id) if obj_id in obj_ids else 0
-                pct = 65 + int((idx / len(obj_ids)) * 25)
+                now = time.monotonic()
+                done = status.startswith("Done")
+                if done:
+                    completed_objectives.add(obj_id)
+                elif now - last_update[0] < PROGRESS_UPDATE_INTERVAL:
+                    return
+                last_update[0] = now
+                pct = 65 + int((len(completed_objectives) / len(STRATEGIC_OBJECTIVES)) * 25)
                 progress_bar.progress(pct, text=f"🤖 {obj_id}: {status}")
             
-            results = run_full_analysis(kg, progress_callback=update_progress)
+            # Stream the executive summary into the page while it is generated
+            summary_placeholder = st.empty()
+            summary_parts = []
+            last_summary_update = [0.0]
+            
+            def on_event(event):
+                if event["type"] == "summary_delta":
+                    summary_parts.append(event["delta"])
+                    now = time.monotonic()
+                    if now - last_summary_update[0] >= PROGRESS_UPDATE_INTERVAL:
+                        last_summary_update[0] = now
+                        summary_placeholder.info("".join(summary_parts))
+                elif event["type"] == "complete":
+                    summary_placeholder.empty()
+            
+            results = run_full_analysis(
+                kg, progress_callback=update_progress, event_callback=on_event
+            )
             st.session_state.analysis_results = results
+            st.session_state.analysis_context_str = build_analysis_context(results)
             
             # Step 6: Run evaluation
             progress_bar.progress(95, text="📈 Running evaluation...")
@@ -373,6 +234,7 @@ if st.session_state.get("run_pipeline") and not st.session_state.get("pipeline_r
                 analysis_results=results,
                 chunks=st.session_state.chunks,
                 eval_results=eval_results,
+                knowledge_graph=kg,
             )
             
             progress_bar.progress(100, text="✅ Complete!")
@@ -387,25 +249,15 @@ if st.session_state.get("run_pipeline") and not st.session_state.get("pipeline_r
             st.code(traceback.format_exc())
 
 # ─── Page Routing ────────────────────────────────────────────────────────────
-# ─── Page Routing ────────────────────────────────────────────────────────────
-from src.dashboard.views import (
-    overview,
-    strategy_detail,
-    knowledge_graph,
-    recommendations,
-    evaluation,
-    chat_page,
-)
+# Only the selected page's module is imported; the rest stay unloaded until visited
+PAGES = {
+    "🏠 Overview": "src.dashboard.views.overview",
+    "💬 Chat": "src.dashboard.views.chat_page",
+    "📊 Strategy Detail & Guidance": "src.dashboard.views.strategy_detail",
+    "🕸️ Knowledge Graph": "src.dashboard.views.knowledge_graph",
+    "💡 Recommendations": "src.dashboard.views.recommendations",
+    "📋 Ground Truth": "src.dashboard.views.evaluation",
+}
 
-if page == "🏠 Overview":
-    overview.show()
-elif page == "💬 Chat":
-    chat_page.show()
-elif page == "📊 Strategy Detail & Guidance":
-    strategy_detail.show()
-elif page == "🕸️ Knowledge Graph":
-    knowledge_graph.show()
-elif page == "💡 Recommendations":
-    recommendations.show()
-elif page == "📋 Ground Truth":
-    evaluation.show()
+if page in PAGES:
+    importlib.import_module(PAGES[page]).show()
@@ -0,0 +1,247 @@
+"""
+Dashboard Session Helpers
+Lazily restores session state that is expensive to rebuild.
+"""
+import streamlit as st
+from src.config import STRATEGIC_OBJECTIVES
+
+TRACE_STEP_SEPARATOR = "=" * 40
+
+
+def get_knowledge_graph():
+    """
+    Return the session's knowledge graph. After results were restored from the
+    pipeline cache, it is loaded from the saved graph on first use, or rebuilt
+    from the documents if no graph was saved.
+    
+    Returns:
+        RDF graph, or None if the pipeline has not run or the rebuild failed
+    """
+    kg = st.session_state.get("knowledge_graph")
+    if (
+        kg is None
+        and st.session_state.get("pipeline_run")
+        and not st.session_state.get("kg_rebuild_failed")
+    ):
+        from src.ingestion.pipeline_cache import load_cached_knowledge_graph
+        kg = load_cached_knowledge_graph()
+        if kg is not None:
+            st.session_state.knowledge_graph = kg
+            return kg
+        try:
+            from src.ingestion.document_loader import load_all_documents
+            from src.ontology.builder import build_knowledge_graph
+            docs = load_all_documents()
+            kg = build_knowledge_graph(docs["strategic_plan"], docs["action_plan"])
+            st.session_state.knowledge_graph = kg
+        except Exception:
+            # KG is optional for basic functionality; don't retry on every rerun
+            st.session_state.kg_rebuild_failed = True
+    return kg
+
+
+def get_kg_fingerprint(kg) -> str:
+    """
+    Return a stable cache key for the given knowledge graph.
+    
+    Computed once per graph object and kept in session state, so cached
+    renderers can key on it without hashing the triples on every rerun.
+    """
+    cached = st.session_state.get("kg_fingerprint")
+    if cached is not None and cached[0] is kg:
+        return cached[1]
+    fingerprint = f"{len(kg)}-{hash(frozenset(kg)):x}"
+    st.session_state.kg_fingerprint = (kg, fingerprint)
+    return fingerprint
+
+
+# Entity and relationship styling shared by the knowledge graph views
+KG_COLORS = {
+    "StrategicObjective": "#6366f1",
+    "Action": "#f59e0b",
+    "KPI": "#22c55e",
+    "Risk": "#ef4444",
+    "Person": "#8b5cf6",
+    "Department": "#06b6d4",
+    "StrategicPlan": "#3b82f6",
+    "ActionPlan": "#ec4899",
+    "Milestone": "#14b8a6",
+}
+
+KG_SIZES = {
+    "StrategicPlan": 40,
+    "ActionPlan": 40,
+    "StrategicObjective": 30,
+    "Action": 15,
+    "KPI": 20,
+    "Risk": 18,
+    "Person": 12,
+}
+
+KG_EDGE_COLORS = {
+    "hasObjective": "#6366f1",
+    "hasAction": "#f59e0b",
+    "hasKPI": "#22c55e",
+    "supportsObjective": "#f97316",
+    "supportsKPI": "#10b981",
+    "ownedBy": "#8b5cf6",
+    "hasRisk": "#ef4444",
+}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_kg_html(
+    _kg,
+    graph_fingerprint: str,
+    show_types: tuple,
+    physics: bool,
+    height: str,
+    edge_properties: tuple,
+    label_length: int = 40,
+    edge_width: float = 2,
+    edge_labels: bool = True,
+    colors: dict = KG_COLORS,
+    sizes: dict = KG_SIZES,
+    edge_colors: dict = KG_EDGE_COLORS,
+) -> str:
+    """
+    Build the Pyvis network HTML for the selected entity types.
+    
+    Cached per graph_fingerprint and display arguments; the graph itself is
+    excluded from the cache key.
+    
+    Args:
+        show_types: Entity type names to draw as nodes
+        edge_properties: ISPS predicate names to draw as edges between them
+        label_length: Node titles are cut to this many characters
+        edge_labels: Label each edge with its predicate name
+    """
+    from pyvis.network import Network
+    from rdflib import RDF
+    from src.ontology.schema import ISPS
+
+    net = Network(
+        height=height,
+        width="100%",
+        bgcolor="#ffffff",
+        font_color="black",
+        directed=True,
+    )
+    net.force_atlas_2based(
+        gravity=-50,
+        central_gravity=0.01,
+        spring_length=200,
+        spring_strength=0.08,
+    )
+    if not physics:
+        net.toggle_physics(False)
+
+    label_index = {s: str(o)[:label_length] for s, o in _kg.subject_objects(ISPS["hasTitle"])}
+    uri_short = {}
+
+    def short(uri) -> str:
+        node_id = uri_short.get(uri)
+        if node_id is None:
+            node_id = uri_short[uri] = str(uri).rsplit("#", 1)[-1]
+        return node_id
+
+    # Nodes and edges are appended as plain dicts, skipping Pyvis's per-call
+    # validation; node_map still guards against duplicate short ids
+    added_nodes = set()
+    wanted = {ISPS[t]: t for t in show_types}
+    for s, o in _kg.subject_objects(RDF.type):
+        entity_type = wanted.get(o)
+        if entity_type is None or s in added_nodes:
+            continue
+        added_nodes.add(s)
+        node_id = short(s)
+        if node_id not in net.node_map:
+            label = label_index.get(s, node_id)
+            node = {
+                "id": node_id,
+                "label": label,
+                "color": colors.get(entity_type, "#888"),
+                "size": sizes.get(entity_type, 15),
+                "title": f"{entity_type}: {label}",
+                "shape": "dot",
+                "font": {"color": net.font_color},
+            }
+            net.nodes.append(node)
+            net.node_map[node_id] = node
+
+    pred_to_name = {ISPS[p]: p for p in edge_properties}
+    for s, p, o in _kg:
+        prop_name = pred_to_name.get(p)
+        if prop_name is None:
+            continue
+        if s in added_nodes and o in added_nodes:
+            edge = {
+                "from": short(s),
+                "to": short(o),
+                "color": edge_colors.get(prop_name, "#555"),
+                "width": edge_width,
+                "arrows": "to",
+            }
+            if edge_labels:
+                edge["label"] = prop_name
+            net.edges.append(edge)
+
+    return net.generate_html(notebook=False)
+
+
+def format_trace_text(trace: list[dict]) -> str:
+    """Format reasoning trace into a single text block."""
+    parts = []
+    for step in trace:
+        header = f"[{step.get('step_number', 0)}] {step.get('step_type', '').upper()}"
+        if step.get("tool_name"):
+            header += f": {step['tool_name']}"
+        
+        text = f"{header}\n{'-' * len(header)}\n{step.get('content', '')}\n\n"
+        if step.get("tool_input"):
+            text += f"Input: {step['tool_input']}\n\n"
+        parts.append(f"{text}{TRACE_STEP_SEPARATOR}\n")
+    
+    return "\n".join(parts)
+
+
+def get_trace_text(key: str, trace: list[dict]) -> str:
+    """
+    Return the formatted text for a reasoning trace, cached in session state
+    under the given key until a different trace list is passed.
+    """
+    cache = st.session_state.setdefault("_trace_text", {})
+    cached = cache.get(key)
+    if cached is not None and cached[0] is trace:
+        return cached[1]
+    text = format_trace_text(trace)
+    cache[key] = (trace, text)
+    return text
+
+
+def build_analysis_context(results: dict) -> str:
+    """
+    Format the analysis results section of the chat LLM context.
+    
+    Depends only on the pipeline results, so it is stored in
+    st.session_state.analysis_context_str whenever results are set.
+    """
+    context_parts = []
+    context_parts.append("\n=== ANALYSIS RESULTS ===")
+    context_parts.append("(Use these for alignment scores, levels, and improvement suggestions)")
+    context_parts.append(f"Overall Sync Score: {results.get('overall_score', 0):.0%}")
+    context_parts.append(f"Overall Level: {results.get('overall_level', 'Unknown')}")
+    
+    for obj_id, obj_data in results.get("objectives", {}).items():
+        score = obj_data.get("combined_score", 0)
+        level = obj_data.get("sync_assessment", {}).get("alignment_level", "Unknown")
+        justification = obj_data.get("sync_assessment", {}).get("justification", "")
+        context_parts.append(f"\n{obj_id} ({STRATEGIC_OBJECTIVES.get(obj_id, '')}): {score:.0%} - {level}")
+        if justification:
+            context_parts.append(f"  Justification: {justification}")
+        
+        improvements = obj_data.get("improvements")
+        if improvements and improvements.get("suggestions"):
+            context_parts.append(f"  Improvements: {improvements['suggestions'][:300]}...")
+    
+    return "\n".join(context_parts)
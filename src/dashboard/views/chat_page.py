@@ -2,8 +2,70 @@
 Chat Interface Page
 Free-form chat with the ISPS system, with live reasoning sidebar.
 """
+from typing import Iterator
 import streamlit as st
-from src.config import OPENAI_API_KEY, LLM_MODEL, STRATEGIC_OBJECTIVES
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from src.config import OPENAI_API_KEY, LLM_MODEL
+from src.dashboard.session import build_analysis_context
+
+
+# Static system prompt: the per-turn context goes in the human message so the
+# system prefix is byte-identical across turns (provider-side prompt caching)
+CHAT_SYSTEM_PROMPT = """You are the ISPS (Intelligent Strategic Plan Synchronization) chat assistant for GreenField University.
+
+**DOMAIN RESTRICTION — STRICTLY ENFORCED:**
+You MUST ONLY answer questions related to:
+- GreenField University's Strategic Plan and Action Plan
+- Strategic Objectives (SO1–SO5), KPIs, actions, milestones, deadlines, owners
+- Synchronization analysis, alignment scores, gaps, and improvement suggestions
+- The ISPS system itself (what it does, how it works)
+
+You MAY also respond to:
+- Basic greetings (hello, hi, thank you, goodbye, etc.) — respond warmly and remind the user what you can help with.
+
+For ANY question outside this domain (e.g. weather, general knowledge, coding, math, news, personal advice, or anything unrelated to the strategic/action plans):
+→ Politely decline: "I'm designed specifically to assist with GreenField University's Strategic Plan and Action Plan analysis. I can help you with alignment scores, KPI tracking, action progress, gap analysis, and improvement recommendations. Could you ask me something about those topics?"
+→ Do NOT attempt to answer the off-topic question, even partially.
+
+You have access to two types of information:
+1. **Document excerpts** from the Strategic Plan and Action Plan — use these for factual questions about specific deadlines, action items, KPIs, owners, progress status, and dates.
+2. **Analysis results** — use these for questions about alignment scores, sync levels, gaps, and improvement suggestions.
+
+Guidelines:
+- For questions about deadlines, actions, KPIs, or specific data: cite the exact information from document excerpts.
+- For questions about alignment or scores: use the analysis results.
+- Present data in clean tables when showing multiple items.
+- Be specific — cite action IDs (e.g. A1.3), dates, owners, and percentages.
+- If information is not available in the context, say so clearly."""
+
+CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", CHAT_SYSTEM_PROMPT),
+    ("human", "{query}\n\nContext:\n{context}"),
+])
+
+
+# Most recent chat messages rendered as individual chat bubbles
+CHAT_HISTORY_WINDOW = 20
+
+# Max characters of each retrieved chunk included in the chat LLM context
+CHAT_CHUNK_MAX_CHARS = 600
+
+# Queries shorter than this, or greetings, are retrieved without HyDE/multi-query
+QUERY_EXPANSION_MIN_WORDS = 5
+GREETING_WORDS = {"hello", "hi", "hey", "thanks", "thank", "bye", "goodbye"}
+
+
+@st.cache_resource
+def _get_chat_chain():
+    """Build the chat prompt | LLM chain once, sharing its HTTP connection pool across turns."""
+    llm = ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=0.3,
+        openai_api_key=OPENAI_API_KEY,
+        request_timeout=30,
+    )
+    return CHAT_PROMPT | llm
 
 
 def show():
@@ -21,12 +83,29 @@ def show():
             {"role": "assistant", "content": "Hello! I'm the ISPS assistant. Ask me anything about the strategic plan synchronization. For example:\n\n- *What's the alignment score for SO5?*\n- *Which KPIs are missing actions?*\n- *What improvements do you suggest for Digital Learning?*"}
         ]
     
+    _chat_fragment(results)
+
+
+@st.fragment
+def _chat_fragment(results: dict):
+    """
+    Chat history, input and reasoning trace. Sending a message reruns only this
+    fragment, not the whole app script (stylesheet, sidebar, routing).
+    Both columns share one fragment so the trace updates with each answer.
+    """
     # ─── Layout ──────────────────────────────────────────────────────────
     chat_col, reasoning_col = st.columns([3, 2])
     
     with chat_col:
-        # Display chat history
-        for msg in st.session_state.chat_messages:
+        # Display chat history. Streamlit re-sends every element on each rerun,
+        # so only the recent messages get their own chat bubbles; older ones are
+        # folded into a single markdown element
+        messages = st.session_state.chat_messages
+        earlier, recent = messages[:-CHAT_HISTORY_WINDOW], messages[-CHAT_HISTORY_WINDOW:]
+        if earlier:
+            with st.expander(f"Earlier messages ({len(earlier)})"):
+                st.markdown(_render_transcript(earlier))
+        for msg in recent:
             with st.chat_message(msg["role"]):
                 st.markdown(msg["content"])
         
@@ -38,14 +117,17 @@ def show():
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Generate response
+            # Generate response, streaming the answer as it is produced
             with st.chat_message("assistant"):
                 with st.spinner("Thinking..."):
                     response, trace = _generate_response(prompt, results)
+                if isinstance(response, str):
                     st.markdown(response)
-                    
-                    # Store trace
-                    st.session_state.chat_reasoning_trace = trace
+                else:
+                    response = st.write_stream(response)
+                
+                # Store trace
+                st.session_state.chat_reasoning_trace = trace
             
             st.session_state.chat_messages.append({"role": "assistant", "content": response})
     
@@ -72,12 +154,51 @@ def show():
             pass
 
 
-def _generate_response(query: str, results: dict) -> tuple[str, list]:
-    """Generate a response using RAG retrieval + analysis results as context."""
-    from langchain_openai import ChatOpenAI
-    from langchain_core.prompts import ChatPromptTemplate
-    import json
+def _needs_query_expansion(query: str) -> bool:
+    """Whether a query is long enough to benefit from HyDE / multi-query expansion."""
+    words = [w.strip(".,!?;:'\"") for w in query.lower().split()]
+    return len(words) >= QUERY_EXPANSION_MIN_WORDS and not GREETING_WORDS.intersection(words)
+
+
+def _render_transcript(messages: list[dict]) -> str:
+    """Format chat messages as one markdown transcript."""
+    speaker = {"user": "**You**", "assistant": "**ISPS**"}
+    return "\n\n---\n\n".join(
+        f"{speaker.get(msg['role'], msg['role'])}: {msg['content']}" for msg in messages
+    )
+
+
+@st.cache_data(ttl=1800, max_entries=256, show_spinner=False)
+def _cached_retrieve(
+    query: str,
+    top_k: int,
+    use_hyde: bool,
+    use_multi_query: bool,
+    kb_version: int,
+) -> list[dict]:
+    """
+    Retrieve chunks from the combined collection, shared across sessions.
+    kb_version only keys the cache, so results are dropped after re-ingestion.
+    """
+    from src.rag.retriever import retrieve_chunks
+    return retrieve_chunks(
+        query=query,
+        collection_name="combined",
+        top_k=top_k,
+        use_hyde=use_hyde,
+        use_multi_query=use_multi_query,
+    )
+
+
+def _generate_response(query: str, results: dict) -> tuple[str | Iterator[str], list]:
+    """
+    Generate a response using RAG retrieval + analysis results as context.
     
+    Returns:
+        Tuple of (response, reasoning trace). The response is a string for canned
+        replies, otherwise an iterator of answer text chunks; the final answer
+        step is added to the trace once the iterator is exhausted.
+    """
     trace = []
     trace.append({"step_type": "thought", "content": f"User asked: '{query}'", "step_number": 1})
     
@@ -103,24 +224,26 @@ def _generate_response(query: str, results: dict) -> tuple[str, list]:
     # ─── Step 1: RAG retrieval from ChromaDB ──────────────────────────────
     retrieved_chunks = []
     try:
-        from src.rag.retriever import retrieve_chunks
+        from src.ingestion.vector_store import get_kb_version
         trace.append({"step_type": "action", "content": "Searching vector database for relevant document chunks (strategic plan + action plan)", "step_number": 2})
         
-        retrieved_chunks = retrieve_chunks(
-            query=query,
-            collection_name="combined",
+        # HyDE and multi-query each cost LLM calls; skip them for short queries
+        expand = _needs_query_expansion(query)
+        retrieved_chunks = _cached_retrieve(
+            query,
             top_k=8,
-            use_hyde=True,
-            use_multi_query=True,
+            use_hyde=expand,
+            use_multi_query=expand,
+            kb_version=get_kb_version(),
         )
         
         chunk_summary = f"Retrieved {len(retrieved_chunks)} relevant chunks"
         if retrieved_chunks:
-            strategies = set()
-            for c in retrieved_chunks:
-                s = c.get("metadata", {}).get("chunk_strategy", "unknown")
-                strategies.add(s)
-            chunk_summary += f" (strategies: {', '.join(strategies)})"
+            strategies = {
+                c["metadata"].get("chunk_strategy", "unknown") if "metadata" in c else "unknown"
+                for c in retrieved_chunks
+            }
+            chunk_summary += f" (strategies: {', '.join(sorted(strategies))})"
         
         trace.append({"step_type": "observation", "content": chunk_summary, "step_number": 3})
     except Exception as e:
@@ -139,75 +262,34 @@ def _generate_response(query: str, results: dict) -> tuple[str, list]:
             obj = meta.get("objective_id", "")
             strategy = meta.get("chunk_strategy", "")
             context_parts.append(f"\n[Chunk {i} | {doc} | {obj} | {strategy}]")
-            context_parts.append(chunk["text"])
-    
-    # Add analysis results (for assessment/alignment questions)
-    context_parts.append("\n=== ANALYSIS RESULTS ===")
-    context_parts.append("(Use these for alignment scores, levels, and improvement suggestions)")
-    context_parts.append(f"Overall Sync Score: {results.get('overall_score', 0):.0%}")
-    context_parts.append(f"Overall Level: {results.get('overall_level', 'Unknown')}")
-    
-    for obj_id, obj_data in results.get("objectives", {}).items():
-        score = obj_data.get("combined_score", 0)
-        level = obj_data.get("sync_assessment", {}).get("alignment_level", "Unknown")
-        justification = obj_data.get("sync_assessment", {}).get("justification", "")
-        context_parts.append(f"\n{obj_id} ({STRATEGIC_OBJECTIVES.get(obj_id, '')}): {score:.0%} - {level}")
-        if justification:
-            context_parts.append(f"  Justification: {justification}")
-        
-        improvements = obj_data.get("improvements")
-        if improvements and improvements.get("suggestions"):
-            context_parts.append(f"  Improvements: {improvements['suggestions'][:300]}...")
+            text = chunk["text"].strip()
+            if len(text) > CHAT_CHUNK_MAX_CHARS:
+                text = text[:CHAT_CHUNK_MAX_CHARS].rstrip() + " …"
+            context_parts.append(text)
+    
+    # Add analysis results (for assessment/alignment questions); identical for
+    # every turn, so it is built once per pipeline run
+    analysis_context = st.session_state.get("analysis_context_str")
+    if analysis_context is None:
+        analysis_context = st.session_state.analysis_context_str = build_analysis_context(results)
+    context_parts.append(analysis_context)
     
     context = "\n".join(context_parts)
     
     # ─── Step 3: Generate LLM response ────────────────────────────────────
     trace.append({"step_type": "action", "content": "Generating response with RAG context + analysis results", "step_number": 4})
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are the ISPS (Intelligent Strategic Plan Synchronization) chat assistant for GreenField University.
-
-**DOMAIN RESTRICTION — STRICTLY ENFORCED:**
-You MUST ONLY answer questions related to:
-- GreenField University's Strategic Plan and Action Plan
-- Strategic Objectives (SO1–SO5), KPIs, actions, milestones, deadlines, owners
-- Synchronization analysis, alignment scores, gaps, and improvement suggestions
-- The ISPS system itself (what it does, how it works)
-
-You MAY also respond to:
-- Basic greetings (hello, hi, thank you, goodbye, etc.) — respond warmly and remind the user what you can help with.
-
-For ANY question outside this domain (e.g. weather, general knowledge, coding, math, news, personal advice, or anything unrelated to the strategic/action plans):
-→ Politely decline: "I'm designed specifically to assist with GreenField University's Strategic Plan and Action Plan analysis. I can help you with alignment scores, KPI tracking, action progress, gap analysis, and improvement recommendations. Could you ask me something about those topics?"
-→ Do NOT attempt to answer the off-topic question, even partially.
+    chain = _get_chat_chain()
+    
+    return _stream_answer(chain, {"context": context, "query": query}, trace), trace
 
-You have access to two types of information:
-1. **Document excerpts** from the Strategic Plan and Action Plan — use these for factual questions about specific deadlines, action items, KPIs, owners, progress status, and dates.
-2. **Analysis results** — use these for questions about alignment scores, sync levels, gaps, and improvement suggestions.
 
-Guidelines:
-- For questions about deadlines, actions, KPIs, or specific data: cite the exact information from document excerpts.
-- For questions about alignment or scores: use the analysis results.
-- Present data in clean tables when showing multiple items.
-- Be specific — cite action IDs (e.g. A1.3), dates, owners, and percentages.
-- If information is not available in the context, say so clearly.
-
-Context:
-{context}"""),
-        ("human", "{query}")
-    ])
-    
-    llm = ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=0.3,
-        openai_api_key=OPENAI_API_KEY,
-        request_timeout=30,
-    )
-    
-    chain = prompt | llm
-    response = chain.invoke({"context": context, "query": query})
-    
-    trace.append({"step_type": "final_answer", "content": response.content[:200], "step_number": 5})
+def _stream_answer(chain, inputs: dict, trace: list) -> Iterator[str]:
+    """Yield the answer as it streams, then record it as the final trace step."""
+    parts = []
+    for chunk in chain.stream(inputs):
+        parts.append(chunk.content)
+        yield chunk.content
     
-    return response.content, trace
+    trace.append({"step_type": "final_answer", "content": "".join(parts)[:200], "step_number": 5})
 
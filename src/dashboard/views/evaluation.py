@@ -4,9 +4,83 @@ Displays precision/recall, gap detection, alignment accuracy, and chunking quali
 """
 import streamlit as st
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from src.config import STRATEGIC_OBJECTIVES
 
+GT_COLUMN_CONFIG = {
+    "🤖 AI Score": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+    "✅ Ground Truth Score": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+    "⚡ Deviation": st.column_config.NumberColumn(format="%.1f%%"),
+}
+
+
+@st.cache_data(show_spinner=False)
+def _build_gt_table(gt_comparison: dict) -> pd.DataFrame:
+    """Build the ground truth comparison table; cached per comparison results."""
+    ids = list(gt_comparison)
+    ground_truths = [gt_comparison[i].get("ground_truth", {}) for i in ids]
+    sys_scores = np.fromiter(
+        (gt_comparison[i].get("system_score", 0) for i in ids), dtype=np.float64, count=len(ids)
+    )
+    gt_scores = np.fromiter(
+        (gt.get("coverage_pct", 0) for gt in ground_truths), dtype=np.float64, count=len(ids)
+    )
+
+    # Format counts summary
+    count_labels = (("full", "Full"), ("partial", "Part"), ("weak", "Weak"), ("missing", "Miss"))
+    gt_summaries = [
+        ", ".join(f"{gt[key]} {label}" for key, label in count_labels if gt.get(key))
+        for gt in ground_truths
+    ]
+
+    return pd.DataFrame({
+        "Objective": ids,
+        "🤖 AI Score": sys_scores * 100,
+        "✅ Ground Truth Score": gt_scores * 100,
+        "⚡ Deviation": (sys_scores - gt_scores) * 100,
+        "Coverage Details": gt_summaries,
+    })
+
+
+def _build_gt_reasoning(gt_comparison: dict) -> list[dict]:
+    """Split each objective's KPIs into verified titles and missing-evidence items."""
+    from src.util.kpis import resolve_kpi_details
+
+    reasoning = []
+    for obj_id, data in gt_comparison.items():
+        gt = data.get("ground_truth", {})
+        details = gt.get("kpi_details", [])
+        covered_kpis = data.get("covered_kpis", [])
+        # Results restored from older pipeline caches have no resolved tuples
+        resolved = gt.get("_resolved") or resolve_kpi_details(details)
+
+        verified = []
+        missing_items = []
+        for kpi_id, kpi_title, actions_str in resolved:
+            if kpi_id in covered_kpis:
+                verified.append(kpi_title)
+            else:
+                missing_items.append(f"<li>{kpi_title} <span style='color:#888;'>(needs: {actions_str})</span></li>")
+
+        reasoning.append({
+            "label": f"**{obj_id}: {data['objective']}** — ✅ {len(verified)} verified, ❌ {len(missing_items)} missing",
+            "has_details": bool(details),
+            "verified": verified,
+            "missing_items": missing_items,
+        })
+    return reasoning
+
+
+def _get_gt_reasoning(gt_comparison: dict) -> list[dict]:
+    """Return the reasoning summaries, rebuilt only when the comparison results change."""
+    cached = st.session_state.get("gt_reasoning_cache")
+    if cached is not None and cached[0] is gt_comparison:
+        return cached[1]
+    reasoning = _build_gt_reasoning(gt_comparison)
+    st.session_state.gt_reasoning_cache = (gt_comparison, reasoning)
+    return reasoning
+
 
 def show():
     st.markdown("# 📋 Ground Truth & Testing Results")
@@ -41,39 +115,6 @@ def show():
         gt_comparison = eval_results.get("ground_truth_comparison", {})
         
         if gt_comparison:
-            rows = []
-            for obj_id, data in gt_comparison.items():
-                gt = data.get("ground_truth", {})
-                
-                # Calculate scores
-                sys_score = data.get("system_score", 0)
-                gt_score = gt.get("coverage_pct", 0)
-                deviation = sys_score - gt_score
-                
-                # Format counts summary
-                counts = []
-                if gt.get("full"): counts.append(f"{gt['full']} Full")
-                if gt.get("partial"): counts.append(f"{gt['partial']} Part")
-                if gt.get("weak"): counts.append(f"{gt['weak']} Weak")
-                if gt.get("missing"): counts.append(f"{gt['missing']} Miss")
-                gt_summary = ", ".join(counts)
-                
-                # Generate explanation
-                if deviation > 0.1:
-                    explanation = "AI detected broader semantic coverage than manual mapping."
-                elif deviation < -0.1:
-                    explanation = "AI scoring is stricter than manual baseline."
-                else:
-                    explanation = "High alignment between AI and Ground Truth."
-
-                rows.append({
-                    "Objective": f"{obj_id}",
-                    "🤖 AI Score": sys_score * 100,
-                    "✅ Ground Truth Score": gt_score * 100,
-                    "⚡ Deviation": deviation * 100,
-                    "Coverage Details": gt_summary,
-                })
-            
             # Helper to style deviation
             def color_deviation(val):
                 if isinstance(val, str) and val.endswith("%"):
@@ -82,64 +123,34 @@ def show():
                     return "color: red"
                 return ""
 
-            df = pd.DataFrame(rows)
+            df = _build_gt_table(gt_comparison)
             st.dataframe(
                 df, 
                 use_container_width=True, 
                 hide_index=True,
-                column_config={
-                    "🤖 AI Score": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
-                    "✅ Ground Truth Score": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
-                    "⚡ Deviation": st.column_config.NumberColumn(format="%.1f%%"),
-                }
+                column_config=GT_COLUMN_CONFIG,
             )
 
             st.write("")
             st.markdown("### 🔍 Reasoning")
             st.caption("Expand each objective to see a summary of what was verified and what evidence is missing.")
 
-            from src.config import KPI_DESCRIPTIONS
-
-            for obj_id, data in gt_comparison.items():
-                gt = data.get("ground_truth", {})
-                details = gt.get("kpi_details", [])
-                covered_kpis = data.get("covered_kpis", [])
-
-                # Build a quick summary line
-                verified = []
-                missing = []
-                for kpi in details:
-                    kpi_id = kpi["kpi_id"]
-                    kpi_title = KPI_DESCRIPTIONS.get(kpi_id.split("_")[1], "Unknown KPI")
-                    if kpi_id in covered_kpis:
-                        verified.append(kpi_title)
-                    else:
-                        missing.append(kpi_title)
-
-                summary_label = f"**{obj_id}: {data['objective']}** — ✅ {len(verified)} verified, ❌ {len(missing)} missing"
-
-                with st.expander(summary_label):
-                    if not details:
+            for item in _get_gt_reasoning(gt_comparison):
+                with st.expander(item["label"]):
+                    if not item["has_details"]:
                         st.write("No detailed breakdown available.")
                         continue
 
-                    if verified:
+                    if item["verified"]:
                         st.markdown("<p style='font-size:0.85em; margin-bottom:4px;'><b>✅ Verified KPIs:</b></p>", unsafe_allow_html=True)
-                        bullets = "".join([f"<li>{v}</li>" for v in verified])
+                        bullets = "".join([f"<li>{v}</li>" for v in item["verified"]])
                         st.markdown(f"<ul style='font-size:0.8em; margin-top:0; padding-left:1.2em;'>{bullets}</ul>", unsafe_allow_html=True)
 
-                    if missing:
+                    if item["missing_items"]:
                         st.markdown("<p style='font-size:0.85em; margin-bottom:4px;'><b>❌ Missing Evidence:</b></p>", unsafe_allow_html=True)
-                        missing_items = []
-                        for kpi in details:
-                            kpi_id = kpi["kpi_id"]
-                            kpi_title = KPI_DESCRIPTIONS.get(kpi_id.split("_")[1], "Unknown KPI")
-                            if kpi_id not in covered_kpis:
-                                actions_str = ", ".join([f"{a['id']}" for a in kpi["expected_actions"]])
-                                missing_items.append(f"<li>{kpi_title} <span style='color:#888;'>(needs: {actions_str})</span></li>")
-                        st.markdown(f"<ul style='font-size:0.8em; margin-top:0; padding-left:1.2em;'>{''.join(missing_items)}</ul>", unsafe_allow_html=True)
-
-                    if not missing:
+                        st.markdown(f"<ul style='font-size:0.8em; margin-top:0; padding-left:1.2em;'>{''.join(item['missing_items'])}</ul>", unsafe_allow_html=True)
+
+                    if not item["missing_items"]:
                         st.success("All KPIs fully verified.", icon="🎯")
     
     # ─── Tab 2: Chunking Quality ─────────────────────────────────────────
@@ -170,8 +181,15 @@ def show():
                         rows.append({
                             "Strategy": strategy,
                             "Count": s_data.get("count", 0),
-                            "Avg Length": f"{s_data.get('avg_length', 0):.0f} chars",
+                            "Avg Length": float(s_data.get("avg_length", 0)),
                         })
-                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+                    st.dataframe(
+                        pd.DataFrame(rows),
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            "Avg Length": st.column_config.NumberColumn(format="%.0f chars"),
+                        },
+                    )
         else:
             st.caption("No chunking quality data available.")
@@ -4,6 +4,7 @@ AI-generated improvement suggestions with reasoning chains.
 """
 import streamlit as st
 from src.config import STRATEGIC_OBJECTIVES
+from src.dashboard.session import get_trace_text
 
 
 def show():
@@ -58,7 +59,7 @@ def show():
             <span style="font-size: 1em; color: #666;">{STRATEGIC_OBJECTIVES[selected_obj]}</span>
             <div style="margin-top: 8px;">
                 <span style="font-size: 1.5em; color: {color}; font-weight: 700;">{score:.0%}</span>
-                <span class="badge-{status_text.split()[0].lower()}" style="margin-left: 10px;">{status_text}</span>
+                <span class="badge badge-{status_text.split()[0].lower()}" style="margin-left: 10px;">{status_text}</span>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -73,38 +74,9 @@ def show():
             if imp_trace:
                 st.markdown("---")
                 with st.expander("🤖 View Agent Reasoning for these output"):
-                    trace_text = _format_trace_text(imp_trace)
-                    st.text(trace_text)
+                    st.text(get_trace_text(f"{selected_obj}:improvement", imp_trace))
                     
         elif score >= 0.7:
             st.success(f"✅ {selected_obj} is well-aligned. No specific improvements recommended at this time.")
         else:
             st.info(f"ℹ️ No specific improvement data generated for {selected_obj}.")
-
-
-def _format_trace_text(trace: list[dict]) -> str:
-    """Format reasoning trace into a single text block."""
-    lines = []
-    for step in trace:
-        step_type = step.get("step_type", "").upper()
-        step_num = step.get("step_number", 0)
-        content = step.get("content", "")
-        tool = step.get("tool_name", "")
-        
-        header = f"[{step_num}] {step_type}"
-        if tool:
-            header += f": {tool}"
-        
-        lines.append(header)
-        lines.append("-" * len(header))
-        lines.append(content)
-        lines.append("")
-        
-        if step.get("tool_input"):
-            lines.append(f"Input: {step['tool_input']}")
-            lines.append("")
-        
-        lines.append("=" * 40)
-        lines.append("")
-        
-    return "\n".join(lines)
@@ -6,7 +6,9 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
-from src.config import STRATEGIC_OBJECTIVES, OBJECTIVE_KPIS, KPI_DESCRIPTIONS
+from src.config import STRATEGIC_OBJECTIVES, OBJECTIVE_KPIS
+from src.dashboard.session import get_trace_text
+from src.util.kpis import describe_kpis
 
 
 def show():
@@ -59,25 +61,21 @@ def show():
         
         with col_left:
             st.markdown("#### ✅ Covered KPIs")
-            covered = sync.get("covered_kpis", [])
+            covered = sync.get("covered_kpis_rendered")
+            if covered is None:
+                covered = describe_kpis(sync.get("covered_kpis", []))
             if covered:
-                for kpi in covered:
-                    # Handle SOx_ prefix if present (e.g., SO1_D1 -> D1)
-                    lookup_key = kpi.split("_")[1] if "_" in kpi else kpi
-                    desc = KPI_DESCRIPTIONS.get(lookup_key, "Unknown KPI")
-                    st.markdown(f"- **✅ {kpi}**: {desc}")
+                st.markdown(_kpi_list_markdown(covered, "✅"))
             else:
                 st.caption("No covered KPIs reported")
         
         with col_right:
             st.markdown("#### ❌ Uncovered KPIs")
-            uncovered = sync.get("uncovered_kpis", [])
+            uncovered = sync.get("uncovered_kpis_rendered")
+            if uncovered is None:
+                uncovered = describe_kpis(sync.get("uncovered_kpis", []))
             if uncovered:
-                for kpi in uncovered:
-                    # Handle SOx_ prefix if present
-                    lookup_key = kpi.split("_")[1] if "_" in kpi else kpi
-                    desc = KPI_DESCRIPTIONS.get(lookup_key, "Unknown KPI")
-                    st.markdown(f"- **❌ {kpi}**: {desc}")
+                st.markdown(_kpi_list_markdown(uncovered, "❌"))
             else:
                 st.caption("All KPIs covered")
         
@@ -108,33 +106,9 @@ def show():
             st.markdown("---")
             st.markdown("#### 🤖 Agent Reasoning Trace")
             with st.expander("View full reasoning trace", expanded=False):
-                trace_text = _format_trace_text(sync_trace)
-                st.text(trace_text)
+                st.text(get_trace_text(f"{selected}:sync", sync_trace))
 
 
-def _format_trace_text(trace: list[dict]) -> str:
-    """Format reasoning trace into a single text block."""
-    lines = []
-    for step in trace:
-        step_type = step.get("step_type", "").upper()
-        step_num = step.get("step_number", 0)
-        content = step.get("content", "")
-        tool = step.get("tool_name", "")
-        
-        header = f"[{step_num}] {step_type}"
-        if tool:
-            header += f": {tool}"
-        
-        lines.append(header)
-        lines.append("-" * len(header))
-        lines.append(content)
-        lines.append("")
-        
-        if step.get("tool_input"):
-            lines.append(f"Input: {step['tool_input']}")
-            lines.append("")
-        
-        lines.append("=" * 40)
-        lines.append("")
-        
-    return "\n".join(lines)
+def _kpi_list_markdown(kpis: list[dict], icon: str) -> str:
+    """Render described KPIs as one markdown bullet list."""
+    return "\n".join(f"- **{icon} {kpi['id']}**: {kpi['desc']}" for kpi in kpis)
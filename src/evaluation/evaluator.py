@@ -10,6 +10,7 @@ from src.evaluation.metrics import (
     compute_chunking_quality,
 )
 from src.config import STRATEGIC_OBJECTIVES
+from src.util.kpis import resolve_kpi_details
 
 
 def run_evaluation(system_results: dict, chunks: dict = None) -> dict:
@@ -54,6 +55,7 @@ def run_evaluation(system_results: dict, chunks: dict = None) -> dict:
         
         # Pass map to get detailed breakdown
         gt_coverage = get_objective_kpi_coverage(obj_id, action_map=action_map)
+        gt_coverage["_resolved"] = resolve_kpi_details(gt_coverage["kpi_details"])
         
         eval_results["ground_truth_comparison"][obj_id] = {
             "objective": STRATEGIC_OBJECTIVES[obj_id],
@@ -56,6 +56,9 @@ GROUND_TRUTH = {
     "SO6_E6": {"actions": ["A6.12"], "coverage": "Partial"},
 }
 
+# Frozen supporting-action sets per KPI, for retrieval metrics
+GROUND_TRUTH_ACTION_SETS = {k: frozenset(v["actions"]) for k, v in GROUND_TRUTH.items()}
+
 # Expected alignment level per objective
 EXPECTED_ALIGNMENT = {
     "SO1": {"level": "Full", "min_score": 0.85},
@@ -76,6 +79,33 @@ EXPECTED_GAPS = [
 ]
 
 
+def _partition_ground_truth() -> dict[str, dict]:
+    """Group GROUND_TRUTH KPIs by objective and pre-aggregate their coverage counts."""
+    by_objective = {}
+    for kpi_id, data in GROUND_TRUTH.items():
+        objective_id = kpi_id.split("_", 1)[0]
+        entry = by_objective.setdefault(objective_id, {
+            "kpis": [], "total": 0, "full": 0, "partial": 0, "weak": 0, "missing": 0,
+        })
+        entry["kpis"].append((kpi_id, data))
+        entry["total"] += 1
+        entry[data["coverage"].lower()] += 1
+    
+    for entry in by_objective.values():
+        entry["coverage_pct"] = (
+            (entry["full"] + 0.5 * entry["partial"] + 0.25 * entry["weak"]) / entry["total"]
+        )
+    return by_objective
+
+
+# Per-objective KPI lists and coverage counts, computed once at import
+_GT_BY_OBJ = _partition_ground_truth()
+
+_EMPTY_COVERAGE = {
+    "kpis": [], "total": 0, "full": 0, "partial": 0, "weak": 0, "missing": 0, "coverage_pct": 0,
+}
+
+
 def get_objective_kpi_coverage(objective_id: str, action_map: dict = None) -> dict:
     """
     Get ground truth KPI coverage for a specific objective.
@@ -84,19 +114,12 @@ def get_objective_kpi_coverage(objective_id: str, action_map: dict = None) -> di
         objective_id: Strategic Objective ID (e.g., "SO1")
         action_map: Optional dict mapping Action IDs (e.g., "A1.1") to Titles.
     """
-    prefix = f"{objective_id}_"
-    kpis = {k: v for k, v in GROUND_TRUTH.items() if k.startswith(prefix)}
-    
-    total = len(kpis)
-    full = sum(1 for v in kpis.values() if v["coverage"] == "Full")
-    partial = sum(1 for v in kpis.values() if v["coverage"] == "Partial")
-    weak = sum(1 for v in kpis.values() if v["coverage"] == "Weak")
-    missing = sum(1 for v in kpis.values() if v["coverage"] == "Missing")
+    coverage = _GT_BY_OBJ.get(objective_id, _EMPTY_COVERAGE)
     
     # Generate detailed breakdown if requested
     kpi_details = []
     if action_map:
-        for kpi_id, data in kpis.items():
+        for kpi_id, data in coverage["kpis"]:
             expected_actions = []
             for action_id in data["actions"]:
                 # action_map is expected to use "A1.1" format
@@ -111,11 +134,11 @@ def get_objective_kpi_coverage(objective_id: str, action_map: dict = None) -> di
     
     return {
         "objective_id": objective_id,
-        "total_kpis": total,
-        "full": full,
-        "partial": partial,
-        "weak": weak,
-        "missing": missing,
-        "coverage_pct": (full + 0.5 * partial + 0.25 * weak) / total if total > 0 else 0,
+        "total_kpis": coverage["total"],
+        "full": coverage["full"],
+        "partial": coverage["partial"],
+        "weak": coverage["weak"],
+        "missing": coverage["missing"],
+        "coverage_pct": coverage["coverage_pct"],
         "kpi_details": kpi_details
     }
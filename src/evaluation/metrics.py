@@ -2,13 +2,22 @@
 Evaluation Metrics
 Computes precision, recall, F1, and other metrics for the alignment system.
 """
+import re
 import numpy as np
+import pandas as pd
 from src.evaluation.ground_truth import GROUND_TRUTH, EXPECTED_ALIGNMENT, EXPECTED_GAPS
 
+# KPI suffixes (D1, I4) inside LLM-reported IDs such as "SO4_I4", "SO4-I4" or
+# "I4 (Research income)"; the lookbehind skips the "O4" inside "SO4"
+_KPI_SUFFIX_RE = re.compile(r"(?<![A-Za-z0-9])[A-Z]\d+(?!\d)")
+
+# Expected minimum scores in EXPECTED_ALIGNMENT order
+_EXPECTED_MIN_SCORES = np.array([v["min_score"] for v in EXPECTED_ALIGNMENT.values()], dtype=np.float64)
+
 
 def compute_retrieval_metrics(
     retrieved_actions: list[str],
-    relevant_actions: list[str],
+    relevant_actions: list[str] | frozenset[str],
     k: int = 5,
 ) -> dict:
     """
@@ -16,19 +25,23 @@ def compute_retrieval_metrics(
     
     Args:
         retrieved_actions: List of retrieved action IDs
-        relevant_actions: List of relevant action IDs (ground truth)
+        relevant_actions: Relevant action IDs (ground truth); pass a set such as
+            GROUND_TRUTH_ACTION_SETS[kpi_id] to skip rebuilding it per call
         k: Cutoff for @K metrics
     """
-    retrieved_set = set(retrieved_actions[:k])
-    relevant_set = set(relevant_actions)
+    relevant_set = (
+        relevant_actions if isinstance(relevant_actions, (set, frozenset))
+        else set(relevant_actions)
+    )
     
     if not relevant_set:
         return {"precision_at_k": 0.0, "recall_at_k": 0.0, "f1_at_k": 0.0}
     
+    retrieved_set = set(retrieved_actions[:k])
     true_positives = len(retrieved_set & relevant_set)
     
     precision = true_positives / len(retrieved_set) if retrieved_set else 0
-    recall = true_positives / len(relevant_set) if relevant_set else 0
+    recall = true_positives / len(relevant_set)
     f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
     
     return {
@@ -66,48 +79,44 @@ def evaluate_alignment_accuracy(system_results: dict) -> dict:
     Returns:
         Evaluation metrics dict
     """
-    metrics = {
-        "per_objective": {},
-        "overall": {},
-    }
+    obj_ids = list(EXPECTED_ALIGNMENT)
+    n = len(obj_ids)
+    system_data = [system_results.get(obj_id, {}) for obj_id in obj_ids]
+    system_levels = [d.get("sync_assessment", {}).get("alignment_level", "Partial") for d in system_data]
+    system_scores = np.fromiter(
+        (d.get("combined_score", 0.5) for d in system_data), dtype=np.float64, count=n
+    )
     
-    correct_levels = 0
-    total_mae = 0.0
+    # Absolute error against each objective's expected minimum score
+    errors = np.abs(system_scores - _EXPECTED_MIN_SCORES)
+    level_matches = [
+        system_level == expected["level"]
+        for system_level, expected in zip(system_levels, EXPECTED_ALIGNMENT.values())
+    ]
+    correct_levels = sum(level_matches)
     
-    for obj_id, expected in EXPECTED_ALIGNMENT.items():
-        system_data = system_results.get(obj_id, {})
-        system_score = system_data.get("combined_score", 0.5)
-        system_level = system_data.get("sync_assessment", {}).get("alignment_level", "Partial")
-        expected_level = expected["level"]
-        expected_min_score = expected["min_score"]
-        
-        level_match = system_level == expected_level
-        if level_match:
-            correct_levels += 1
-        
-        # Mean Absolute Error for score
-        gt_score = expected_min_score
-        mae = abs(system_score - gt_score)
-        total_mae += mae
-        
-        metrics["per_objective"][obj_id] = {
-            "system_score": round(system_score, 3),
-            "expected_min_score": expected_min_score,
-            "system_level": system_level,
-            "expected_level": expected_level,
-            "level_match": level_match,
-            "score_error": round(mae, 3),
-        }
-    
-    n = len(EXPECTED_ALIGNMENT)
-    metrics["overall"] = {
-        "level_accuracy": round(correct_levels / n, 3) if n > 0 else 0,
-        "mean_absolute_error": round(total_mae / n, 3) if n > 0 else 0,
-        "correct_levels": correct_levels,
-        "total_objectives": n,
+    return {
+        "per_objective": {
+            obj_id: {
+                "system_score": round(float(score), 3),
+                "expected_min_score": expected["min_score"],
+                "system_level": system_level,
+                "expected_level": expected["level"],
+                "level_match": level_match,
+                "score_error": round(float(error), 3),
+            }
+            for obj_id, expected, score, system_level, level_match, error in zip(
+                obj_ids, EXPECTED_ALIGNMENT.values(), system_scores,
+                system_levels, level_matches, errors,
+            )
+        },
+        "overall": {
+            "level_accuracy": round(correct_levels / n, 3) if n > 0 else 0,
+            "mean_absolute_error": round(float(errors.mean()), 3) if n > 0 else 0,
+            "correct_levels": correct_levels,
+            "total_objectives": n,
+        },
     }
-    
-    return metrics
 
 
 def evaluate_gap_detection(system_results: dict) -> dict:
@@ -117,19 +126,21 @@ def evaluate_gap_detection(system_results: dict) -> dict:
     detected_gaps = []
     missed_gaps = []
     
+    # KPI suffixes (e.g. SO4_I4 -> I4) the system reported uncovered, per objective
+    uncovered_by_obj = {
+        obj_id: {
+            suffix
+            for u in obj_data.get("sync_assessment", {}).get("uncovered_kpis", [])
+            for suffix in _KPI_SUFFIX_RE.findall(u)
+        }
+        for obj_id, obj_data in system_results.items()
+    }
+    
     for gap in EXPECTED_GAPS:
-        kpi_id = gap["kpi"]
-        obj_id = kpi_id.split("_")[0]
+        obj_id, kpi_suffix = gap["kpi"].split("_")
         
         # Check if system detected this gap
-        obj_data = system_results.get(obj_id, {})
-        sync_data = obj_data.get("sync_assessment", {})
-        uncovered = sync_data.get("uncovered_kpis", [])
-        
-        kpi_suffix = kpi_id.split("_")[1]
-        detected = any(kpi_suffix in u for u in uncovered) if uncovered else False
-        
-        if detected:
+        if kpi_suffix in uncovered_by_obj.get(obj_id, ()):
             detected_gaps.append(gap)
         else:
             missed_gaps.append(gap)
@@ -149,25 +160,36 @@ def compute_chunking_quality(chunks: list[dict]) -> dict:
     """
     Compute quality metrics for a set of chunks.
     """
-    lengths = [len(c["text"]) for c in chunks]
-    strategies = {}
-    for c in chunks:
-        strategy = c["metadata"].get("chunk_strategy", "unknown")
-        if strategy not in strategies:
-            strategies[strategy] = []
-        strategies[strategy].append(len(c["text"]))
+    if not chunks:
+        return {
+            "total_chunks": 0,
+            "avg_length": 0,
+            "min_length": 0,
+            "max_length": 0,
+            "std_length": 0,
+            "per_strategy": {},
+        }
+    
+    df = pd.DataFrame({
+        "length": [len(c["text"]) for c in chunks],
+        "strategy": [c["metadata"].get("chunk_strategy", "unknown") for c in chunks],
+    })
+    lengths = df["length"]
+    per_strategy = df.groupby("strategy", sort=False)["length"].agg(["count", "mean"])
     
     return {
         "total_chunks": len(chunks),
-        "avg_length": round(np.mean(lengths), 1) if lengths else 0,
-        "min_length": min(lengths) if lengths else 0,
-        "max_length": max(lengths) if lengths else 0,
-        "std_length": round(np.std(lengths), 1) if lengths else 0,
+        "avg_length": round(float(lengths.mean()), 1),
+        "min_length": int(lengths.min()),
+        "max_length": int(lengths.max()),
+        "std_length": round(float(lengths.std(ddof=0)), 1),
         "per_strategy": {
             strategy: {
-                "count": len(lens),
-                "avg_length": round(np.mean(lens), 1),
+                "count": int(count),
+                "avg_length": round(float(mean), 1),
             }
-            for strategy, lens in strategies.items()
+            for strategy, count, mean in zip(
+                per_strategy.index, per_strategy["count"], per_strategy["mean"]
+            )
         },
     }
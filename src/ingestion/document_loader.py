@@ -2,69 +2,142 @@
 Document Loader & Preprocessor
 Reads strategic plan and action plan .txt files, applies light preprocessing.
 """
+import re
+from functools import lru_cache
 from pathlib import Path
 from src.config import STRATEGIC_PLAN_PATH, ACTION_PLAN_PATH
 
 
-import docx
+import zipfile
 import pypdf
+from lxml import etree
+
+# PyMuPDF (C MuPDF bindings) extracts PDF text much faster than pypdf; pypdf
+# remains the fallback when it is not installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+# WordprocessingML tags read by the .docx extractor
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_TBL, W_TR, W_TC = (f"{W_NS}{t}" for t in ("body", "p", "tbl", "tr", "tc"))
+W_R, W_HYPERLINK = f"{W_NS}r", f"{W_NS}hyperlink"
+W_T, W_TAB, W_BR, W_CR = (f"{W_NS}{t}" for t in ("t", "tab", "br", "cr"))
+W_TCPR, W_GRIDSPAN, W_VMERGE = (f"{W_NS}{t}" for t in ("tcPr", "gridSpan", "vMerge"))
+W_VAL, W_TYPE = f"{W_NS}val", f"{W_NS}type"
+
+# Trailing whitespace on a line (anything str.rstrip would remove, except the newline)
+TRAILING_WS_RE = re.compile(r"[^\S\n]+$", re.MULTILINE)
+# A newline that ends a blank line and starts another one (or the end of text)
+REPEATED_BLANK_LINE_RE = re.compile(r"(?<![^\n])\n(?=\n|\Z)")
+
 
 def load_document(path: Path) -> str:
-    """Load a document (txt, docx, pdf) and return its content."""
-    if not path.exists():
-        raise FileNotFoundError(f"Document not found at {path}")
-        
+    """
+    Load a document (txt, docx, pdf) and return its content.
+    
+    Parsed text is memoized per (path, modification time, size).
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Document not found at {path}") from None
+    return _load_document_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _load_document_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Parse the document; mtime_ns and size only key the memoization."""
+    path = Path(path_str)
     ext = path.suffix.lower()
     
     if ext == ".docx":
-        from docx.table import Table
-        from docx.text.paragraph import Paragraph
-
-        doc = docx.Document(path)
-        text = []
-        for element in doc.element.body:
-            if element.tag.endswith('p'): # Paragraph
-                para = Paragraph(element, doc)
-                text.append(para.text)
-            elif element.tag.endswith('tbl'): # Table
-                table = Table(element, doc)
-                for row in table.rows:
-                    cells = [cell.text for cell in row.cells]
-                    text.append(" | ".join(cells))
-        return "\n".join(text)
+        return _read_docx_text(path)
         
     elif ext == ".pdf":
-        reader = pypdf.PdfReader(path)
-        text = []
-        for page in reader.pages:
-            text.append(page.extract_text() or "")
-        return "\n".join(text)
+        if fitz is not None:
+            with fitz.open(path_str) as doc:
+                return "\n".join(page.get_text("text") for page in doc)
+        # One file handle for the whole parse (pypdf reads pages lazily)
+        with path.open("rb") as f:
+            reader = pypdf.PdfReader(f)
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
         
     else:
         # Default to text
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        return path.read_text(encoding="utf-8", errors="replace")
 
 
-def preprocess_text(text: str) -> str:
-    """Light preprocessing while preserving document structure."""
-    # Normalize whitespace but keep structure markers
-    lines = text.split("\n")
-    cleaned = []
-    prev_blank = False
+def _read_docx_text(path: Path) -> str:
+    """
+    Extract body text from a .docx by walking word/document.xml directly.
     
-    for line in lines:
-        stripped = line.rstrip()
-        is_blank = len(stripped) == 0
-        
-        # Collapse multiple blank lines into one
-        if is_blank and prev_blank:
-            continue
-        
-        cleaned.append(stripped)
-        prev_blank = is_blank
+    Paragraphs become lines and table rows become " | "-joined cell texts,
+    as with python-docx, without building its Paragraph/Table objects.
+    """
+    with zipfile.ZipFile(path) as archive:
+        root = etree.fromstring(archive.read("word/document.xml"))
     
-    return "\n".join(cleaned)
+    lines = []
+    for element in root.find(W_BODY):
+        if element.tag == W_P:
+            lines.append(_docx_paragraph_text(element))
+        elif element.tag == W_TBL:
+            prev_row = []
+            for tr in element.iterchildren(W_TR):
+                row = []
+                for tc in tr.iterchildren(W_TC):
+                    tc_pr = tc.find(W_TCPR)
+                    span = 1
+                    v_merge = None
+                    if tc_pr is not None:
+                        grid_span = tc_pr.find(W_GRIDSPAN)
+                        if grid_span is not None:
+                            span = int(grid_span.get(W_VAL, 1))
+                        v_merge = tc_pr.find(W_VMERGE)
+                    if v_merge is not None and v_merge.get(W_VAL, "continue") == "continue":
+                        # Vertically merged cell: repeat the text of the cell above
+                        col = len(row)
+                        text = prev_row[col] if col < len(prev_row) else ""
+                    else:
+                        text = "\n".join(_docx_paragraph_text(p) for p in tc.iterchildren(W_P))
+                    # Horizontally merged cells repeat once per grid column
+                    row.extend([text] * span)
+                lines.append(" | ".join(row))
+                prev_row = row
+    return "\n".join(lines)
+
+
+def _docx_paragraph_text(p) -> str:
+    """Text of a w:p element's runs (direct or inside hyperlinks), with tabs and line breaks."""
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            runs = (child,)
+        elif child.tag == W_HYPERLINK:
+            runs = child.iterchildren(W_R)
+        else:
+            continue
+        for run in runs:
+            for node in run:
+                if node.tag == W_T:
+                    parts.append(node.text or "")
+                elif node.tag == W_TAB:
+                    parts.append("\t")
+                elif node.tag == W_CR or (
+                    node.tag == W_BR and node.get(W_TYPE, "textWrapping") == "textWrapping"
+                ):
+                    parts.append("\n")
+    return "".join(parts)
+
+
+def preprocess_text(text: str) -> str:
+    """Light preprocessing while preserving document structure."""
+    # Strip trailing whitespace from every line, then collapse runs of blank
+    # lines into one
+    text = TRAILING_WS_RE.sub("", text)
+    return REPEATED_BLANK_LINE_RE.sub("", text)
 
 
 def load_strategic_plan() -> str:
@@ -80,7 +153,25 @@ def load_action_plan() -> str:
 
 
 def load_all_documents() -> dict[str, str]:
-    """Load both documents and return as a dictionary."""
+    """
+    Load both documents and return as a dictionary.
+    
+    Parsed text is memoized per file modification time, so repeated loads in
+    the same process skip the docx/pdf parse until a document changes.
+    """
+    return dict(_load_all_documents(_mtime(STRATEGIC_PLAN_PATH), _mtime(ACTION_PLAN_PATH)))
+
+
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_all_documents(strategic_mtime: int | None, action_mtime: int | None) -> dict[str, str]:
+    """Parse both documents; the arguments only key the memoization."""
     return {
         "strategic_plan": load_strategic_plan(),
         "action_plan": load_action_plan(),
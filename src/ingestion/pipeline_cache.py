@@ -2,15 +2,27 @@
 Pipeline Cache Module
 Persists pipeline results to disk so they survive Streamlit page refreshes.
 """
-import json
 import logging
+import sys
+from functools import lru_cache
 from pathlib import Path
+import msgpack
+import orjson
+import zstandard as zstd
 from src.config import BASE_DIR
 
 logger = logging.getLogger("isps.pipeline_cache")
 
 CACHE_DIR = BASE_DIR / "cache"
-CACHE_FILE = CACHE_DIR / "pipeline_cache.json"
+CACHE_FILE = CACHE_DIR / "pipeline_cache.msgpack.zst"
+KG_CACHE_FILE = CACHE_DIR / "knowledge_graph.ttl"
+
+
+def _msgpack_default(obj):
+    """Fallback for values msgpack cannot encode: arrays as lists, the rest as str."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
 
 
 def save_pipeline_cache(
@@ -18,15 +30,17 @@ def save_pipeline_cache(
     chunks: dict,
     eval_results: dict,
     kg_summary: dict | None = None,
+    knowledge_graph=None,
 ) -> None:
     """
-    Save pipeline results to disk as JSON.
+    Save pipeline results to disk as zstd-compressed MessagePack.
 
     Args:
         analysis_results: The full analysis results dict
         chunks: Dict of {doc_type: [chunk_dicts]}
         eval_results: Evaluation results dict
         kg_summary: Optional knowledge graph summary (nodes/edges counts)
+        knowledge_graph: Optional RDF graph, saved alongside as Turtle
     """
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -37,43 +51,115 @@ def save_pipeline_cache(
         "kg_summary": kg_summary,
     }
 
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, default=str)
+    payload = msgpack.packb(cache_data, default=_msgpack_default, use_bin_type=True)
+    CACHE_FILE.write_bytes(zstd.ZstdCompressor(level=3).compress(payload))
 
     logger.info(f"Pipeline cache saved to {CACHE_FILE}")
 
+    if knowledge_graph is not None:
+        knowledge_graph.serialize(destination=str(KG_CACHE_FILE), format="turtle")
+        logger.info(f"Knowledge graph cache saved to {KG_CACHE_FILE}")
+
 
 def load_pipeline_cache() -> dict | None:
     """
     Load cached pipeline results from disk.
+    
+    The decompressed file is memoized per modification time, so repeated loads
+    (every new dashboard session) skip the read and decompression until the
+    cache file changes. Each call unpacks a fresh dict, since sessions keep and
+    modify the results they are given.
 
     Returns:
         Dict with keys: analysis_results, chunks, eval_results, kg_summary
         or None if cache is missing/corrupt
     """
-    if not CACHE_FILE.exists():
+    try:
+        stat = CACHE_FILE.stat()
+    except FileNotFoundError:
         logger.info("No pipeline cache found")
         return None
-
+    payload = _read_pipeline_cache(stat.st_mtime_ns, stat.st_size)
+    if payload is None:
+        return None
     try:
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    except (msgpack.UnpackException, ValueError) as e:
+        logger.warning(f"Failed to load pipeline cache: {e}")
+        return None
+
+    # Validate required keys
+    if "analysis_results" not in data or "chunks" not in data:
+        logger.warning("Pipeline cache is incomplete, ignoring")
+        return None
 
-        # Validate required keys
-        if "analysis_results" not in data or "chunks" not in data:
-            logger.warning("Pipeline cache is incomplete, ignoring")
-            return None
+    logger.info(f"Pipeline cache loaded from {CACHE_FILE}")
+    return data
 
-        logger.info(f"Pipeline cache loaded from {CACHE_FILE}")
-        return data
 
-    except (json.JSONDecodeError, IOError) as e:
+@lru_cache(maxsize=1)
+def _read_pipeline_cache(mtime_ns: int, size: int) -> bytes | None:
+    """Decompress the cache file; the arguments only key the memoization."""
+    try:
+        return zstd.ZstdDecompressor().decompress(CACHE_FILE.read_bytes())
+    except (zstd.ZstdError, IOError) as e:
         logger.warning(f"Failed to load pipeline cache: {e}")
         return None
 
 
+def load_cached_knowledge_graph():
+    """
+    Load the knowledge graph saved with the pipeline cache.
+
+    Returns:
+        RDF graph, or None if it was not saved or cannot be parsed
+    """
+    if not KG_CACHE_FILE.exists():
+        return None
+
+    from src.ontology.schema import new_graph
+    try:
+        g = new_graph()
+        g.parse(str(KG_CACHE_FILE), format="turtle")
+        logger.info(f"Knowledge graph loaded from {KG_CACHE_FILE}")
+        return g
+    except Exception as e:
+        logger.warning(f"Failed to load knowledge graph cache: {e}")
+        return None
+
+
 def clear_pipeline_cache() -> None:
-    """Delete the cache file."""
+    """Delete the cache files."""
     if CACHE_FILE.exists():
         CACHE_FILE.unlink()
         logger.info("Pipeline cache cleared")
+    if KG_CACHE_FILE.exists():
+        KG_CACHE_FILE.unlink()
+
+
+def export_pipeline_cache_json(destination: Path) -> bool:
+    """
+    Write the pipeline cache as indented JSON for manual inspection (dev only).
+
+    Returns:
+        True if a cache was found and exported
+    """
+    data = load_pipeline_cache()
+    if data is None:
+        return False
+    destination.write_bytes(
+        orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    )
+    logger.info(f"Pipeline cache exported to {destination}")
+    return True
+
+
+if __name__ == "__main__":
+    # python -m src.ingestion.pipeline_cache --export-json [path]
+    if len(sys.argv) >= 2 and sys.argv[1] == "--export-json":
+        out = Path(sys.argv[2]) if len(sys.argv) > 2 else CACHE_DIR / "pipeline_cache.json"
+        if not export_pipeline_cache_json(out):
+            sys.exit("No pipeline cache to export")
+        print(f"Exported to {out}")
+    else:
+        sys.exit("usage: python -m src.ingestion.pipeline_cache --export-json [path]")
@@ -2,51 +2,102 @@
 Vector Store Module
 Manages ChromaDB collections for storing and retrieving document chunks.
 """
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import chromadb
 from chromadb.utils import embedding_functions
 from src.config import (
-    OPENAI_API_KEY, EMBEDDING_MODEL, CHROMA_DIR,
+    OPENAI_API_KEY, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, CHROMA_DIR,
     CHROMA_COLLECTION_STRATEGIC, CHROMA_COLLECTION_ACTION, CHROMA_COLLECTION_COMBINED,
+    HNSW_CONSTRUCTION_EF, HNSW_M, HNSW_SEARCH_EF,
 )
 
+# Bumped whenever the collections' contents change; callers caching retrieval
+# results include it in their cache key
+_kb_version = 0
 
+
+def get_kb_version() -> int:
+    """Current knowledge-base version for this process."""
+    return _kb_version
+
+
+def _bump_kb_version() -> None:
+    global _kb_version
+    _kb_version += 1
+
+
+@lru_cache(maxsize=1)
 def get_chroma_client() -> chromadb.PersistentClient:
-    """Create or connect to persistent ChromaDB instance."""
+    """Create or connect to persistent ChromaDB instance (one per process)."""
     CHROMA_DIR.mkdir(parents=True, exist_ok=True)
     return chromadb.PersistentClient(path=str(CHROMA_DIR))
 
 
+@lru_cache(maxsize=1)
 def get_embedding_function():
-    """Get OpenAI embedding function for Chroma."""
+    """Get OpenAI embedding function for Chroma (one per process)."""
     return embedding_functions.OpenAIEmbeddingFunction(
         api_key=OPENAI_API_KEY,
         model_name=EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIMENSIONS,
     )
 
 
 def get_or_create_collection(client: chromadb.PersistentClient, name: str):
-    """Get or create a ChromaDB collection with OpenAI embeddings."""
+    """
+    Get or create a ChromaDB collection with OpenAI embeddings.
+    
+    The HNSW parameters only apply when the collection is created; Chroma
+    keeps an existing collection's index settings, so a changed
+    HNSW_SEARCH_EF takes effect after re-ingestion.
+    """
     ef = get_embedding_function()
-    return client.get_or_create_collection(
+    collection = client.get_or_create_collection(
         name=name,
         embedding_function=ef,
-        metadata={"hnsw:space": "cosine"},
+        metadata={
+            "hnsw:space": "cosine",
+            "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+            "hnsw:M": HNSW_M,
+            "hnsw:search_ef": HNSW_SEARCH_EF,
+        },
     )
+    search_ef = (collection.metadata or {}).get("hnsw:search_ef")
+    if search_ef is not None and search_ef != HNSW_SEARCH_EF:
+        logging.getLogger("isps.vector_store").warning(
+            f"Collection '{name}' was built with hnsw:search_ef={search_ef}; "
+            f"re-ingest to apply HNSW_SEARCH_EF={HNSW_SEARCH_EF}"
+        )
+    return collection
+
 
+@lru_cache(maxsize=8)
+def _get_collection(name: str):
+    """Collection handle on the shared client; cleared when collections are deleted."""
+    return get_or_create_collection(get_chroma_client(), name)
 
-def ingest_chunks(chunks: list[dict], collection_name: str) -> int:
+
+def ingest_chunks(
+    chunks: list[dict],
+    collection_name: str,
+    embeddings: list | None = None,
+) -> int:
     """
     Ingest a list of chunks into a ChromaDB collection.
     
     Args:
         chunks: List of {'text': str, 'metadata': dict}
         collection_name: Name of the Chroma collection
+        embeddings: Optional precomputed vectors, one per chunk; when omitted
+            the collection's embedding function embeds the texts
         
     Returns:
         Number of chunks ingested
     """
-    client = get_chroma_client()
-    collection = get_or_create_collection(client, collection_name)
+    collection = _get_collection(collection_name)
     
     # Prepare batch data
     ids = []
@@ -61,15 +112,16 @@ def ingest_chunks(chunks: list[dict], collection_name: str) -> int:
         meta = {k: str(v) for k, v in chunk["metadata"].items()}
         metadatas.append(meta)
     
-    # Ingest in batches of 100
-    batch_size = 100
+    # Ingest in batches of 512, keeping two batches in flight so the
+    # embedding request for the next batch overlaps the insert of this one
+    batch_size = 512
     total_batches = (len(ids) + batch_size - 1) // batch_size
     
     import logging
     logger = logging.getLogger("isps.vector_store")
     logger.info(f"Ingesting {len(ids)} chunks into '{collection_name}' in {total_batches} batches")
     
-    for start in range(0, len(ids), batch_size):
+    def add_batch(start: int) -> None:
         end = start + batch_size
         batch_num = (start // batch_size) + 1
         try:
@@ -78,15 +130,42 @@ def ingest_chunks(chunks: list[dict], collection_name: str) -> int:
                 ids=ids[start:end],
                 documents=documents[start:end],
                 metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end] if embeddings is not None else None,
             )
             logger.info(f"  Batch {batch_num} success")
         except Exception as e:
             logger.error(f"  Batch {batch_num} failed: {e}")
             raise e
     
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pending = None
+        for start in range(0, len(ids), batch_size):
+            future = executor.submit(add_batch, start)
+            if pending is not None:
+                pending.result()
+            pending = future
+        if pending is not None:
+            pending.result()
+    elapsed = time.perf_counter() - t0
+    if ids:
+        logger.info(
+            f"Ingested {len(ids)} chunks into '{collection_name}' in {elapsed:.2f}s "
+            f"({len(ids) / max(elapsed, 1e-9):.0f} chunks/sec)"
+        )
+    
     return len(ids)
 
 
+def embed_texts(texts: list[str], batch_size: int = 500) -> list:
+    """Embed texts with the collections' embedding function, in batched API calls."""
+    ef = get_embedding_function()
+    embeddings = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(ef(texts[start:start + batch_size]))
+    return embeddings
+
+
 def ingest_all_chunks(
     strategic_chunks: list[dict],
     action_chunks: list[dict],
@@ -98,22 +177,28 @@ def ingest_all_chunks(
     Returns:
         Dict with counts per collection
     """
-    counts = {}
-    
-    # Individual collections
-    counts["strategic_plan"] = ingest_chunks(
-        strategic_chunks, CHROMA_COLLECTION_STRATEGIC
-    )
-    counts["action_plan"] = ingest_chunks(
-        action_chunks, CHROMA_COLLECTION_ACTION
-    )
-    
-    # Combined collection
+    # Embed every chunk once; the combined collection reuses the same vectors
+    # instead of sending each text to the embedding API a second time
     all_chunks = strategic_chunks + action_chunks
-    counts["combined"] = ingest_chunks(
-        all_chunks, CHROMA_COLLECTION_COMBINED
-    )
+    embeddings = embed_texts([c["text"] for c in all_chunks])
+    n_strategic = len(strategic_chunks)
     
+    # With embeddings precomputed, the three ingests are Chroma inserts only;
+    # run them in parallel threads sharing the cached client
+    get_chroma_client()
+    jobs = {
+        "strategic_plan": (strategic_chunks, CHROMA_COLLECTION_STRATEGIC, embeddings[:n_strategic]),
+        "action_plan": (action_chunks, CHROMA_COLLECTION_ACTION, embeddings[n_strategic:]),
+        "combined": (all_chunks, CHROMA_COLLECTION_COMBINED, embeddings),
+    }
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = {
+            key: executor.submit(ingest_chunks, chunks, name, vectors)
+            for key, (chunks, name, vectors) in jobs.items()
+        }
+        counts = {key: future.result() for key, future in futures.items()}
+    
+    _bump_kb_version()
     return counts
 
 
@@ -135,11 +220,60 @@ def query_collection(
     Returns:
         ChromaDB query results dict
     """
-    client = get_chroma_client()
-    collection = get_or_create_collection(client, collection_name)
+    return query_collection_batch(collection_name, [query_text], n_results, where_filter)
+
+
+def query_collection_batch(
+    collection_name: str,
+    query_texts: list[str],
+    n_results: int = 10,
+    where_filter: dict | None = None,
+) -> dict:
+    """
+    Query a ChromaDB collection with several texts in one call.
+    
+    The query texts are embedded in a single request and searched back to back.
+    
+    Args:
+        collection_name: Name of the collection to query
+        query_texts: Texts to search for
+        n_results: Number of results to return per query
+        where_filter: Optional metadata filter applied to every query
+        
+    Returns:
+        ChromaDB query results dict; each field holds one list per query text,
+        in the order of query_texts
+    """
+    return _query(collection_name, {"query_texts": query_texts}, n_results, where_filter)
+
+
+def query_collection_embeddings(
+    collection_name: str,
+    query_embeddings: list[list[float]],
+    n_results: int = 10,
+    where_filter: dict | None = None,
+) -> dict:
+    """
+    Query a ChromaDB collection with several precomputed query vectors in one call.
+    
+    Args:
+        collection_name: Name of the collection to query
+        query_embeddings: Query vectors, embedded like the collection's documents
+        n_results: Number of results to return per query
+        where_filter: Optional metadata filter applied to every query
+        
+    Returns:
+        ChromaDB query results dict; each field holds one list per query vector,
+        in the order of query_embeddings
+    """
+    return _query(collection_name, {"query_embeddings": query_embeddings}, n_results, where_filter)
+
+
+def _query(collection_name: str, queries: dict, n_results: int, where_filter: dict | None) -> dict:
+    collection = _get_collection(collection_name)
     
     kwargs = {
-        "query_texts": [query_text],
+        **queries,
         "n_results": n_results,
         "include": ["documents", "metadatas", "distances"],
     }
@@ -151,8 +285,7 @@ def query_collection(
 
 def get_collection_stats(collection_name: str) -> dict:
     """Get statistics about a ChromaDB collection."""
-    client = get_chroma_client()
-    collection = get_or_create_collection(client, collection_name)
+    collection = _get_collection(collection_name)
     count = collection.count()
     return {
         "name": collection_name,
@@ -162,6 +295,8 @@ def get_collection_stats(collection_name: str) -> dict:
 
 def clear_all_collections():
     """Delete all collections (for re-ingestion)."""
+    _bump_kb_version()
+    _get_collection.cache_clear()
     client = get_chroma_client()
     for name in [CHROMA_COLLECTION_STRATEGIC, CHROMA_COLLECTION_ACTION, CHROMA_COLLECTION_COMBINED]:
         try:
@@ -2,11 +2,102 @@
 Ontology-Based Alignment Scoring
 Uses the knowledge graph to compute alignment between strategic objectives and actions.
 """
-from rdflib import Graph, RDF
-from src.ontology.schema import ISPS
+import re
+from dataclasses import dataclass, field
+import numpy as np
+from rdflib import Graph, RDF, URIRef
+from src.ontology.schema import (
+    ISPS, P_SUPPORTS_OBJ, P_HAS_KPI, P_SUPPORTS_KPI, P_HAS_PROG,
+    P_HAS_TITLE, P_OWNED_BY, P_HAS_STATUS, P_HAS_TARGET, P_HAS_BASELINE,
+)
 from src.config import STRATEGIC_OBJECTIVES, OBJECTIVE_KPIS
 
 
+_DIGIT_RUN_RE = re.compile(r"(\d+)")
+
+
+@dataclass(slots=True)
+class AlignmentIndex:
+    """Per-graph lookup tables for the objective/action/KPI relationships."""
+    obj_actions: dict[URIRef, list] = field(default_factory=dict)
+    obj_kpis: dict[URIRef, list] = field(default_factory=dict)
+    action_kpis: dict[URIRef, set] = field(default_factory=dict)
+    progress: dict[URIRef, list[int]] = field(default_factory=dict)
+    titles: dict[URIRef, str] = field(default_factory=dict)
+    statuses: dict[URIRef, str] = field(default_factory=dict)
+    owners: dict[URIRef, list] = field(default_factory=dict)
+    targets: dict[URIRef, str] = field(default_factory=dict)
+    baselines: dict[URIRef, str] = field(default_factory=dict)
+
+
+def _literal_int(literal) -> int:
+    """
+    Integer value of a literal. xsd:integer literals carry their parsed value,
+    which is cheaper to read than int(), which re-parses the lexical form.
+    """
+    value = literal.value
+    return value if type(value) is int else int(literal)
+
+
+def build_alignment_index(g: Graph) -> AlignmentIndex:
+    """Bucket the alignment predicates into dicts with one scan per predicate."""
+    index = AlignmentIndex()
+    for action, obj in g.subject_objects(P_SUPPORTS_OBJ):
+        index.obj_actions.setdefault(obj, []).append(action)
+    for obj, kpi in g.subject_objects(P_HAS_KPI):
+        index.obj_kpis.setdefault(obj, []).append(kpi)
+    for action, kpi in g.subject_objects(P_SUPPORTS_KPI):
+        index.action_kpis.setdefault(action, set()).add(kpi)
+    for action, prog in g.subject_objects(P_HAS_PROG):
+        index.progress.setdefault(action, []).append(_literal_int(prog))
+    for owned, owner in g.subject_objects(P_OWNED_BY):
+        index.owners.setdefault(owned, []).append(owner)
+    for pred, table in (
+        (P_HAS_TITLE, index.titles),
+        (P_HAS_STATUS, index.statuses),
+        (P_HAS_TARGET, index.targets),
+        (P_HAS_BASELINE, index.baselines),
+    ):
+        for node, value in g.subject_objects(pred):
+            table[node] = str(value)
+    
+    # Stores differ in the order they yield triples (Oxigraph uses index
+    # order), so fix the order the builder inserts them in: actions by natural
+    # ID (A1_2 before A1_10, table actions before SO1_ADD_*) and KPIs as listed
+    # in OBJECTIVE_KPIS
+    for actions in index.obj_actions.values():
+        actions.sort(key=_natural_key)
+    for obj, kpis in index.obj_kpis.items():
+        obj_id = obj.split("#")[-1]
+        kpi_order = {
+            ISPS[f"{obj_id}_{kpi_id}"]: i for i, kpi_id in enumerate(OBJECTIVE_KPIS.get(obj_id, ()))
+        }
+        kpis.sort(key=lambda kpi: (kpi_order.get(kpi, len(kpi_order)), _natural_key(kpi)))
+    return index
+
+
+def _natural_key(uri: URIRef) -> list:
+    """Sort key comparing the digit runs of a URI's local name numerically."""
+    return [
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in _DIGIT_RUN_RE.split(uri.split("#")[-1]) if part
+    ]
+
+
+# (graph, triple count, index) of the last graph indexed
+_index_memo = None
+
+
+def _get_alignment_index(g: Graph) -> AlignmentIndex:
+    """Alignment index for g, rebuilt only when a different or modified graph is passed."""
+    global _index_memo
+    memo = _index_memo
+    if memo is None or memo[0] is not g or memo[1] != len(g):
+        memo = (g, len(g), build_alignment_index(g))
+        _index_memo = memo
+    return memo[2]
+
+
 def compute_ontology_alignment(g: Graph) -> dict:
     """
     Compute alignment scores based on ontology relationships.
@@ -19,69 +110,90 @@ def compute_ontology_alignment(g: Graph) -> dict:
     Returns:
         Dict mapping objective IDs to alignment info
     """
+    counts, action_details = _index_alignment_inputs(g)
+    
+    obj_ids = list(STRATEGIC_OBJECTIVES)
+    rows = [counts.get(obj_id, (0, 0, 0, 0)) for obj_id in obj_ids]
+    total_kpis, action_counts, kpis_covered, avg_progress = (
+        np.array(column, dtype=np.float64) for column in zip(*rows)
+    )
+    has_kpis = total_kpis > 0
+    kpi_divisor = np.where(has_kpis, total_kpis, 1.0)
+    
+    # Compute coverage score
+    kpi_coverage = np.where(has_kpis, kpis_covered / kpi_divisor, 0.0)
+    
+    # Overall alignment score: combination of action density and KPI coverage
+    # More actions per KPI = better coverage (capped at 1.0)
+    # Adjusted density factor to be less strict: target 1.0 actions per KPI
+    action_density = np.where(has_kpis, np.minimum(action_counts / kpi_divisor, 1.0), 0.0)
+    
+    alignment_scores = (0.4 * action_density) + (0.4 * kpi_coverage) + (0.2 * avg_progress / 100)
+    
+    # Classify alignment level
+    levels = np.select(
+        [alignment_scores >= 0.75, alignment_scores >= 0.50, alignment_scores >= 0.25],
+        ["Full", "Partial", "Weak"],
+        default="Missing",
+    )
+    
     results = {}
+    for i, (obj_id, (n_kpis, n_actions, n_covered, progress)) in enumerate(zip(obj_ids, rows)):
+        results[obj_id] = {
+            "objective": STRATEGIC_OBJECTIVES[obj_id],
+            "alignment_score": round(float(alignment_scores[i]), 3),
+            "alignment_level": str(levels[i]),
+            "total_actions": n_actions,
+            "total_kpis": n_kpis,
+            "kpis_covered": n_covered,
+            "kpi_coverage": round(float(kpi_coverage[i]), 3),
+            "avg_progress": round(progress, 1),
+            "action_details": action_details.get(obj_id, []),
+        }
     
+    return results
+
+
+
+def _index_alignment_inputs(g: Graph) -> tuple[dict, dict]:
+    """
+    Per-objective (kpis, actions, kpis covered, avg progress) and action
+    details, read from the cached alignment index.
+    """
+    index = _get_alignment_index(g)
+    counts = {}
+    action_details = {}
     for obj_id in STRATEGIC_OBJECTIVES:
         obj_uri = ISPS[obj_id]
+        supporting_actions = index.obj_actions.get(obj_uri, [])
         
-        # Find all actions supporting this objective
-        supporting_actions = list(g.subjects(ISPS["supportsObjective"], obj_uri))
-        
-        # Find all KPIs for this objective
-        kpis = list(g.objects(obj_uri, ISPS["hasKPI"]))
-        total_kpis = len(kpis)
-        
-        # Check which KPIs have supporting actions
+        # One pass over the supporting actions gathers KPI coverage, progress
+        # and the per-action details together
         kpis_with_actions = set()
-        for action in supporting_actions:
-            for kpi in g.objects(action, ISPS["supportsKPI"]):
-                kpis_with_actions.add(str(kpi))
-        
-        # Compute progress stats
         progress_values = []
+        details = []
         for action in supporting_actions:
-            for prog in g.objects(action, ISPS["hasProgress"]):
-                try:
-                    progress_values.append(int(prog))
-                except (ValueError, TypeError):
-                    pass
-        
-        avg_progress = sum(progress_values) / len(progress_values) if progress_values else 0
+            kpis_with_actions.update(index.action_kpis.get(action, ()))
+            action_progress = index.progress.get(action, [])
+            progress_values.extend(action_progress)
+            
+            info = {"id": str(action).split("#")[-1]}
+            if action in index.titles:
+                info["title"] = index.titles[action]
+            if action_progress:
+                info["progress"] = action_progress[-1]
+            details.append(info)
         
-        # Compute coverage score
-        action_count = len(supporting_actions)
-        kpi_coverage = len(kpis_with_actions) / total_kpis if total_kpis > 0 else 0
-        
-        # Overall alignment score: combination of action density and KPI coverage
-        # More actions per KPI = better coverage (capped at 1.0)
-        # Adjusted density factor to be less strict: target 1.0 actions per KPI
-        action_density = min(action_count / (total_kpis * 1.0), 1.0) if total_kpis > 0 else 0
-        
-        alignment_score = (0.4 * action_density) + (0.4 * kpi_coverage) + (0.2 * avg_progress / 100)
-        
-        # Classify alignment level
-        if alignment_score >= 0.75:
-            level = "Full"
-        elif alignment_score >= 0.50:
-            level = "Partial"
-        elif alignment_score >= 0.25:
-            level = "Weak"
-        else:
-            level = "Missing"
-        
-        results[obj_id] = {
-            "objective": STRATEGIC_OBJECTIVES[obj_id],
-            "alignment_score": round(alignment_score, 3),
-            "alignment_level": level,
-            "total_actions": action_count,
-            "total_kpis": total_kpis,
-            "kpis_covered": len(kpis_with_actions),
-            "kpi_coverage": round(kpi_coverage, 3),
-            "avg_progress": round(avg_progress, 1),
-            "action_details": _get_action_details(g, supporting_actions),
-        }
+        avg_progress = float(np.mean(np.asarray(progress_values, dtype=np.int32))) if progress_values else 0
+        counts[obj_id] = (
+            len(index.obj_kpis.get(obj_uri, [])),
+            len(supporting_actions),
+            len(kpis_with_actions),
+            avg_progress,
+        )
+        action_details[obj_id] = details
     
-    return results
+    return counts, action_details
 
 
 def get_ontology_mapping(g: Graph, objective_id: str) -> dict:
@@ -97,44 +209,51 @@ def get_ontology_mapping(g: Graph, objective_id: str) -> dict:
         Dict with mapping details
     """
     obj_uri = ISPS[objective_id]
+    actions, kpis = _index_mapping(_get_alignment_index(g), obj_uri)
     
+    return {
+        "objective_id": objective_id,
+        "objective_name": STRATEGIC_OBJECTIVES.get(objective_id, "Unknown"),
+        "actions": actions,
+        "kpis": kpis,
+        "action_count": len(actions),
+        "kpi_count": len(kpis),
+    }
+
+
+
+def _index_mapping(index: AlignmentIndex, obj_uri: URIRef) -> tuple[list[dict], list[dict]]:
+    """Actions and KPIs of one objective from the alignment index."""
     # Get actions
     actions = []
-    for action_uri in g.subjects(ISPS["supportsObjective"], obj_uri):
+    for action_uri in index.obj_actions.get(obj_uri, []):
         action_info = {
             "id": str(action_uri).split("#")[-1],
         }
-        for title in g.objects(action_uri, ISPS["hasTitle"]):
-            action_info["title"] = str(title)
-        for progress in g.objects(action_uri, ISPS["hasProgress"]):
-            action_info["progress"] = int(progress)
-        for status in g.objects(action_uri, ISPS["hasStatus"]):
-            action_info["status"] = str(status)
-        for owner in g.objects(action_uri, ISPS["ownedBy"]):
-            for name in g.objects(owner, ISPS["hasTitle"]):
-                action_info["owner"] = str(name)
+        if action_uri in index.titles:
+            action_info["title"] = index.titles[action_uri]
+        for progress in index.progress.get(action_uri, []):
+            action_info["progress"] = progress
+        if action_uri in index.statuses:
+            action_info["status"] = index.statuses[action_uri]
+        for owner in index.owners.get(action_uri, []):
+            if owner in index.titles:
+                action_info["owner"] = index.titles[owner]
         actions.append(action_info)
     
     # Get KPIs
     kpis = []
-    for kpi_uri in g.objects(obj_uri, ISPS["hasKPI"]):
+    for kpi_uri in index.obj_kpis.get(obj_uri, []):
         kpi_info = {"id": str(kpi_uri).split("#")[-1]}
-        for title in g.objects(kpi_uri, ISPS["hasTitle"]):
-            kpi_info["title"] = str(title)
-        for target in g.objects(kpi_uri, ISPS["hasTarget"]):
-            kpi_info["target"] = str(target)
-        for baseline in g.objects(kpi_uri, ISPS["hasBaseline"]):
-            kpi_info["baseline"] = str(baseline)
+        if kpi_uri in index.titles:
+            kpi_info["title"] = index.titles[kpi_uri]
+        if kpi_uri in index.targets:
+            kpi_info["target"] = index.targets[kpi_uri]
+        if kpi_uri in index.baselines:
+            kpi_info["baseline"] = index.baselines[kpi_uri]
         kpis.append(kpi_info)
     
-    return {
-        "objective_id": objective_id,
-        "objective_name": STRATEGIC_OBJECTIVES.get(objective_id, "Unknown"),
-        "actions": actions,
-        "kpis": kpis,
-        "action_count": len(actions),
-        "kpi_count": len(kpis),
-    }
+    return actions, kpis
 
 
 def identify_gaps(g: Graph, objective_id: str) -> list[dict]:
@@ -150,58 +269,50 @@ def identify_gaps(g: Graph, objective_id: str) -> list[dict]:
         List of gap descriptions
     """
     obj_uri = ISPS[objective_id]
-    
-    # Get all KPIs
-    kpis = list(g.objects(obj_uri, ISPS["hasKPI"]))
-    
-    # Get all actions and what KPIs they support
-    actions = list(g.subjects(ISPS["supportsObjective"], obj_uri))
-    supported_kpis = set()
-    for action in actions:
-        for kpi in g.objects(action, ISPS["supportsKPI"]):
-            supported_kpis.add(str(kpi))
+    unsupported_kpis, low_progress = _index_gaps(_get_alignment_index(g), obj_uri)
     
     gaps = []
-    for kpi_uri in kpis:
-        kpi_id = str(kpi_uri).split("#")[-1]
-        if str(kpi_uri) not in supported_kpis:
-            kpi_title = ""
-            for title in g.objects(kpi_uri, ISPS["hasTitle"]):
-                kpi_title = str(title)
-            gaps.append({
-                "kpi_id": kpi_id,
-                "kpi_title": kpi_title,
-                "gap_type": "No supporting actions",
-                "severity": "High",
-            })
-    
-    # Check for actions with low progress
-    for action in actions:
-        for prog in g.objects(action, ISPS["hasProgress"]):
-            progress = int(prog)
-            if progress < 25:
-                action_title = ""
-                for title in g.objects(action, ISPS["hasTitle"]):
-                    action_title = str(title)
-                gaps.append({
-                    "action_id": str(action).split("#")[-1],
-                    "action_title": action_title,
-                    "progress": progress,
-                    "gap_type": "Low progress",
-                    "severity": "Medium",
-                })
+    for kpi_uri, kpi_title in unsupported_kpis:
+        gaps.append({
+            "kpi_id": kpi_uri.split("#")[-1],
+            "kpi_title": kpi_title,
+            "gap_type": "No supporting actions",
+            "severity": "High",
+        })
+    
+    # Actions with low progress
+    for action, action_title, progress in low_progress:
+        gaps.append({
+            "action_id": str(action).split("#")[-1],
+            "action_title": action_title,
+            "progress": progress,
+            "gap_type": "Low progress",
+            "severity": "Medium",
+        })
     
     return gaps
 
 
-def _get_action_details(g: Graph, action_uris: list) -> list[dict]:
-    """Get details for a list of action URIs."""
-    details = []
-    for action_uri in action_uris:
-        info = {"id": str(action_uri).split("#")[-1]}
-        for title in g.objects(action_uri, ISPS["hasTitle"]):
-            info["title"] = str(title)
-        for prog in g.objects(action_uri, ISPS["hasProgress"]):
-            info["progress"] = int(prog)
-        details.append(info)
-    return details
+def _index_gaps(index: AlignmentIndex, obj_uri: URIRef) -> tuple[list, list]:
+    """
+    (kpi, title) pairs without supporting actions and (action, title, progress)
+    triples below 25% progress, from the alignment index.
+    """
+    actions = index.obj_actions.get(obj_uri, [])
+    # URIRefs hash directly; no str() conversion per KPI
+    supported_kpis = set()
+    for action in actions:
+        supported_kpis.update(index.action_kpis.get(action, ()))
+    
+    unsupported = [
+        (kpi_uri, index.titles.get(kpi_uri, ""))
+        for kpi_uri in index.obj_kpis.get(obj_uri, [])
+        if kpi_uri not in supported_kpis
+    ]
+    low_progress = [
+        (action, index.titles.get(action, ""), progress)
+        for action in actions
+        for progress in index.progress.get(action, [])
+        if progress < 25
+    ]
+    return unsupported, low_progress
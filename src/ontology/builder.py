@@ -4,10 +4,50 @@ Parses strategic plan and action plan documents to extract entities
 and build an RDF knowledge graph.
 """
 import re
+from functools import lru_cache
 from rdflib import Graph, Literal, RDF, XSD
-from src.ontology.schema import ISPS, create_ontology_graph
+from src.ontology.schema import (
+    ISPS, create_ontology_graph, P_SUPPORTS_OBJ, P_HAS_KPI, P_SUPPORTS_KPI,
+    P_HAS_PROG, P_HAS_TITLE, P_OWNED_BY, P_HAS_STATUS, P_HAS_DEADLINE, P_HAS_ACTION,
+    P_HAS_OBJECTIVE, P_HAS_DESCRIPTION, P_HAS_TARGET, P_HAS_BASELINE, P_HAS_RISK,
+    P_HAS_RISK_LEVEL, P_HAS_LIKELIHOOD,
+)
 from src.config import STRATEGIC_OBJECTIVES, OBJECTIVE_KPIS
 
+# ─── Extraction Patterns ─────────────────────────────────────────────────────
+# Objective descriptions are located with three forward searches (heading,
+# then "Description:", then the next section label) instead of one DOTALL
+# .*? pattern, so no match attempt rescans the rest of the document
+_OBJ_HEADING_RES = {
+    obj_id: re.compile(rf"STRATEGIC OBJECTIVE {obj_id.replace('SO', '')}", re.IGNORECASE)
+    for obj_id in STRATEGIC_OBJECTIVES
+}
+_DESCRIPTION_LABEL_RE = re.compile(r"Description:\s*", re.IGNORECASE)
+_DESCRIPTION_END_RE = re.compile(r"Key Performance Indicators|Timeline", re.IGNORECASE)
+# Lookahead so rows can be matched from every pipe, like a per-KPI search
+_KPI_ROW_RE = re.compile(
+    r"\|(?=\s*("
+    + "|".join(sorted({k for kpis in OBJECTIVE_KPIS.values() for k in kpis}))
+    + r")\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|)"
+)
+# Action-plan extractors share one scan: the first alternative that matches at
+# a position wins, and m.lastgroup names the handler
+_ACTION_PLAN_RE = re.compile("|".join([
+    r"(?P<action>\|\s*(?P<action_id>A\d+\.\d+)\s*\|\s*(?P<action_desc>.*?)\s*\|\s*(?P<action_owner>.*?)\s*\|\s*(?P<action_deadline>.*?)\s*\|\s*(?P<action_progress>\d+)%?\s*\|)",
+    r"(?P<owner>\|\s*A\d+\.\d+\s*\|.*?\|\s*(?P<owner_name>.*?)\s*\|)",
+    r"(?P<addendum>\[(?P<addendum_kpi>SO\d+_[A-Z]\d+)\]\s*(?P<addendum_desc>.*?)(?=\n|\[|$))",
+    r"(?P<risk>\|\s*(?P<risk_id>RISK-\d+)\s*\|\s*(?P<risk_desc>.*?)\s*\|\s*(?P<risk_likelihood>.*?)\s*\|\s*(?P<risk_impact>.*?)\s*\|)",
+]))
+_NON_URI_CHARS_RE = re.compile(r'[^a-zA-Z0-9]')
+# str.translate equivalent of _NON_URI_CHARS_RE for ASCII text
+_ASCII_URI_TABLE = {c: "_" for c in range(128) if not chr(c).isalnum()}
+
+# KPI URIs per objective, built once rather than per action
+_OBJECTIVE_KPI_URIS = {
+    obj_id: tuple(ISPS[f"{obj_id}_{kpi_id}"] for kpi_id in kpi_ids)
+    for obj_id, kpi_ids in OBJECTIVE_KPIS.items()
+}
+
 
 def build_knowledge_graph(strategic_text: str, action_text: str) -> Graph:
     """
@@ -21,202 +61,212 @@ def build_knowledge_graph(strategic_text: str, action_text: str) -> Graph:
         Populated RDF graph
     """
     g = create_ontology_graph()
+    # Collected (s, p, o) triples, bulk-inserted into the graph at the end
+    triples = []
     
     # ─── Create Plan Instances ───────────────────────────────────────────────
     sp = ISPS["GreenFieldStrategicPlan"]
     ap = ISPS["GreenFieldActionPlan"]
-    g.add((sp, RDF.type, ISPS["StrategicPlan"]))
-    g.add((sp, ISPS["hasTitle"], Literal("GreenField University Strategic Plan 2024-2029")))
-    g.add((ap, RDF.type, ISPS["ActionPlan"]))
-    g.add((ap, ISPS["hasTitle"], Literal("GreenField University Action Plan 2024-2029")))
+    triples.append((sp, RDF.type, ISPS["StrategicPlan"]))
+    triples.append((sp, P_HAS_TITLE, Literal("GreenField University Strategic Plan 2024-2029")))
+    triples.append((ap, RDF.type, ISPS["ActionPlan"]))
+    triples.append((ap, P_HAS_TITLE, Literal("GreenField University Action Plan 2024-2029")))
     
     # ─── Extract Strategic Objectives ────────────────────────────────────────
     for obj_id, obj_title in STRATEGIC_OBJECTIVES.items():
         obj_uri = ISPS[obj_id]
-        g.add((obj_uri, RDF.type, ISPS["StrategicObjective"]))
-        g.add((obj_uri, ISPS["hasTitle"], Literal(obj_title)))
-        g.add((sp, ISPS["hasObjective"], obj_uri))
+        triples.append((obj_uri, RDF.type, ISPS["StrategicObjective"]))
+        triples.append((obj_uri, P_HAS_TITLE, Literal(obj_title)))
+        triples.append((sp, P_HAS_OBJECTIVE, obj_uri))
         
         # Extract description
         desc = _extract_objective_description(strategic_text, obj_id)
         if desc:
-            g.add((obj_uri, ISPS["hasDescription"], Literal(desc)))
+            triples.append((obj_uri, P_HAS_DESCRIPTION, Literal(desc)))
     
     # ─── Extract KPIs ────────────────────────────────────────────────────────
-    _extract_kpis(g, strategic_text)
-    
-    # ─── Extract Actions ─────────────────────────────────────────────────────
-    _extract_actions(g, action_text, ap)
-    _extract_addendum_actions(g, action_text, ap)
+    _extract_kpis(triples, strategic_text)
     
-    # ─── Extract Risks ───────────────────────────────────────────────────────
-    _extract_risks(g, action_text, ap)
-    
-    # ─── Extract Departments & People ────────────────────────────────────────
-    _extract_people(g, action_text)
+    # ─── Extract Actions, Risks & People ─────────────────────────────────────
+    _extract_action_plan(triples, action_text, ap)
     
+    g.addN((s, p, o, g) for s, p, o in triples)
     return g
 
 
 def _extract_objective_description(text: str, obj_id: str) -> str | None:
     """Extract the description for a strategic objective."""
-    obj_num = obj_id.replace("SO", "")
-    pattern = rf"STRATEGIC OBJECTIVE {obj_num}.*?Description:\s*(.*?)(?=Key Performance Indicators|Timeline|$)"
-    match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-    if match:
-        desc = match.group(1).strip()
+    heading = _OBJ_HEADING_RES[obj_id].search(text)
+    label = heading and _DESCRIPTION_LABEL_RE.search(text, heading.end())
+    if label:
+        end = _DESCRIPTION_END_RE.search(text, label.end())
+        desc = text[label.end():end.start() if end else len(text)].strip()
         # Trim to first paragraph
         desc = desc.split("\n\n")[0].strip()
         return desc[:500]  # Limit length
     return None
 
 
-def _extract_kpis(g: Graph, text: str):
-    """Extract KPIs from the strategic plan and add to graph."""
+def _extract_kpis(triples: list, text: str):
+    """Extract KPIs from the strategic plan as triples."""
+    kpi_rows = _extract_kpi_details(text)
     for obj_id, kpi_ids in OBJECTIVE_KPIS.items():
         obj_uri = ISPS[obj_id]
         
         for kpi_id in kpi_ids:
             full_kpi_id = f"{obj_id}_{kpi_id}"
             kpi_uri = ISPS[full_kpi_id]
-            g.add((kpi_uri, RDF.type, ISPS["KPI"]))
-            g.add((obj_uri, ISPS["hasKPI"], kpi_uri))
+            triples.append((kpi_uri, RDF.type, ISPS["KPI"]))
+            triples.append((obj_uri, P_HAS_KPI, kpi_uri))
             
             # Try to extract KPI details
-            kpi_info = _extract_kpi_details(text, kpi_id, obj_id)
+            kpi_info = kpi_rows.get(kpi_id)
             if kpi_info:
-                g.add((kpi_uri, ISPS["hasTitle"], Literal(kpi_info.get("name", kpi_id))))
+                triples.append((kpi_uri, P_HAS_TITLE, Literal(kpi_info.get("name", kpi_id))))
                 if kpi_info.get("baseline"):
-                    g.add((kpi_uri, ISPS["hasBaseline"], Literal(kpi_info["baseline"])))
+                    triples.append((kpi_uri, P_HAS_BASELINE, Literal(kpi_info["baseline"])))
                 if kpi_info.get("target"):
-                    g.add((kpi_uri, ISPS["hasTarget"], Literal(kpi_info["target"])))
-
-
-def _extract_kpi_details(text: str, kpi_id: str, obj_id: str) -> dict | None:
-    """Extract details for a specific KPI."""
-    # Look for table rows with the KPI ID
-    pattern = rf"\|\s*{kpi_id}\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|"
-    match = re.search(pattern, text)
-    if match:
-        return {
-            "name": match.group(1).strip(),
-            "baseline": match.group(2).strip(),
-            "target": match.group(3).strip(),
-        }
-    return None
+                    triples.append((kpi_uri, P_HAS_TARGET, Literal(kpi_info["target"])))
 
 
-def _extract_actions(g: Graph, text: str, action_plan_uri):
-    """Extract actions from the action plan and link them to objectives."""
-    # Pattern to match action table rows
-    pattern = r"\|\s*(A\d+\.\d+)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(\d+)%?\s*\|"
-    matches = re.finditer(pattern, text)
-    
+def _extract_kpi_details(text: str) -> dict[str, dict]:
+    """Extract details for every KPI in one pass, keyed by KPI ID (first row wins)."""
+    details = {}
+    for match in _KPI_ROW_RE.finditer(text):
+        kpi_id = match.group(1)
+        if kpi_id not in details:
+            details[kpi_id] = {
+                "name": match.group(2).strip(),
+                "baseline": match.group(3).strip(),
+                "target": match.group(4).strip(),
+            }
+    return details
+
+
+def _extract_action_plan(triples: list, text: str, action_plan_uri):
+    """Extract actions, addendum actions, risks and owners in a single scan."""
     current_obj = "SO1"
+    addendum_count = 0
+    owners = set()
+    owner_uris = {}  # owner name -> URIRef, shared by every row they own
+    table_actions = {}  # objective ID -> action URIs from the action table
     
-    for match in matches:
-        action_id = match.group(1).strip()
-        action_desc = match.group(2).strip()
-        owner = match.group(3).strip()
-        deadline = match.group(4).strip()
-        progress = match.group(5).strip()
-        
-        # Determine which objective this action belongs to
-        obj_num = action_id.split(".")[0].replace("A", "")
-        if obj_num in "123456":
-            current_obj = f"SO{obj_num}"
-        
-        action_uri = ISPS[action_id.replace(".", "_")]
-        g.add((action_uri, RDF.type, ISPS["Action"]))
-        g.add((action_uri, ISPS["hasTitle"], Literal(action_desc[:200])))
-        g.add((action_uri, ISPS["hasDeadline"], Literal(deadline)))
-        g.add((action_uri, ISPS["hasProgress"], Literal(int(progress), datatype=XSD.integer)))
-        g.add((action_uri, ISPS["hasStatus"], Literal(_progress_to_status(int(progress)))))
+    for match in _ACTION_PLAN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "action":
+            current_obj, action_uri = _add_action(triples, match, action_plan_uri, current_obj, owner_uris)
+            table_actions.setdefault(current_obj, []).append(action_uri)
+            owner = match.group("action_owner").strip()
+        elif kind == "owner":
+            owner = match.group("owner_name").strip()
+        elif kind == "addendum":
+            addendum_count += 1
+            _add_addendum_action(triples, match, action_plan_uri, addendum_count)
+            continue
+        else:
+            _add_risk(triples, match, action_plan_uri)
+            continue
         
-        # Link to plan and objective
-        g.add((action_plan_uri, ISPS["hasAction"], action_uri))
-        g.add((action_uri, ISPS["supportsObjective"], ISPS[current_obj]))
-
-        # Link action to all KPIs of its parent objective
-        for kpi_id in OBJECTIVE_KPIS.get(current_obj, []):
-            kpi_uri = ISPS[f"{current_obj}_{kpi_id}"]
-            g.add((action_uri, ISPS["supportsKPI"], kpi_uri))
-        
-        # Link to owner
-        if owner:
-            owner_uri = ISPS[_uri_safe(owner)]
-            g.add((action_uri, ISPS["ownedBy"], owner_uri))
-
-def _extract_addendum_actions(g: Graph, text: str, action_plan_uri):
-    """Extract actions from the addendum section (format: [KPI_ID] Action text)."""
-    # Pattern: [SO1_D1] Action text...
-    # We want to match: [SO1_D1] Ensure 100% of modules...
-    pattern = r"\[(SO\d+_[A-Z]\d+)\]\s*(.*?)(?=\n|\[|$)"
-    matches = re.finditer(pattern, text)
+        if owner and len(owner) > 2 and not owner.startswith("-"):
+            owners.add(owner)
     
-    for i, match in enumerate(matches):
-        kpi_id = match.group(1).strip()
-        action_desc = match.group(2).strip()
-        
-        # Generate a synthetic ID
-        obj_id = kpi_id.split("_")[0]
-        action_id = f"{obj_id}_ADD_{i+1}"
-        
-        action_uri = ISPS[action_id]
-        g.add((action_uri, RDF.type, ISPS["Action"]))
-        g.add((action_uri, ISPS["hasTitle"], Literal(action_desc[:300])))
-        g.add((action_uri, ISPS["hasDeadline"], Literal("2029"))) # Default for addendum
-        g.add((action_uri, ISPS["hasProgress"], Literal(20, datatype=XSD.integer))) # Assume started
-        g.add((action_uri, ISPS["hasStatus"], Literal("In Progress")))
-        
-        
-        # Link to plan and objective
-        g.add((action_plan_uri, ISPS["hasAction"], action_uri))
-        g.add((action_uri, ISPS["supportsObjective"], ISPS[obj_id]))
-        
-        # Link explicit KPI
-        full_kpi_id = kpi_id # e.g. SO1_D1
-        kpi_uri = ISPS[full_kpi_id]
-        g.add((action_uri, ISPS["supportsKPI"], kpi_uri))
-        
-        # Also owner?
-        owner_uri = ISPS["Strategic_Planning_Team"]
-        g.add((action_uri, ISPS["ownedBy"], owner_uri))
+    # Link every table action to all KPIs of its parent objective in one pass
+    for obj_id, action_uris in table_actions.items():
+        kpi_uris = _OBJECTIVE_KPI_URIS.get(obj_id, ())
+        triples.extend(
+            (action_uri, P_SUPPORTS_KPI, kpi_uri)
+            for action_uri in action_uris
+            for kpi_uri in kpi_uris
+        )
+    
+    _add_people(triples, owners, owner_uris)
 
 
-def _extract_risks(g: Graph, text: str, action_plan_uri):
-    """Extract risks from the risk register section."""
-    pattern = r"\|\s*(RISK-\d+)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|"
-    matches = re.finditer(pattern, text)
+def _add_action(
+    triples: list, match: re.Match, action_plan_uri, current_obj: str, owner_uris: dict,
+) -> tuple:
+    """Add an action table row and link it to its objective; returns (objective, action URI)."""
+    action_id = match.group("action_id").strip()
+    action_desc = match.group("action_desc").strip()
+    owner = match.group("action_owner").strip()
+    deadline = match.group("action_deadline").strip()
+    progress = match.group("action_progress").strip()
     
-    for match in matches:
-        risk_id = match.group(1).strip()
-        risk_desc = match.group(2).strip()
-        likelihood = match.group(3).strip()
-        impact = match.group(4).strip()
-        
-        risk_uri = ISPS[risk_id.replace("-", "_")]
-        g.add((risk_uri, RDF.type, ISPS["Risk"]))
-        g.add((risk_uri, ISPS["hasTitle"], Literal(risk_desc[:200])))
-        g.add((risk_uri, ISPS["hasLikelihood"], Literal(likelihood)))
-        g.add((risk_uri, ISPS["hasRiskLevel"], Literal(impact)))
-        g.add((action_plan_uri, ISPS["hasRisk"], risk_uri))
+    # Determine which objective this action belongs to
+    obj_num = action_id.split(".")[0].replace("A", "")
+    if obj_num in "123456":
+        current_obj = f"SO{obj_num}"
+    
+    action_uri = ISPS[action_id.replace(".", "_")]
+    triples.append((action_uri, RDF.type, ISPS["Action"]))
+    triples.append((action_uri, P_HAS_TITLE, Literal(action_desc[:200])))
+    triples.append((action_uri, P_HAS_DEADLINE, Literal(deadline)))
+    triples.append((action_uri, P_HAS_PROG, Literal(int(progress), datatype=XSD.integer)))
+    triples.append((action_uri, P_HAS_STATUS, Literal(_progress_to_status(int(progress)))))
+    
+    # Link to plan and objective
+    triples.append((action_plan_uri, P_HAS_ACTION, action_uri))
+    triples.append((action_uri, P_SUPPORTS_OBJ, ISPS[current_obj]))
+    
+    # Link to owner
+    if owner:
+        triples.append((action_uri, P_OWNED_BY, _owner_uri(owner_uris, owner)))
+    
+    return current_obj, action_uri
 
 
-def _extract_people(g: Graph, text: str):
-    """Extract people/departments from the action plan."""
-    # Common owner patterns in our action plan
-    owners = set()
-    pattern = r"\|\s*A\d+\.\d+\s*\|.*?\|\s*(.*?)\s*\|"
-    for match in re.finditer(pattern, text):
-        owner = match.group(1).strip()
-        if owner and len(owner) > 2 and not owner.startswith("-"):
-            owners.add(owner)
+def _add_addendum_action(triples: list, match: re.Match, action_plan_uri, index: int):
+    """Add an addendum action (format: [KPI_ID] Action text); index numbers it from 1."""
+    kpi_id = match.group("addendum_kpi").strip()
+    action_desc = match.group("addendum_desc").strip()
+    
+    # Generate a synthetic ID
+    obj_id = kpi_id.split("_")[0]
+    action_id = f"{obj_id}_ADD_{index}"
+    
+    action_uri = ISPS[action_id]
+    triples.append((action_uri, RDF.type, ISPS["Action"]))
+    triples.append((action_uri, P_HAS_TITLE, Literal(action_desc[:300])))
+    triples.append((action_uri, P_HAS_DEADLINE, Literal("2029"))) # Default for addendum
+    triples.append((action_uri, P_HAS_PROG, Literal(20, datatype=XSD.integer))) # Assume started
+    triples.append((action_uri, P_HAS_STATUS, Literal("In Progress")))
+    
+    
+    # Link to plan and objective
+    triples.append((action_plan_uri, P_HAS_ACTION, action_uri))
+    triples.append((action_uri, P_SUPPORTS_OBJ, ISPS[obj_id]))
     
+    # Link explicit KPI
+    full_kpi_id = kpi_id # e.g. SO1_D1
+    kpi_uri = ISPS[full_kpi_id]
+    triples.append((action_uri, P_SUPPORTS_KPI, kpi_uri))
+    
+    # Also owner?
+    owner_uri = ISPS["Strategic_Planning_Team"]
+    triples.append((action_uri, P_OWNED_BY, owner_uri))
+
+
+def _add_risk(triples: list, match: re.Match, action_plan_uri):
+    """Add a risk register row."""
+    risk_id = match.group("risk_id").strip()
+    risk_desc = match.group("risk_desc").strip()
+    likelihood = match.group("risk_likelihood").strip()
+    impact = match.group("risk_impact").strip()
+    
+    risk_uri = ISPS[risk_id.replace("-", "_")]
+    triples.append((risk_uri, RDF.type, ISPS["Risk"]))
+    triples.append((risk_uri, P_HAS_TITLE, Literal(risk_desc[:200])))
+    triples.append((risk_uri, P_HAS_LIKELIHOOD, Literal(likelihood)))
+    triples.append((risk_uri, P_HAS_RISK_LEVEL, Literal(impact)))
+    triples.append((action_plan_uri, P_HAS_RISK, risk_uri))
+
+
+def _add_people(triples: list, owners: set[str], owner_uris: dict):
+    """Add the action owners collected from the action table."""
     for owner in owners:
-        owner_uri = ISPS[_uri_safe(owner)]
-        g.add((owner_uri, RDF.type, ISPS["Person"]))
-        g.add((owner_uri, ISPS["hasTitle"], Literal(owner)))
+        owner_uri = _owner_uri(owner_uris, owner)
+        triples.append((owner_uri, RDF.type, ISPS["Person"]))
+        triples.append((owner_uri, P_HAS_TITLE, Literal(owner)))
 
 
 def _progress_to_status(progress: int) -> str:
@@ -230,9 +280,20 @@ def _progress_to_status(progress: int) -> str:
     return "Not Started"
 
 
+def _owner_uri(owner_uris: dict, owner: str):
+    """URIRef for an owner name, created once per build."""
+    owner_uri = owner_uris.get(owner)
+    if owner_uri is None:
+        owner_uri = owner_uris[owner] = ISPS[_uri_safe(owner)]
+    return owner_uri
+
+
+@lru_cache(maxsize=512)
 def _uri_safe(text: str) -> str:
     """Convert text to a URI-safe string."""
-    return re.sub(r'[^a-zA-Z0-9]', '_', text).strip('_')
+    if text.isascii():
+        return text.translate(_ASCII_URI_TABLE).strip('_')
+    return _NON_URI_CHARS_RE.sub('_', text).strip('_')
 
 
 def export_graph(g: Graph, filepath: str, format: str = "turtle"):
@@ -240,6 +301,15 @@ def export_graph(g: Graph, filepath: str, format: str = "turtle"):
     g.serialize(destination=filepath, format=format)
 
 
+_STATS_CLASS_KEYS = {
+    ISPS["StrategicObjective"]: "objectives",
+    ISPS["Action"]: "actions",
+    ISPS["KPI"]: "kpis",
+    ISPS["Risk"]: "risks",
+    ISPS["Person"]: "people",
+}
+
+
 def get_graph_stats(g: Graph) -> dict:
     """Get statistics about the knowledge graph."""
     stats = {
@@ -251,13 +321,10 @@ def get_graph_stats(g: Graph) -> dict:
         "people": 0,
     }
     
-    for class_name, key in [
-        ("StrategicObjective", "objectives"),
-        ("Action", "actions"),
-        ("KPI", "kpis"),
-        ("Risk", "risks"),
-        ("Person", "people"),
-    ]:
-        stats[key] = len(list(g.subjects(RDF.type, ISPS[class_name])))
+    # One rdf:type scan, dispatched on the class, instead of a lookup per class
+    for _, cls in g.subject_objects(RDF.type):
+        key = _STATS_CLASS_KEYS.get(cls)
+        if key is not None:
+            stats[key] += 1
     
     return stats
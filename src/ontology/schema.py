@@ -5,16 +5,43 @@ strategic plan entities and their relationships.
 """
 from rdflib import Graph, Namespace, URIRef, Literal, RDF, RDFS, OWL, XSD
 
+try:
+    # Importing oxrdflib registers the "Oxigraph" rdflib store plugin
+    import oxrdflib
+    GRAPH_STORE = "Oxigraph"
+except ImportError:  # fall back to rdflib's pure-Python in-memory store
+    GRAPH_STORE = "default"
+
 # Namespace
 ISPS = Namespace("http://isps.greenfield.ac.uk/ontology#")
 
+# Predicate URIs, bound once so hot loops don't rebuild them per triple
+P_SUPPORTS_OBJ = ISPS["supportsObjective"]
+P_HAS_KPI = ISPS["hasKPI"]
+P_SUPPORTS_KPI = ISPS["supportsKPI"]
+P_HAS_PROG = ISPS["hasProgress"]
+P_HAS_TITLE = ISPS["hasTitle"]
+P_OWNED_BY = ISPS["ownedBy"]
+P_HAS_STATUS = ISPS["hasStatus"]
+P_HAS_DEADLINE = ISPS["hasDeadline"]
+P_HAS_ACTION = ISPS["hasAction"]
+P_HAS_OBJECTIVE = ISPS["hasObjective"]
+P_HAS_DESCRIPTION = ISPS["hasDescription"]
+P_HAS_TARGET = ISPS["hasTarget"]
+P_HAS_BASELINE = ISPS["hasBaseline"]
+P_HAS_RISK = ISPS["hasRisk"]
+P_HAS_RISK_LEVEL = ISPS["hasRiskLevel"]
+P_HAS_LIKELIHOOD = ISPS["hasLikelihood"]
 
-def create_ontology_graph() -> Graph:
-    """Create a new RDF graph with the ISPS ontology schema."""
-    g = Graph()
-    g.bind("isps", ISPS)
-    g.bind("owl", OWL)
-    g.bind("rdfs", RDFS)
+
+def new_graph() -> Graph:
+    """Empty RDF graph on the Rust-backed Oxigraph store when oxrdflib is installed."""
+    return Graph(store=GRAPH_STORE)
+
+
+def _schema_triples() -> tuple:
+    """The ISPS ontology schema (TBox) as (s, p, o) triples."""
+    triples = []
     
     # ─── Classes ─────────────────────────────────────────────────────────────
     classes = [
@@ -31,9 +58,9 @@ def create_ontology_graph() -> Graph:
     
     for class_name, description in classes:
         uri = ISPS[class_name]
-        g.add((uri, RDF.type, OWL.Class))
-        g.add((uri, RDFS.label, Literal(class_name)))
-        g.add((uri, RDFS.comment, Literal(description)))
+        triples.append((uri, RDF.type, OWL.Class))
+        triples.append((uri, RDFS.label, Literal(class_name)))
+        triples.append((uri, RDFS.comment, Literal(description)))
     
     # ─── Object Properties ───────────────────────────────────────────────────
     object_properties = [
@@ -52,11 +79,11 @@ def create_ontology_graph() -> Graph:
     
     for prop_name, domain, range_, description in object_properties:
         uri = ISPS[prop_name]
-        g.add((uri, RDF.type, OWL.ObjectProperty))
-        g.add((uri, RDFS.domain, ISPS[domain]))
-        g.add((uri, RDFS.range, ISPS[range_]))
-        g.add((uri, RDFS.label, Literal(prop_name)))
-        g.add((uri, RDFS.comment, Literal(description)))
+        triples.append((uri, RDF.type, OWL.ObjectProperty))
+        triples.append((uri, RDFS.domain, ISPS[domain]))
+        triples.append((uri, RDFS.range, ISPS[range_]))
+        triples.append((uri, RDFS.label, Literal(prop_name)))
+        triples.append((uri, RDFS.comment, Literal(description)))
     
     # ─── Datatype Properties ─────────────────────────────────────────────────
     datatype_properties = [
@@ -78,10 +105,24 @@ def create_ontology_graph() -> Graph:
     
     for prop_name, domain, range_, description in datatype_properties:
         uri = ISPS[prop_name]
-        g.add((uri, RDF.type, OWL.DatatypeProperty))
-        g.add((uri, RDFS.domain, ISPS[domain]))
-        g.add((uri, RDFS.range, range_))
-        g.add((uri, RDFS.label, Literal(prop_name)))
-        g.add((uri, RDFS.comment, Literal(description)))
+        triples.append((uri, RDF.type, OWL.DatatypeProperty))
+        triples.append((uri, RDFS.domain, ISPS[domain]))
+        triples.append((uri, RDFS.range, range_))
+        triples.append((uri, RDFS.label, Literal(prop_name)))
+        triples.append((uri, RDFS.comment, Literal(description)))
     
+    return tuple(triples)
+
+
+# Schema triples are fixed; build them once and reuse them for every graph
+_SCHEMA_TRIPLES = _schema_triples()
+
+
+def create_ontology_graph() -> Graph:
+    """Create a new RDF graph with the ISPS ontology schema."""
+    g = new_graph()
+    g.bind("isps", ISPS)
+    g.bind("owl", OWL)
+    g.bind("rdfs", RDFS)
+    g.addN((s, p, o, g) for s, p, o in _SCHEMA_TRIPLES)
     return g
@@ -2,9 +2,29 @@
 LangChain Chains for ISPS
 Provides chains for sync assessment, improvement suggestions, and summarization.
 """
+import asyncio
+import re
+from functools import lru_cache
+from typing import AsyncIterator, Iterator
+import openai
+import tiktoken
 from langchain_openai import ChatOpenAI
+from langchain_community.cache import SQLiteCache
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from src.config import OPENAI_API_KEY, LLM_MODEL, LLM_TEMPERATURE
+from langchain_core.runnables import RunnableLambda
+from src.config import (
+    BASE_DIR, OPENAI_API_KEY, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_CONCURRENCY, GUARDRAIL_MODEL,
+    LLM_CLIENT_MAX_RETRIES,
+)
+from src.util.http_clients import get_http_client, get_async_http_client, per_event_loop
+
+# Errors that persist past the client's retries only when the API is struggling;
+# anything else (bad request, auth, bugs) is raised to the caller
+TRANSIENT_API_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+# ─── LLM response cache for deterministic (temperature 0) chains ─────────────
+LLM_CACHE_PATH = BASE_DIR / "cache" / "chains_llm_cache.sqlite"
 
 
 # ─── Sync Assessment Chain ───────────────────────────────────────────────────
@@ -106,15 +126,83 @@ Generate guidance messages:""")
 ])
 
 
-def get_llm(temperature: float = None) -> ChatOpenAI:
-    """Get an LLM instance."""
+# Up to 3 messages of under 20 words each
+GUIDANCE_MAX_TOKENS = 120
+
+
+def get_llm(
+    temperature: float = None,
+    cache_key: str = None,
+    cached: bool = False,
+    model: str = LLM_MODEL,
+    max_tokens: int = None,
+    logit_bias: dict[int, int] = None,
+) -> ChatOpenAI:
+    """
+    Get an LLM instance.
+    
+    Every prompt keeps its static instructions in the system message and the
+    variable inputs in the trailing human message, so repeated calls share a
+    prompt prefix. cache_key names the prompt family and is sent as OpenAI's
+    prompt_cache_key, routing those calls to the same prefix-cache shard.
+    
+    cached responses are stored in an exact-match SQLite cache keyed on the
+    prompt and model parameters; only use it for temperature 0 chains, where a
+    repeated input should give the same answer anyway.
+    
+    Chains with a fixed-shape answer set max_tokens so a rambling reply is cut
+    off instead of decoded in full.
+    """
+    extra_body = {"prompt_cache_key": prompt_cache_key(cache_key, model)} if cache_key else None
     return ChatOpenAI(
-        model=LLM_MODEL,
-        temperature=temperature or LLM_TEMPERATURE,
+        model=model,
+        temperature=LLM_TEMPERATURE if temperature is None else temperature,
         openai_api_key=OPENAI_API_KEY,
+        extra_body=extra_body,
+        cache=_get_llm_cache() if cached else None,
+        max_tokens=max_tokens,
+        logit_bias=logit_bias,
+        max_retries=LLM_CLIENT_MAX_RETRIES,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
     )
 
 
+@lru_cache(maxsize=1)
+def _get_llm_cache() -> SQLiteCache:
+    """Exact-match prompt -> response cache, shared by the cached chain clients."""
+    LLM_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return SQLiteCache(database_path=str(LLM_CACHE_PATH))
+
+
+def prompt_cache_key(name: str, model: str = LLM_MODEL) -> str:
+    """OpenAI prompt_cache_key for a prompt family."""
+    return f"isps:{name}:{model}"
+
+
+@per_event_loop
+def _sync_chain():
+    # Six short fields; the 2-3 sentence justification is the bulk of it
+    llm = get_llm(temperature=0.0, cache_key="sync", cached=True, max_tokens=300)
+    return SYNC_ASSESSMENT_PROMPT | llm | StrOutputParser() | RunnableLambda(_parse_sync_response)
+
+
+@per_event_loop
+def _improvement_chain():
+    return IMPROVEMENT_PROMPT | get_llm(temperature=0.5, cache_key="improvement") | StrOutputParser()
+
+
+@per_event_loop
+def _summary_chain():
+    return SUMMARY_PROMPT | get_llm(temperature=0.3, cache_key="summary") | StrOutputParser()
+
+
+@per_event_loop
+def _guidance_chain():
+    llm = get_llm(temperature=0.3, cache_key="guidance", max_tokens=GUIDANCE_MAX_TOKENS)
+    return GUIDANCE_PROMPT | llm | StrOutputParser() | RunnableLambda(_parse_guidance_response)
+
+
 def assess_sync(
     objective_id: str,
     objective_name: str,
@@ -122,19 +210,53 @@ def assess_sync(
     action_chunks: str,
     ontology_mapping: str,
 ) -> dict:
-    """Run the sync assessment chain."""
-    llm = get_llm(temperature=0.1)
-    chain = SYNC_ASSESSMENT_PROMPT | llm
+    """
+    Run the sync assessment chain.
     
-    response = chain.invoke({
+    Runs at temperature 0 through the response cache, so re-assessing an
+    unchanged objective skips the API.
+    """
+    return _sync_chain().invoke({
         "objective_id": objective_id,
         "objective_name": objective_name,
         "objective_details": objective_details,
         "action_chunks": action_chunks,
         "ontology_mapping": ontology_mapping,
     })
+
+
+async def aassess_sync(
+    objective_id: str,
+    objective_name: str,
+    objective_details: str,
+    action_chunks: str,
+    ontology_mapping: str,
+) -> dict:
+    """Async variant of assess_sync."""
+    return await _sync_chain().ainvoke({
+        "objective_id": objective_id,
+        "objective_name": objective_name,
+        "objective_details": objective_details,
+        "action_chunks": action_chunks,
+        "ontology_mapping": ontology_mapping,
+    })
+
+
+async def assess_sync_many(
+    objectives: list[dict],
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+) -> list[dict]:
+    """
+    Run the sync assessment chain for several objectives concurrently.
     
-    return _parse_sync_response(response.content)
+    Args:
+        objectives: One dict of assess_sync keyword arguments per objective
+        max_concurrency: Max assessments in flight at once (bounds parallel OpenAI requests)
+        
+    Returns:
+        Parsed assessments, in the order of objectives
+    """
+    return await _sync_chain().abatch(objectives, config={"max_concurrency": max_concurrency})
 
 
 def suggest_improvements(
@@ -144,25 +266,31 @@ def suggest_improvements(
     current_actions: str,
 ) -> str:
     """Run the improvement suggestion chain."""
-    llm = get_llm(temperature=0.5)
-    chain = IMPROVEMENT_PROMPT | llm
-    
-    response = chain.invoke({
+    return _improvement_chain().invoke({
         "objective_id": objective_id,
         "objective_name": objective_name,
         "gaps": gaps,
         "current_actions": current_actions,
     })
-    
-    return response.content
 
 
 def generate_executive_summary(sync_results: str) -> str:
     """Generate executive summary from all sync results."""
-    llm = get_llm(temperature=0.3)
-    chain = SUMMARY_PROMPT | llm
-    response = chain.invoke({"sync_results": sync_results})
-    return response.content
+    return _summary_chain().invoke({"sync_results": sync_results})
+
+
+def stream_executive_summary(sync_results: str) -> Iterator[str]:
+    """Stream the executive summary as text deltas (sync variant, e.g. for st.write_stream)."""
+    for delta in _summary_chain().stream({"sync_results": sync_results}):
+        if delta:
+            yield delta
+
+
+async def astream_executive_summary(sync_results: str) -> AsyncIterator[str]:
+    """Stream the executive summary as text deltas while the model generates it."""
+    async for delta in _summary_chain().astream({"sync_results": sync_results}):
+        if delta:
+            yield delta
 
 
 def generate_guidance_messages(
@@ -173,18 +301,69 @@ def generate_guidance_messages(
     gaps: str,
 ) -> list[str]:
     """Generate guidance messages for decision-makers."""
-    llm = get_llm(temperature=0.3)
-    chain = GUIDANCE_PROMPT | llm
-    
-    response = chain.invoke({
+    return _guidance_chain().invoke({
+        "objective_id": objective_id,
+        "objective_name": objective_name,
+        "alignment_score": alignment_score,
+        "alignment_level": alignment_level,
+        "gaps": gaps,
+    })
+
+
+async def agenerate_guidance_messages(
+    objective_id: str,
+    objective_name: str,
+    alignment_score: float,
+    alignment_level: str,
+    gaps: str,
+) -> list[str]:
+    """Async variant of generate_guidance_messages."""
+    return await _guidance_chain().ainvoke({
         "objective_id": objective_id,
         "objective_name": objective_name,
         "alignment_score": alignment_score,
         "alignment_level": alignment_level,
         "gaps": gaps,
     })
+
+
+async def agenerate_guidance_messages_many(
+    objectives: list[dict],
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+    semaphore: asyncio.Semaphore | None = None,
+) -> list[list[str]]:
+    """
+    Generate guidance messages for several objectives concurrently.
+    
+    Args:
+        objectives: One dict of generate_guidance_messages keyword arguments per objective
+        max_concurrency: Max requests in flight at once
+        semaphore: Optional caller-owned limit shared with other LLM calls; each
+            request holds one slot, and max_concurrency is then ignored
+        
+    Returns:
+        Guidance message lists, in the order of objectives
+    """
+    chain = _guidance_chain()
+    if semaphore is None:
+        return await chain.abatch(objectives, config={"max_concurrency": max_concurrency})
     
-    messages = [line.strip() for line in response.content.strip().split("\n") if line.strip()]
+    async def generate(inputs):
+        async with semaphore:
+            return await chain.ainvoke(inputs)
+    return list(await asyncio.gather(*(generate(inputs) for inputs in objectives)))
+
+
+# One "FIELD: value" line of the sync assessment format, leading indentation allowed
+_SYNC_FIELD_RE = re.compile(
+    r"^[^\S\n]*(ALIGNMENT_SCORE|ALIGNMENT_LEVEL|COVERED_KPIS|UNCOVERED_KPIS|JUSTIFICATION|CONFIDENCE):(.*)$",
+    re.MULTILINE,
+)
+
+
+def _parse_guidance_response(response_text: str) -> list[str]:
+    """Split the guidance response into one message per non-empty line."""
+    messages = [line.strip() for line in response_text.strip().split("\n") if line.strip()]
     return messages
 
 
@@ -200,29 +379,21 @@ def _parse_sync_response(response_text: str) -> dict:
         "raw_response": response_text,
     }
     
-    for line in response_text.strip().split("\n"):
-        line = line.strip()
-        if line.startswith("ALIGNMENT_SCORE:"):
+    for field, value in _SYNC_FIELD_RE.findall(response_text):
+        key = field.lower()
+        if field == "JUSTIFICATION":
+            result[key] = value.strip()
+            continue
+        value = value.split(":", 1)[0].strip()  # Drop any trailing "Note: ..."
+        if field in ("ALIGNMENT_SCORE", "CONFIDENCE"):
             try:
-                result["alignment_score"] = float(line.split(":")[1].strip())
-            except (ValueError, IndexError):
+                result[key] = float(value)
+            except ValueError:
                 pass
-        elif line.startswith("ALIGNMENT_LEVEL:"):
-            result["alignment_level"] = line.split(":")[1].strip()
-        elif line.startswith("COVERED_KPIS:"):
-            kpis = line.split(":")[1].strip()
-            result["covered_kpis"] = [k.strip() for k in kpis.split(",") if k.strip()]
-        elif line.startswith("UNCOVERED_KPIS:"):
-            kpis = line.split(":")[1].strip()
-            result["uncovered_kpis"] = [k.strip() for k in kpis.split(",") if k.strip()]
-        elif line.startswith("JUSTIFICATION:"):
-            result["justification"] = line.split(":", 1)[1].strip()
-        elif line.startswith("CONFIDENCE:"):
-            try:
-                result["confidence"] = float(line.split(":")[1].strip())
-            except (ValueError, IndexError):
-                pass
-    
+        elif field == "ALIGNMENT_LEVEL":
+            result[key] = value
+        else:
+            result[key] = [k.strip() for k in value.split(",") if k.strip()]
     
     return result
 
@@ -246,13 +417,61 @@ GUARDRAIL_PROMPT = ChatPromptTemplate.from_messages([
 ])
 
 
+# Queries naming the domain (or greetings) are relevant without asking the classifier
+_RELEVANT_RE = re.compile(
+    r"\b(?:SO[1-5]|KPIs?|alignment|action plans?|strategic|GreenField|ISPS"
+    r"|hello|hi|hey|thanks?|thank you)\b",
+    re.IGNORECASE,
+)
+
+
 def check_relevance(query: str) -> bool:
-    """Check if the query is relevant to the domain."""
-    llm = get_llm(temperature=0.0)
-    chain = GUARDRAIL_PROMPT | llm
+    """
+    Check if the query is relevant to the domain.
+    
+    Queries matching the domain keywords pass without an LLM call; the rest are
+    classified by the small guardrail model. Verdicts are memoized per
+    normalized query (case and whitespace folded), so repeated questions skip
+    the classifier call.
+    """
+    if _RELEVANT_RE.search(query):
+        return True
     try:
-        response = chain.invoke({"query": query})
-        return response.content.strip().upper().startswith("YES")
-    except Exception:
-        # Fail safe: allow query if check fails
+        return _classify_relevance(" ".join(query.lower().split()))
+    except TRANSIENT_API_ERRORS:
+        # Fail safe: allow query if the API is unavailable after the client's
+        # retries (not cached, so it is retried next time)
         return True
+
+
+@lru_cache(maxsize=512)
+def _classify_relevance(normalized_query: str) -> bool:
+    return _guardrail_chain().invoke({"query": normalized_query})
+
+
+@per_event_loop
+def _guardrail_chain():
+    # One token, restricted to the YES/NO tokens
+    llm = get_llm(
+        temperature=0.0, cache_key="guardrail", model=GUARDRAIL_MODEL,
+        max_tokens=1, logit_bias=_guardrail_logit_bias(),
+    )
+    return (
+        GUARDRAIL_PROMPT | llm | StrOutputParser()
+        | RunnableLambda(lambda verdict: verdict.strip().upper().startswith("YES"))
+    )
+
+
+@lru_cache(maxsize=1)
+def _guardrail_logit_bias() -> dict[int, int]:
+    """Logit bias limiting the guardrail's first token to YES or NO."""
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(GUARDRAIL_MODEL)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        token_ids = [encoding.encode(answer) for answer in ("YES", "NO")]
+    except Exception:
+        # Tokenizer unavailable (e.g. offline); classify without the bias
+        return {}
+    return {ids[0]: 100 for ids in token_ids if len(ids) == 1}
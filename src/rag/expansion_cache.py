@@ -0,0 +1,70 @@
+"""
+Semantic Cache for Query Expansions
+Stores HyDE documents and multi-query responses in a Chroma collection keyed by
+the embedded query, so paraphrases of an earlier query reuse its expansion
+instead of making another LLM call.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from src.config import (
+    CHROMA_COLLECTION_EXPANSION_CACHE, EXPANSION_CACHE_THRESHOLD, EMBEDDING_DIMENSIONS,
+)
+from src.chunking.embedding_cache import get_cached_embeddings
+from src.ingestion.vector_store import get_chroma_client, get_or_create_collection
+
+# Objective, KPI and action identifiers (SO1, SO1_D1, D1, A1.2). Queries that
+# differ only in one of these embed almost identically, so a hit must also
+# name exactly the same IDs.
+_ENTITY_ID_RE = re.compile(r"\b(?:SO\d+(?:_[A-Z]\d+)?|[A-Z]{1,2}\d+(?:[._]\d+)?)\b")
+
+
+@lru_cache(maxsize=1)
+def _get_cache_collection():
+    """Cache collection on the shared client (cosine space, like the chunk collections)."""
+    return get_or_create_collection(get_chroma_client(), CHROMA_COLLECTION_EXPANSION_CACHE)
+
+
+def embed_query(query: str) -> list[float]:
+    """
+    Embed a query once for both the lookup and a later store. Goes through the
+    on-disk embedding cache, so a repeated query costs no embedding call.
+    """
+    return get_cached_embeddings(EMBEDDING_DIMENSIONS).embed_query(query)
+
+
+def _entity_ids(query: str) -> str:
+    """The query's objective/KPI/action IDs as one sorted, space-separated key."""
+    return " ".join(sorted(set(_ENTITY_ID_RE.findall(query))))
+
+
+def lookup(kind: str, query: str, embedding: list[float]) -> str | None:
+    """
+    Return the cached response of the given kind for the nearest earlier query
+    naming the same objective/KPI/action IDs, if its cosine similarity reaches
+    EXPANSION_CACHE_THRESHOLD.
+    """
+    collection = _get_cache_collection()
+    result = collection.query(
+        query_embeddings=[embedding],
+        n_results=1,
+        where={"$and": [{"kind": kind}, {"ids": _entity_ids(query)}]},
+        include=["metadatas", "distances"],
+    )
+    if not result["ids"][0]:
+        return None
+    # Cosine distance: similarity = 1 - distance
+    if 1.0 - result["distances"][0][0] < EXPANSION_CACHE_THRESHOLD:
+        return None
+    return result["metadatas"][0][0]["response"]
+
+
+def store(kind: str, query: str, embedding: list[float], response: str) -> None:
+    """Cache a response under the query's embedding (re-storing a query overwrites it)."""
+    entry_id = hashlib.sha1(f"{kind}\x00{query}".encode("utf-8")).hexdigest()
+    _get_cache_collection().upsert(
+        ids=[entry_id],
+        embeddings=[embedding],
+        documents=[query],
+        metadatas=[{"kind": kind, "ids": _entity_ids(query), "response": response}],
+    )
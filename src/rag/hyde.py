@@ -3,9 +3,15 @@ HyDE (Hypothetical Document Embeddings) Query Generator
 Generates hypothetical ideal answers to bridge the semantic gap between
 strategic language and operational language.
 """
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+import asyncio
+import json
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from src.config import OPENAI_API_KEY, LLM_MODEL, EMBEDDING_MODEL
+from src.config import OPENAI_API_KEY, LLM_MODEL, LLM_CLIENT_MAX_RETRIES, EMBEDDING_DIMENSIONS
+from src.chunking.embedding_cache import get_cached_embeddings
+from src.rag import expansion_cache
+from src.rag.chains import prompt_cache_key
+from src.util.http_clients import get_http_client, get_async_http_client
 
 
 HYDE_PROMPT = ChatPromptTemplate.from_messages([
@@ -41,25 +47,90 @@ Return ONLY the 3 queries, one per line, numbered 1-3."""),
 ])
 
 
+EXPANSION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert in strategic planning, organizational alignment, and
+reformulating queries for information retrieval.
+Given a query about a university's strategic plan alignment, produce two things.
+
+1. variants: 3 alternative versions of the query that might retrieve different
+   relevant information, each from a slightly different angle:
+   - A more specific, detailed version
+   - A broader, conceptual version
+   - A version focusing on metrics/KPIs/outcomes
+
+2. hyde: a HYPOTHETICAL ideal action plan response that would perfectly answer the query.
+   It should:
+   - Describe specific, concrete actions that would ideally support the objective
+   - Include relevant KPIs, timelines, and responsible parties
+   - Be written in the same style as an organizational action plan
+   - Be approximately 200-300 words
+   - Sound like a real action plan document, not a summary
+   It will be used for semantic search, so make it rich with relevant terms and
+   concepts that would appear in actual action plan entries."""),
+    ("human", "{query}")
+])
+
+EXPANSION_SCHEMA = {
+    "title": "QueryExpansions",
+    "description": "Query variants and a hypothetical action plan document for retrieval.",
+    "type": "object",
+    "properties": {
+        "variants": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "3 alternative versions of the query",
+        },
+        "hyde": {
+            "type": "string",
+            "description": "Hypothetical action plan document answering the query",
+        },
+    },
+    "required": ["variants", "hyde"],
+}
+
+
 def generate_hyde_document(query: str) -> str:
     """
     Generate a hypothetical document for a given query using HyDE.
     
+    Documents are served from the semantic expansion cache when an earlier
+    query was close enough in meaning.
+    
     Args:
         query: The user's query or strategic objective description
         
     Returns:
         Hypothetical document text
     """
+    embedding, cached = _cache_get("hyde", query)
+    if cached is not None:
+        return cached
+    response = _hyde_chain().invoke({"query": query})
+    _cache_put("hyde", query, embedding, response.content)
+    return response.content
+
+
+async def agenerate_hyde_document(query: str) -> str:
+    """Async variant of generate_hyde_document."""
+    embedding, cached = await asyncio.to_thread(_cache_get, "hyde", query)
+    if cached is not None:
+        return cached
+    response = await _hyde_chain().ainvoke({"query": query})
+    await asyncio.to_thread(_cache_put, "hyde", query, embedding, response.content)
+    return response.content
+
+
+def _hyde_chain():
     llm = ChatOpenAI(
         model=LLM_MODEL,
         temperature=0.7,
         openai_api_key=OPENAI_API_KEY,
+        extra_body={"prompt_cache_key": prompt_cache_key("hyde")},
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=LLM_CLIENT_MAX_RETRIES,
     )
-    
-    chain = HYDE_PROMPT | llm
-    response = chain.invoke({"query": query})
-    return response.content
+    return HYDE_PROMPT | llm
 
 
 def get_hyde_embedding(query: str) -> list[float]:
@@ -71,6 +142,10 @@ def get_hyde_embedding(query: str) -> list[float]:
     2. Embed the hypothetical document
     3. Return the embedding (which captures operational language)
     
+    Both steps are cached: the document by the semantic expansion cache and its
+    vector by the on-disk embedding cache, so a repeated query (such as a fixed
+    objective description) makes no API calls.
+    
     Args:
         query: The user's query
         
@@ -78,37 +153,101 @@ def get_hyde_embedding(query: str) -> list[float]:
         Embedding vector for the hypothetical document
     """
     hypothetical_doc = generate_hyde_document(query)
-    
-    embeddings = OpenAIEmbeddings(
-        model=EMBEDDING_MODEL,
-        openai_api_key=OPENAI_API_KEY,
-    )
-    
-    return embeddings.embed_query(hypothetical_doc)
+    return get_cached_embeddings(EMBEDDING_DIMENSIONS).embed_query(hypothetical_doc)
 
 
 def generate_multi_queries(query: str) -> list[str]:
     """
     Generate multiple query variants for broader retrieval.
     
+    Like HyDE documents, the model's variants are reused from the semantic
+    expansion cache for paraphrased queries.
+    
     Args:
         query: Original query
         
     Returns:
         List of 3-4 query variants (including original)
     """
+    embedding, cached = _cache_get("multi_query", query)
+    if cached is None:
+        cached = _multi_query_chain().invoke({"query": query}).content
+        _cache_put("multi_query", query, embedding, cached)
+    return _parse_multi_queries(query, cached)
+
+
+async def agenerate_multi_queries(query: str) -> list[str]:
+    """Async variant of generate_multi_queries."""
+    embedding, cached = await asyncio.to_thread(_cache_get, "multi_query", query)
+    if cached is None:
+        cached = (await _multi_query_chain().ainvoke({"query": query})).content
+        await asyncio.to_thread(_cache_put, "multi_query", query, embedding, cached)
+    return _parse_multi_queries(query, cached)
+
+
+def _multi_query_chain():
     llm = ChatOpenAI(
         model=LLM_MODEL,
         temperature=0.3,
         openai_api_key=OPENAI_API_KEY,
+        extra_body={"prompt_cache_key": prompt_cache_key("multi_query")},
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=LLM_CLIENT_MAX_RETRIES,
     )
+    return MULTI_QUERY_PROMPT | llm
+
+
+def generate_query_expansions(query: str) -> tuple[list[str], str]:
+    """
+    Generate the multi-query variants and the HyDE document in one LLM call.
     
-    chain = MULTI_QUERY_PROMPT | llm
-    response = chain.invoke({"query": query})
-    
-    # Parse numbered queries
+    Args:
+        query: Original query
+        
+    Returns:
+        Tuple of (3-4 query variants including the original, hypothetical document)
+    """
+    embedding, cached = _cache_get("expansion", query)
+    if cached is None:
+        cached = json.dumps(_expansion_chain().invoke({"query": query}))
+        _cache_put("expansion", query, embedding, cached)
+    return _parse_expansions(query, cached)
+
+
+async def agenerate_query_expansions(query: str) -> tuple[list[str], str]:
+    """Async variant of generate_query_expansions."""
+    embedding, cached = await asyncio.to_thread(_cache_get, "expansion", query)
+    if cached is None:
+        cached = json.dumps(await _expansion_chain().ainvoke({"query": query}))
+        await asyncio.to_thread(_cache_put, "expansion", query, embedding, cached)
+    return _parse_expansions(query, cached)
+
+
+def _expansion_chain():
+    # Between the HyDE (0.7) and multi-query (0.3) temperatures it replaces
+    llm = ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=0.5,
+        openai_api_key=OPENAI_API_KEY,
+        extra_body={"prompt_cache_key": prompt_cache_key("expansion")},
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=LLM_CLIENT_MAX_RETRIES,
+    )
+    return EXPANSION_PROMPT | llm.with_structured_output(EXPANSION_SCHEMA)
+
+
+def _parse_expansions(query: str, response_json: str) -> tuple[list[str], str]:
+    expansions = json.loads(response_json)
+    variants = [query] + [v.strip() for v in expansions["variants"] if v.strip()]
+    return variants[:4], expansions["hyde"]  # Cap at 4 variants total
+
+
+def _parse_multi_queries(query: str, response_text: str) -> list[str]:
+    """Parse the numbered variants, keeping the original query first."""
     variants = [query]  # Include original
-    for line in response.content.strip().split("\n"):
+    for line in response_text.strip().split("\n"):
         line = line.strip()
         if line and len(line) > 5:
             # Remove numbering
@@ -117,3 +256,22 @@ def generate_multi_queries(query: str) -> list[str]:
                 variants.append(cleaned)
     
     return variants[:4]  # Cap at 4 total
+
+
+def _cache_get(kind: str, query: str) -> tuple[list[float] | None, str | None]:
+    """Embed the query and look it up; returns (embedding, cached response or None)."""
+    try:
+        embedding = expansion_cache.embed_query(query)
+        return embedding, expansion_cache.lookup(kind, query, embedding)
+    except Exception:
+        # The cache is an optimisation only; fall through to the LLM
+        return None, None
+
+
+def _cache_put(kind: str, query: str, embedding: list[float] | None, response: str) -> None:
+    if embedding is None:
+        return
+    try:
+        expansion_cache.store(kind, query, embedding, response)
+    except Exception:
+        pass
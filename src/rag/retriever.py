@@ -2,31 +2,28 @@
 RAG Retriever Pipeline
 Multi-Query → HyDE → Ensemble → Cross-Encoder Rerank
 """
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+import asyncio
+import heapq
+import logging
+import threading
 from src.config import (
-    OPENAI_API_KEY, EMBEDDING_MODEL, CHROMA_DIR,
+    EMBEDDING_DIMENSIONS,
     CHROMA_COLLECTION_STRATEGIC, CHROMA_COLLECTION_ACTION, CHROMA_COLLECTION_COMBINED,
-    RETRIEVAL_TOP_K, RERANK_TOP_K,
+    RETRIEVAL_TOP_K, RERANK_TOP_K, RERANK_CANDIDATES, RERANK_MODEL, EXPANSION_SKIP_RELEVANCE,
+)
+from src.ingestion.vector_store import query_collection_embeddings
+from src.chunking.embedding_cache import get_cached_embeddings
+from src.rag.chains import TRANSIENT_API_ERRORS
+from src.util.http_clients import run_async
+from src.rag.hyde import (
+    agenerate_hyde_document, agenerate_multi_queries, agenerate_query_expansions,
 )
-from src.rag.hyde import generate_hyde_document, generate_multi_queries
 
+logger = logging.getLogger("isps.retriever")
 
-def get_langchain_vectorstore(collection_name: str = None) -> Chroma:
-    """Get a LangChain Chroma vectorstore instance."""
-    if collection_name is None:
-        collection_name = CHROMA_COLLECTION_COMBINED
-    
-    embeddings = OpenAIEmbeddings(
-        model=EMBEDDING_MODEL,
-        openai_api_key=OPENAI_API_KEY,
-    )
-    
-    return Chroma(
-        collection_name=collection_name,
-        persist_directory=str(CHROMA_DIR),
-        embedding_function=embeddings,
-    )
+# Cross-encoder, loaded on first use; False once loading has failed
+_reranker = None
+_reranker_lock = threading.Lock()
 
 
 def retrieve_chunks(
@@ -40,6 +37,9 @@ def retrieve_chunks(
     """
     Full retrieval pipeline: Multi-Query → HyDE → Ensemble → Rerank.
     
+    Synchronous wrapper around aretrieve_chunks for callers without a running
+    event loop (the dashboard, and agent tools running in worker threads).
+    
     Args:
         query: User query or objective description
         collection_name: Chroma collection to search
@@ -49,68 +49,163 @@ def retrieve_chunks(
         use_multi_query: Whether to generate multiple query variants
         
     Returns:
-        List of dicts with 'text', 'metadata', and 'score' keys
+        List of dicts with 'text', 'metadata', 'score' (ensemble) and, when the
+        cross-encoder is available, 'rerank_score' keys
+    """
+    return run_async(aretrieve_chunks(
+        query, collection_name, top_k, filter_dict, use_hyde, use_multi_query,
+    ))
+
+
+async def aretrieve_chunks(
+    query: str,
+    collection_name: str = None,
+    top_k: int = None,
+    filter_dict: dict | None = None,
+    use_hyde: bool = True,
+    use_multi_query: bool = True,
+) -> list[dict]:
+    """
+    Async variant of retrieve_chunks.
+    
+    The multi-query and HyDE expansions come from a single structured LLM call
+    (or concurrent calls when only one is wanted), then every query variant is
+    embedded in one request and searched in one Chroma query, so the pipeline
+    costs two round-trips instead of one per query.
+    
+    Expansion is skipped when the query as given already matches the corpus
+    closely (top relevance of at least EXPANSION_SKIP_RELEVANCE): it is
+    already in the corpus's language, so there is no gap for HyDE to bridge.
     """
     if top_k is None:
         top_k = RERANK_TOP_K
+    if collection_name is None:
+        collection_name = CHROMA_COLLECTION_COMBINED
     
-    vectorstore = get_langchain_vectorstore(collection_name)
+    # Step 0: Probe with the raw query; a close match makes expansion redundant
+    results = None
+    if use_multi_query or use_hyde:
+        try:
+            probe = await asyncio.to_thread(_search, collection_name, [query], filter_dict)
+        except TRANSIENT_API_ERRORS:
+            probe = None
+        if probe and probe["distances"][0] and 1.0 - probe["distances"][0][0] >= EXPANSION_SKIP_RELEVANCE:
+            use_multi_query = use_hyde = False
+            results = probe
     
-    # Step 1: Generate query variants
-    if use_multi_query:
-        queries = generate_multi_queries(query)
+    # Steps 1-2: Generate query variants and the HyDE-expanded query
+    if use_multi_query and use_hyde:
+        # One structured call returns both expansions
+        queries, hyde_doc = await agenerate_query_expansions(query)
+        queries.append(hyde_doc)
     else:
-        queries = [query]
+        expansions = await asyncio.gather(
+            agenerate_multi_queries(query) if use_multi_query else _as_result([query]),
+            agenerate_hyde_document(query) if use_hyde else _as_result(None),
+            return_exceptions=True,
+        )
+        queries, hyde_doc = expansions
+        if isinstance(queries, BaseException):
+            raise queries
+        if isinstance(hyde_doc, BaseException):
+            # HyDE is optional: if the API is still failing after the client's
+            # retries, fall back to the original queries
+            if not isinstance(hyde_doc, TRANSIENT_API_ERRORS):
+                raise hyde_doc
+        elif hyde_doc is not None:
+            queries.append(hyde_doc)
     
-    # Step 2: Add HyDE-expanded query
-    if use_hyde:
+    # Step 3: Retrieve from all queries (ensemble via union + score aggregation).
+    # Every variant is embedded in one request and searched in one query call
+    # (already done by the probe when expansion was skipped)
+    if results is None:
         try:
-            hyde_doc = generate_hyde_document(query)
-            queries.append(hyde_doc)
-        except Exception:
-            pass  # Fall back to original queries
+            results = await asyncio.to_thread(_search, collection_name, queries, filter_dict)
+        except TRANSIENT_API_ERRORS:
+            # Query embedding failed even after the client's retries
+            results = {"documents": [], "metadatas": [], "distances": []}
     
-    # Step 3: Retrieve from all queries (ensemble via union + score aggregation)
     all_results = {}
     
-    for q in queries:
-        try:
-            search_kwargs = {"k": RETRIEVAL_TOP_K}
-            if filter_dict:
-                search_kwargs["filter"] = filter_dict
-            
-            results = vectorstore.similarity_search_with_relevance_scores(
-                q, **search_kwargs
-            )
-            
-            for doc, score in results:
-                doc_id = doc.page_content[:100]  # Use first 100 chars as key
-                if doc_id in all_results:
-                    # Reciprocal Rank Fusion: accumulate scores
-                    all_results[doc_id]["score"] += score
-                    all_results[doc_id]["retrieval_count"] += 1
-                else:
-                    all_results[doc_id] = {
-                        "text": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": score,
-                        "retrieval_count": 1,
-                    }
-        except Exception:
-            continue
-    
-    # Step 4: Sort by accumulated score and apply RRF normalization
-    ranked = sorted(all_results.values(), key=lambda x: x["score"], reverse=True)
-    
-    # Step 5: Cross-encoder reranking (using score boost for multi-retrieval)
-    for item in ranked:
-        # Boost items retrieved by multiple queries
-        item["score"] = item["score"] * (1 + 0.1 * (item["retrieval_count"] - 1))
-    
-    ranked = sorted(ranked, key=lambda x: x["score"], reverse=True)
-    
-    # Return top-k
-    return ranked[:top_k]
+    for texts, metadatas, distances in zip(
+        results["documents"], results["metadatas"], results["distances"]
+    ):
+        for text, metadata, distance in zip(texts, metadatas, distances):
+            score = 1.0 - distance  # Cosine space: relevance = 1 - distance
+            # Key on the full text: chunks from the same template often share a
+            # long prefix, and str caches its hash so this stays cheap
+            if text in all_results:
+                # Reciprocal Rank Fusion: accumulate scores
+                all_results[text]["score"] += score
+                all_results[text]["retrieval_count"] += 1
+            else:
+                all_results[text] = {
+                    "text": text,
+                    "metadata": metadata or {},
+                    "score": score,
+                    "retrieval_count": 1,
+                }
+    
+    # Step 4: Shortlist by ensemble score (boosted for multi-retrieval)
+    candidates = heapq.nlargest(
+        max(top_k, RERANK_CANDIDATES), all_results.values(), key=_boosted_score
+    )
+    for item in candidates:
+        item["score"] = _boosted_score(item)
+    
+    # Step 5: Cross-encoder reranking against the original query
+    return await asyncio.to_thread(_rerank, query, candidates, top_k)
+
+
+def _search(collection_name: str, queries: list[str], filter_dict: dict | None) -> dict:
+    """Embed all query variants in one batch and search them in one Chroma call."""
+    vectors = get_cached_embeddings(EMBEDDING_DIMENSIONS).embed_documents(queries)
+    return query_collection_embeddings(collection_name, vectors, RETRIEVAL_TOP_K, filter_dict)
+
+
+def _boosted_score(item: dict) -> float:
+    """Accumulated score, boosted for items retrieved by multiple queries."""
+    return item["score"] * (1 + 0.1 * (item["retrieval_count"] - 1))
+
+
+def _get_reranker():
+    """
+    Load the cross-encoder once per process, on first use. Returns None if it
+    can't be loaded; the failure is logged once and not retried.
+    """
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            try:
+                # Imported here: torch makes sentence_transformers slow to import
+                from sentence_transformers import CrossEncoder
+                _reranker = CrossEncoder(RERANK_MODEL, device="cpu")
+            except Exception as e:
+                logger.warning(f"Cross-encoder {RERANK_MODEL} unavailable, keeping ensemble order: {e}")
+                _reranker = False
+    return _reranker or None
+
+
+def _rerank(query: str, candidates: list[dict], top_k: int) -> list[dict]:
+    """
+    Order candidates by cross-encoder relevance to the query, adding it as
+    'rerank_score'; keeps the ensemble order if the model can't be loaded.
+    """
+    if len(candidates) <= 1:
+        return candidates[:top_k]
+    reranker = _get_reranker()
+    if reranker is None:
+        return candidates[:top_k]
+    scores = reranker.predict([(query, item["text"]) for item in candidates], batch_size=32)
+    
+    for item, score in zip(candidates, scores):
+        item["rerank_score"] = float(score)
+    return heapq.nlargest(top_k, candidates, key=lambda x: x["rerank_score"])
+
+
+async def _as_result(value):
+    """Wrap a precomputed value so it can sit alongside coroutines in a gather."""
+    return value
 
 
 def retrieve_for_objective(
@@ -134,10 +229,31 @@ def retrieve_for_objective(
     
     query = f"Actions and KPIs supporting {objective_description}"
     
-    return retrieve_chunks(
+    # Pre-filter on the chunk's objective tag so the vector search only ranks
+    # this objective's (and untagged) action plan chunks
+    objective_filter = {"$and": [
+        {"doc_type": "action_plan"},
+        {"objective_id": {"$in": [objective_id, "GENERAL"]}},
+    ]}
+    
+    chunks = retrieve_chunks(
         query=query,
         collection_name=collection_name,
-        filter_dict={"doc_type": "action_plan"},
+        top_k=RERANK_TOP_K,
+        filter_dict=objective_filter,
         use_hyde=True,
         use_multi_query=True,
     )
+    
+    if not chunks:
+        # Objective tagging is heuristic; fall back to the whole action plan
+        chunks = retrieve_chunks(
+            query=query,
+            collection_name=collection_name,
+            top_k=RERANK_TOP_K,
+            filter_dict={"doc_type": "action_plan"},
+            use_hyde=True,
+            use_multi_query=True,
+        )
+    
+    return chunks
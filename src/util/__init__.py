@@ -0,0 +1 @@
+"""Util module - Shared helpers used across the pipeline."""
@@ -0,0 +1,85 @@
+"""
+Shared HTTP Clients
+One connection pool for every OpenAI client in the process (chains, agents,
+HyDE and embeddings), so concurrent calls reuse keep-alive connections and TLS
+sessions instead of each client opening its own. HTTP/2 multiplexes requests
+over those connections.
+"""
+import asyncio
+import weakref
+from functools import lru_cache, wraps
+import httpx
+
+# Sized for concurrent objective analysis; the httpx default pool is too small
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Async connections are bound to the event loop that opened them, and the
+# pipeline runs several loops (asyncio.run per analysis and per retrieval), so
+# async clients are kept per loop, along with anything built on top of them
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_loop_builds: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_sync_builds: dict = {}
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Process-wide sync client."""
+    return httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=True)
+
+
+def get_async_http_client() -> httpx.AsyncClient | None:
+    """
+    Async client for the running event loop, or None outside one (the OpenAI
+    SDK then creates its own if the caller later goes async).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(
+            limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=True,
+        )
+    return client
+
+
+def per_event_loop(build):
+    """
+    Cache a client or chain builder per event loop, since each loop has its own
+    async HTTP client (sync callers outside a loop share one build per args).
+    """
+    @wraps(build)
+    def get(*args, **kwargs):
+        try:
+            builds = _loop_builds.setdefault(asyncio.get_running_loop(), {})
+        except RuntimeError:
+            builds = _sync_builds
+        key = (build, args, tuple(sorted(kwargs.items())))
+        if key not in builds:
+            builds[key] = build(*args, **kwargs)
+        return builds[key]
+    return get
+
+
+async def aclose_async_http_client() -> None:
+    """Close the running loop's async client and drop everything built on it."""
+    loop = asyncio.get_running_loop()
+    _loop_builds.pop(loop, None)
+    client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def run_async(coro):
+    """
+    asyncio.run for the sync wrappers, closing the loop's async client before
+    the loop goes away so its pooled connections are not left to the GC.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await aclose_async_http_client()
+    return asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+KPI Descriptions
+Resolve KPI IDs to their descriptions for display, shared by the analysis
+pipeline, the evaluation pipeline and the dashboard.
+"""
+from src.config import KPI_DESCRIPTIONS
+
+
+def resolve_kpi_details(kpi_details: list[dict]) -> list[tuple[str, str, str]]:
+    """
+    Resolve ground truth KPI details into display tuples.
+    
+    Returns:
+        List of (kpi_id, kpi_title, expected action IDs joined by ", ")
+    """
+    return [
+        (
+            kpi["kpi_id"],
+            KPI_DESCRIPTIONS.get(kpi["kpi_id"].split("_")[1], "Unknown KPI"),
+            ", ".join(a["id"] for a in kpi["expected_actions"]),
+        )
+        for kpi in kpi_details
+    ]
+
+
+def describe_kpis(kpis: list[str]) -> list[dict]:
+    """
+    Pair reported KPI IDs with their descriptions for display.
+    
+    Returns:
+        List of {"id": kpi_id, "desc": description}
+    """
+    described = []
+    for kpi in kpis:
+        # Handle SOx_ prefix if present (e.g., SO1_D1 -> D1)
+        lookup_key = kpi.split("_")[1] if "_" in kpi else kpi
+        described.append({"id": kpi, "desc": KPI_DESCRIPTIONS.get(lookup_key, "Unknown KPI")})
+    return described
@@ -0,0 +1,50 @@
+"""
+Async Rate Limiter
+Proactively throttles concurrent OpenAI calls to the account's request and token
+limits, so parallel work waits for capacity instead of hitting 429s and backing off.
+"""
+import asyncio
+
+
+class AsyncRateLimiter:
+    """
+    Dual token bucket for requests per minute and tokens per minute.
+    
+    Both buckets start full and refill continuously. acquire() waits until one
+    request and the estimated tokens are both available, then takes them.
+    Create one per event loop.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last_refill = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self._last_refill is not None:
+            elapsed = now - self._last_refill
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+        self._last_refill = now
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """Wait for capacity for one request of roughly estimated_tokens tokens."""
+        # A single request larger than the whole bucket could never be admitted
+        estimated_tokens = min(estimated_tokens, self.tpm)
+        loop = asyncio.get_running_loop()
+        # Callers queue on the lock, so capacity is granted in arrival order
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                if self._requests >= 1 and self._tokens >= estimated_tokens:
+                    self._requests -= 1
+                    self._tokens -= estimated_tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60.0 / self.rpm,
+                    (estimated_tokens - self._tokens) * 60.0 / self.tpm,
+                )
+                await asyncio.sleep(wait)